@@ -0,0 +1,31 @@
+"""Add entity_counters table for materialized dashboard counts
+
+Revision ID: 5d1c9e7a2f36
+Revises: 8e3f5a1c7b24
+Create Date: 2026-10-18 11:20:47.613208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1c9e7a2f36'
+down_revision = '8e3f5a1c7b24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # populated lazily on first read, or eagerly with `flask reconcile-counters`
+    op.create_table('entity_counters',
+    sa.Column('daycare_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('daycare_id', 'name')
+    )
+
+
+def downgrade():
+    op.drop_table('entity_counters')
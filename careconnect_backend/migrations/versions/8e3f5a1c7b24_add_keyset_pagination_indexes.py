@@ -0,0 +1,46 @@
+"""Add (owner, created_at, id) indexes for keyset pagination
+
+Revision ID: 8e3f5a1c7b24
+Revises: 4b7e2d91c0a3
+Create Date: 2026-10-18 10:03:11.274915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3f5a1c7b24'
+down_revision = '4b7e2d91c0a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('incidents', schema=None) as batch_op:
+        batch_op.create_index('idx_incidents_child_created', ['child_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('idx_incidents_daycare_created', ['daycare_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('child_activity_participation', schema=None) as batch_op:
+        batch_op.create_index('idx_participation_child_created', ['child_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.create_index('idx_invoices_parent_created', ['parent_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('idx_payments_parent_created', ['parent_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('idx_payments_parent_created')
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_index('idx_invoices_parent_created')
+
+    with op.batch_alter_table('child_activity_participation', schema=None) as batch_op:
+        batch_op.drop_index('idx_participation_child_created')
+
+    with op.batch_alter_table('incidents', schema=None) as batch_op:
+        batch_op.drop_index('idx_incidents_daycare_created')
+        batch_op.drop_index('idx_incidents_child_created')
@@ -0,0 +1,116 @@
+"""Add search_documents with a full-text index (GIN on PostgreSQL, FTS5 on SQLite)
+
+Indexes the existing children, users and daycares, so searches keep
+returning them right after the upgrade.
+
+Revision ID: a7c3e9d15b62
+Revises: e5a1c7b93f20
+Create Date: 2026-10-18 22:34:08.190552
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9d15b62'
+down_revision = 'e5a1c7b93f20'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "body, content='search_documents', content_rowid='id')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+BACKFILL_BATCH_SIZE = 1000
+
+# frozen copy of src.models.search.fold as of this revision: the bodies
+# must not change with later versions of the application code
+_LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss',
+                            'ø': 'o', 'Ø': 'o', 'ł': 'l', 'Ł': 'l', 'đ': 'd', 'Đ': 'd'})
+_WORD = re.compile(r'[^\W_]+')
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKD', (text or '').translate(_LIGATURES))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(_WORD.findall(text))
+
+
+children = sa.table('children', sa.column('id'), sa.column('daycare_id'),
+                    sa.column('first_name'), sa.column('last_name'))
+users = sa.table('users', sa.column('id'), sa.column('email'))
+parents = sa.table('parents', sa.column('user_id'), sa.column('first_name'), sa.column('last_name'))
+daycares = sa.table('daycares', sa.column('id'), sa.column('name'), sa.column('city'), sa.column('email'))
+
+# entity -> query of (entity_id, daycare_id, text), the text SearchHelper indexed at this revision
+BACKFILL = {
+    'child': sa.select(children.c.id, children.c.daycare_id,
+                       children.c.first_name, children.c.last_name),
+    'user': sa.select(users.c.id, sa.null(), users.c.email, parents.c.first_name, parents.c.last_name)
+              .select_from(users.outerjoin(parents, parents.c.user_id == users.c.id)),
+    'daycare': sa.select(daycares.c.id, sa.null(), daycares.c.name, daycares.c.city, daycares.c.email),
+}
+
+
+def backfill(table):
+    connection = op.get_bind()
+    for entity, query in BACKFILL.items():
+        rows = connection.execute(query.order_by(query.selected_columns[0])).yield_per(BACKFILL_BATCH_SIZE)
+        for batch in rows.partitions():
+            connection.execute(table.insert(), [
+                {'entity': entity, 'entity_id': row[0], 'daycare_id': row[1],
+                 'body': fold(' '.join(part or '' for part in row[2:]))}
+                for row in batch
+            ])
+
+
+def upgrade():
+    table = op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=16), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('daycare_id', sa.Integer(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity', 'entity_id', name='uq_search_documents_entity')
+    )
+    with op.batch_alter_table('search_documents', schema=None) as batch_op:
+        batch_op.create_index('idx_search_documents_entity_daycare', ['entity', 'daycare_id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE INDEX idx_search_documents_body_fts ON search_documents "
+                   "USING gin (to_tsvector('simple'::regconfig, body))")
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+    backfill(table)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS idx_search_documents_body_fts')
+    elif dialect == 'sqlite':
+        for trigger in ('search_documents_au', 'search_documents_ad', 'search_documents_ai'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS search_documents_fts')
+
+    with op.batch_alter_table('search_documents', schema=None) as batch_op:
+        batch_op.drop_index('idx_search_documents_entity_daycare')
+
+    op.drop_table('search_documents')
@@ -0,0 +1,44 @@
+"""Index updated_at for incremental exports
+
+Revision ID: a93f4d2e6b18
+Revises: 5d1c9e7a2f36
+Create Date: 2026-10-18 12:02:35.418870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93f4d2e6b18'
+down_revision = '5d1c9e7a2f36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('children', schema=None) as batch_op:
+        batch_op.create_index('idx_children_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('incidents', schema=None) as batch_op:
+        batch_op.create_index('idx_incidents_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.create_index('idx_invoices_updated_at', ['updated_at'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('idx_payments_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('idx_payments_updated_at')
+
+    with op.batch_alter_table('invoices', schema=None) as batch_op:
+        batch_op.drop_index('idx_invoices_updated_at')
+
+    with op.batch_alter_table('incidents', schema=None) as batch_op:
+        batch_op.drop_index('idx_incidents_updated_at')
+
+    with op.batch_alter_table('children', schema=None) as batch_op:
+        batch_op.drop_index('idx_children_updated_at')
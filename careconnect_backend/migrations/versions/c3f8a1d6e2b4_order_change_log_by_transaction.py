@@ -0,0 +1,43 @@
+"""Order the sync change log by writing transaction
+
+Revision ID: c3f8a1d6e2b4
+Revises: a7c3e9d15b62
+Create Date: 2026-10-18 22:05:17.204913
+
+Entries written before this revision keep txid 0: their transactions have
+all ended, and they sort before every new entry, in id order as before.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6e2b4'
+down_revision = 'a7c3e9d15b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('txid', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.drop_index('idx_change_log_user_id')
+        batch_op.drop_index('idx_change_log_child_id')
+        batch_op.drop_index('idx_change_log_daycare_id')
+        batch_op.create_index('idx_change_log_position', ['txid', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_daycare_id', ['daycare_id', 'txid', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_child_id', ['child_id', 'txid', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_user_id', ['user_id', 'txid', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('idx_change_log_user_id')
+        batch_op.drop_index('idx_change_log_child_id')
+        batch_op.drop_index('idx_change_log_daycare_id')
+        batch_op.drop_index('idx_change_log_position')
+        batch_op.create_index('idx_change_log_daycare_id', ['daycare_id', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_child_id', ['child_id', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_user_id', ['user_id', 'id'], unique=False)
+        batch_op.drop_column('txid')
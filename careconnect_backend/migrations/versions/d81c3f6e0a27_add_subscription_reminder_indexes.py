@@ -0,0 +1,33 @@
+"""Index subscriptions by (status, end_date) and notifications for the reminder anti-join
+
+Revision ID: d81c3f6e0a27
+Revises: b4e7d2a9c315
+Create Date: 2026-10-18 14:52:16.904733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81c3f6e0a27'
+down_revision = 'b4e7d2a9c315'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('daycare_subscriptions', schema=None) as batch_op:
+        batch_op.create_index('idx_daycare_subscriptions_status_end_date', ['status', 'end_date'], unique=False)
+
+    with op.batch_alter_table('subscription_notifications', schema=None) as batch_op:
+        batch_op.create_index('idx_subscription_notifications_sub_type_date',
+                              ['subscription_id', 'notification_type', 'scheduled_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('subscription_notifications', schema=None) as batch_op:
+        batch_op.drop_index('idx_subscription_notifications_sub_type_date')
+
+    with op.batch_alter_table('daycare_subscriptions', schema=None) as batch_op:
+        batch_op.drop_index('idx_daycare_subscriptions_status_end_date')
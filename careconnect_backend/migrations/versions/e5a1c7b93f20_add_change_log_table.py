@@ -0,0 +1,43 @@
+"""Add change_log table for incremental client sync
+
+Revision ID: e5a1c7b93f20
+Revises: d81c3f6e0a27
+Create Date: 2026-10-18 21:10:42.518307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c7b93f20'
+down_revision = 'd81c3f6e0a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=8), nullable=False),
+    sa.Column('daycare_id', sa.Integer(), nullable=True),
+    sa.Column('child_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('idx_change_log_daycare_id', ['daycare_id', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_child_id', ['child_id', 'id'], unique=False)
+        batch_op.create_index('idx_change_log_user_id', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('idx_change_log_user_id')
+        batch_op.drop_index('idx_change_log_child_id')
+        batch_op.drop_index('idx_change_log_daycare_id')
+
+    op.drop_table('change_log')
@@ -0,0 +1,26 @@
+"""Index payments by (invoice_id, status) for invoice balances
+
+Revision ID: f2b8c6d41e97
+Revises: a93f4d2e6b18
+Create Date: 2026-10-18 12:41:09.552013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8c6d41e97'
+down_revision = 'a93f4d2e6b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('idx_payments_invoice_status', ['invoice_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('idx_payments_invoice_status')
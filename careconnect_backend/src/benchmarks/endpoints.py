@@ -0,0 +1,174 @@
+# src/benchmarks/endpoints.py
+"""
+Endpoint benchmarks against the current database, through the Flask test
+client (no network, no server), meant to be run on a dataset from
+src/seeders/seed_synthetic.py:
+
+    flask seed-synthetic --scale medium
+    flask benchmark --out bench/baseline.json
+    ...change things...
+    flask benchmark --out bench/after.json --compare bench/baseline.json
+
+Each endpoint is requested `warmup` times, then `iterations` times while
+timing the full response (streamed bodies included) and counting SQL
+statements at the engine. Results (p50/p95/max latency, statements per
+request, status) are written as JSON so two runs can be diffed.
+"""
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+from src.models.user import db, User, DaycareStaff, Parent
+from src.models.child import Child
+from src.models.stats import CounterHelper
+from src.seeders.seed_synthetic import SYNTHETIC_PASSWORD, HOSTER_EMAIL
+
+# name -> (account, path); paths may use {child_id}
+ENDPOINTS = {
+    'daycare_children_list': ('staff', '/api/daycare/children?limit=50'),
+    'daycare_child_detail': ('staff', '/api/daycare/children/{child_id}'),
+    'daycare_dashboard': ('staff', '/api/daycare/dashboard'),
+    'daycare_incidents': ('staff', '/api/daycare/incidents'),
+    'daycare_incidents_cursor': ('staff', '/api/daycare/incidents?cursor=&limit=50'),
+    'parent_dashboard': ('parent', '/api/parent/dashboard'),
+    'parent_invoices': ('parent', '/api/parent/invoices'),
+    'parent_invoices_cursor': ('parent', '/api/parent/invoices?cursor=&limit=50'),
+    'admin_dashboard': ('admin', '/admin'),
+    'admin_api_stats': ('admin', '/admin/api/stats'),
+    'admin_export_children_csv': ('admin', '/admin/export/children'),
+}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _clients(app):
+    """Signed-in test clients for the benchmark accounts"""
+    staff_user = db.session.query(User).join(DaycareStaff, DaycareStaff.user_id == User.id)\
+        .filter(DaycareStaff.role == 'owner', User.email.like('%@synthetic.test'))\
+        .order_by(DaycareStaff.id).first()
+    parent_user = db.session.query(User).join(Parent, Parent.user_id == User.id)\
+        .filter(User.email.like('%@synthetic.test')).order_by(Parent.id).first()
+    hoster = User.query.filter_by(email=HOSTER_EMAIL).first()
+    if not (staff_user and parent_user and hoster):
+        raise RuntimeError('No synthetic dataset found; run `flask seed-synthetic` first')
+
+    clients = {}
+    for account, user in (('staff', staff_user), ('parent', parent_user)):
+        client = app.test_client()
+        response = client.post('/api/auth/login', json={'email': user.email, 'password': SYNTHETIC_PASSWORD})
+        client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {response.get_json()['access_token']}"
+        clients[account] = client
+
+    admin = app.test_client()
+    with admin.session_transaction() as session:
+        session['admin_user_id'] = hoster.id
+    clients['admin'] = admin
+
+    staff = DaycareStaff.query.filter_by(user_id=staff_user.id).first()
+    child = Child.query.filter_by(daycare_id=staff.daycare_id).order_by(Child.id).first()
+    return clients, {'child_id': child.id if child else 0}
+
+
+def _measure(client, url, iterations, warmup, statements):
+    for _ in range(warmup):
+        client.get(url).close()
+
+    latencies, queries, status = [], [], None
+    for _ in range(iterations):
+        statements.clear()
+        started = time.perf_counter()
+        response = client.get(url)
+        response.get_data()  # drain streamed bodies
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(statements))
+        status = response.status_code
+        response.close()
+
+    return {
+        'path': url,
+        'status': status,
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(_percentile(latencies, 0.95), 2),
+        'max_ms': round(max(latencies), 2),
+        'queries': max(queries),
+    }
+
+
+def run(app, iterations=20, warmup=2, only=None):
+    """Benchmark every endpoint (or those named in `only`); returns the report dict"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(1)
+
+    with app.app_context():
+        clients, params = _clients(app)
+        dataset = CounterHelper.get_global()
+        engine = db.engine
+        dialect = engine.dialect.name
+
+    event.listen(engine, 'before_cursor_execute', count)
+    results = {}
+    try:
+        for name, (account, path) in ENDPOINTS.items():
+            if only and name not in only:
+                continue
+            client, url = clients[account], path.format(**params)
+            try:
+                results[name] = _measure(client, url, iterations, warmup, statements)
+            except Exception as exc:  # propagated in debug/testing mode; keep benchmarking the rest
+                results[name] = {'path': url, 'status': 500, 'error': repr(exc)}
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    return {
+        'generated_at': datetime.utcnow().isoformat(),
+        'git_commit': _git_commit(),
+        'database': dialect,
+        'iterations': iterations,
+        'dataset': dataset,
+        'endpoints': results,
+    }
+
+
+def compare(report, baseline):
+    """Lines describing how `report` differs from `baseline`, per endpoint"""
+    def change(old, new):
+        if not old:
+            return f'{new}'
+        return f'{old} -> {new} ({(new - old) / old * 100:+.0f}%)'
+
+    lines = []
+    for name, new in report['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(name)
+        if old is None:
+            lines.append(f'{name:<28} new endpoint')
+            continue
+        if 'error' in old or 'error' in new:
+            lines.append(f"{name:<28} {old.get('error', 'ok')} -> {new.get('error', 'ok')}")
+            continue
+        lines.append(f"{name:<28} p50 {change(old['p50_ms'], new['p50_ms'])}  "
+                     f"p95 {change(old['p95_ms'], new['p95_ms'])}  "
+                     f"queries {old['queries']} -> {new['queries']}")
+    return lines
+
+
+def write(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
@@ -0,0 +1,165 @@
+# src/cli.py
+"""`flask` commands, registered on the full app by create_app()"""
+import json
+import os
+import subprocess
+import sys
+
+import click
+
+from src.models.age_group import AgeGroupHelper
+from src.models.stats import CounterHelper
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(__file__))
+
+
+def register_commands(app):
+    # CLI: repair drift in the materialized counters (bulk writes bypass the session hooks)
+    @app.cli.command('reconcile-counters')
+    def reconcile_counters():
+        drift = CounterHelper.reconcile()
+        for daycare_id, name, stored, actual in drift:
+            scope = 'global' if daycare_id == 0 else f'daycare {daycare_id}'
+            print(f"{scope:<16} {name:<24} {stored} -> {actual}")
+        print(f"{len(drift)} counter(s) reconciled")
+
+    # CLI: nightly job moving enrolled children into the age group matching their age
+    @app.cli.command('rollover-age-groups')
+    @click.option('--dry-run', is_flag=True, help='Report the moves without writing them.')
+    @click.option('--daycare-id', type=int, default=None, help='Only process this daycare.')
+    @click.option('--as-of', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Compute ages on this date instead of today.')
+    def rollover_age_groups(dry_run, daycare_id, as_of):
+        report = AgeGroupHelper.rollover_age_groups(
+            as_of=as_of.date() if as_of else None, dry_run=dry_run, daycare_id=daycare_id
+        )
+        for move in report['moves']:
+            print(f"daycare {move['daycare_id']:<8} group {move['from_age_group_id']} -> "
+                  f"{move['to_age_group_id']}: {move['children']} child(ren)")
+        print(f"{'[dry run] ' if dry_run else ''}{report['children_changed']} of "
+              f"{report['children_scanned']} enrolled children in {report['daycares']} daycare(s) "
+              f"moved as of {report['as_of']} ({report['children_unmatched']} matched no group)")
+
+    # CLI: bulk-load a reproducible synthetic dataset (see src/seeders/seed_synthetic.py)
+    @app.cli.command('seed-synthetic')
+    @click.option('--scale', type=click.Choice(['small', 'medium', 'large']), default='small')
+    @click.option('--seed', type=int, default=42, help='Random seed; same seed, same dataset.')
+    @click.option('--batch-size', type=int, default=5000, help='Rows per bulk insert.')
+    @click.option('--daycares', type=int, default=None, help='Override the scale\'s daycare count.')
+    @click.option('--children-per-daycare', type=int, default=None)
+    def seed_synthetic(scale, seed, batch_size, daycares, children_per_daycare):
+        from src.seeders import seed_synthetic as generator
+        totals = generator.run(scale=scale, seed=seed, batch_size=batch_size,
+                               daycares=daycares, children_per_daycare=children_per_daycare)
+        for table, rows in totals.items():
+            print(f"{table:<32} {rows}")
+
+    # CLI: time the key endpoints against the current database and save a JSON baseline.
+    # Runs outside an app context so each test-client request gets a fresh `g`.
+    @app.cli.command('benchmark', with_appcontext=False)
+    @click.option('--iterations', type=int, default=20)
+    @click.option('--warmup', type=int, default=2)
+    @click.option('--out', type=click.Path(dir_okay=False), default=None, help='Write the report here.')
+    @click.option('--compare', type=click.Path(exists=True, dir_okay=False), default=None,
+                  help='Baseline report to diff against.')
+    def benchmark(iterations, warmup, out, compare):
+        from src.benchmarks import endpoints
+        report = endpoints.run(app, iterations=iterations, warmup=warmup)
+        for name, stats in report['endpoints'].items():
+            if 'error' in stats:
+                print(f"{name:<28} failed: {stats['error']}")
+                continue
+            print(f"{name:<28} {stats['status']}  p50 {stats['p50_ms']:>8} ms  "
+                  f"p95 {stats['p95_ms']:>8} ms  {stats['queries']} queries")
+        if compare:
+            with open(compare) as f:
+                print('\n'.join(endpoints.compare(report, json.load(f))))
+        if out:
+            endpoints.write(report, out)
+            print(f"Report written to {out}")
+
+    # CLI: write .gz/.br next to the frontend build's files (run after `npm run build` + copy)
+    @app.cli.command('precompress-static', with_appcontext=False)
+    @click.option('--min-size', type=int, default=1024, help='Skip files smaller than this (bytes).')
+    def precompress_static(min_size):
+        from src.utils import static_assets
+        written = static_assets.precompress(app.static_folder, min_size=min_size)
+        for path in written:
+            print(path)
+        print(f"{len(written)} precompressed file(s) written")
+
+    # CLI: run background job workers (see src/jobs/worker.py)
+    @app.cli.command('jobs-worker', with_appcontext=False)
+    @click.option('--queue', '-q', 'queues', multiple=True, default=('default',), help='Queue to poll (repeatable).')
+    @click.option('--processes', type=int, default=1, help='Worker processes to run.')
+    @click.option('--poll-interval', type=float, default=1.0, help='Seconds to wait when no job is runnable.')
+    @click.option('--batch-size', type=int, default=1, help='Jobs claimed per poll.')
+    @click.option('--burst', is_flag=True, help='Exit once the queues are empty.')
+    def jobs_worker(queues, processes, poll_interval, batch_size, burst):
+        from src.jobs.worker import run_workers
+        processed = run_workers(app, processes=processes, queues=queues, poll_interval=poll_interval,
+                                batch_size=batch_size, burst=burst)
+        print(f"{processed} job(s) processed")
+
+    # CLI: queue a task run, e.g. from cron: flask jobs-enqueue subscriptions.create_reminders --key reminders:2026-10-18
+    @app.cli.command('jobs-enqueue')
+    @click.argument('task_name')
+    @click.option('--payload', default='{}', help='Task arguments as a JSON object.')
+    @click.option('--key', default=None, help='Idempotency key; an existing job with it is reused.')
+    def jobs_enqueue(task_name, payload, key):
+        from src.jobs.tasks import TASKS, enqueue
+        if task_name not in TASKS:
+            raise click.BadParameter(f"unknown task (one of {', '.join(sorted(TASKS))})", param_hint='TASK_NAME')
+        job = enqueue(task_name, json.loads(payload), idempotency_key=key)
+        print(f"job {job.id} {job.task} {job.status}")
+
+    # CLI: job counts per queue and status
+    @app.cli.command('jobs-status')
+    def jobs_status():
+        from src.models.job import JobHelper
+        for queue, stats in sorted(JobHelper.queue_stats().items()):
+            counts = '  '.join(f"{status} {stats.get(status, 0)}" for status in ('queued', 'running', 'done', 'failed'))
+            print(f"{queue:<16} {counts}  oldest runnable {stats.get('oldest_runnable') or '-'}")
+
+    # CLI: rebuild the full-text search index (after bulk loads such as seed-synthetic)
+    @app.cli.command('reindex-search')
+    def reindex_search():
+        from src.models.search import SearchHelper
+        for entity, count in SearchHelper.rebuild().items():
+            print(f"{entity:<10} {count} document(s)")
+
+    # CLI: drop old sync change log entries; clients with an older cursor must download the listings again
+    @app.cli.command('prune-change-log')
+    @click.option('--days', type=int, default=30, help='Keep entries from the last N days.')
+    def prune_change_log(days):
+        from datetime import datetime, timedelta
+        from src.models.sync import ChangeLogHelper
+        count = ChangeLogHelper.prune(datetime.utcnow() - timedelta(days=days))
+        print(f"{count} change log entr{'y' if count == 1 else 'ies'} pruned")
+
+    # CLI: cold-start profile of create_app() in a fresh interpreter (python -X importtime)
+    @app.cli.command('import-times', with_appcontext=False)
+    @click.option('--profile', default=None, help='Configuration profile (default: APP_ENV).')
+    @click.option('--top', type=int, default=20, help='Number of slowest imports to list.')
+    def import_times(profile, top):
+        code = ('import json; from src.factory import create_app; '
+                f"print(json.dumps(create_app({profile!r}).extensions['startup_timings']))")
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=PROJECT_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise click.ClickException(result.stderr.strip().splitlines()[-1])
+
+        # stderr lines: "import time: <self us> | <cumulative us> | <indented module>"
+        imports = []
+        for line in result.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                imports.append((int(parts[1]), parts[2].strip()))
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+
+        print(f"create_app: {timings['total_ms']:.1f} ms")
+        for step, ms in timings['steps'].items():
+            print(f"  {step:<28} {ms:>9.1f} ms")
+        print("Slowest imports (cumulative):")
+        for cumulative, module in sorted(imports, reverse=True)[:top]:
+            print(f"  {module:<40} {cumulative / 1000:>9.1f} ms")
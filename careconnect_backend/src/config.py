@@ -0,0 +1,83 @@
+# src/config.py
+"""
+Configuration profiles for create_app() (src/factory.py).
+
+The profile is chosen by APP_ENV (falling back to FLASK_ENV), or passed to
+create_app() by name or as a class. Values that differ per deployment come
+from the environment, as before.
+"""
+import os
+from datetime import timedelta
+
+BASE_DIR = os.path.dirname(__file__)
+
+
+class Config:
+    DEBUG = False
+    TESTING = False
+
+    # Core settings
+    SECRET_KEY = os.getenv('SECRET_KEY', 'careconnect-secret-key-change-in-production')
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+
+    # Database
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL',
+        f"sqlite:///{os.path.join(BASE_DIR, 'database', 'app.db')}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Request/SQL instrumentation (X-DB-* headers are for development only)
+    SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 5))
+    INSTRUMENTATION_HEADERS = True
+    METRICS_DIR = os.getenv('METRICS_DIR')  # shared by gunicorn workers
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Optional blueprints to mount (names from factory.OPTIONAL_BLUEPRINTS),
+    # and those among them that are imported on their first request only
+    OPTIONAL_BLUEPRINTS = ('admin_web',)
+    LAZY_BLUEPRINTS = ()
+
+    # Response compression (utils/compression.py); bodies smaller than this go out as is
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+
+    # Background jobs (src/jobs): where `exports.write` puts its files
+    EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(BASE_DIR, 'database', 'exports'))
+
+    # Log how long each startup step took (also kept in app.extensions['startup_timings'])
+    LOG_STARTUP_TIMINGS = False
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    LOG_STARTUP_TIMINGS = True
+
+
+class ProductionConfig(Config):
+    INSTRUMENTATION_HEADERS = False
+    LAZY_BLUEPRINTS = ('admin_web',)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    OPTIONAL_BLUEPRINTS = ()
+    BCRYPT_LOG_ROUNDS = 4  # fast password hashing for test users
+    METRICS_DIR = None
+
+
+PROFILES = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for `name`, or for APP_ENV/FLASK_ENV when not given"""
+    name = name or os.getenv('APP_ENV') or os.getenv('FLASK_ENV') or 'development'
+    if name not in PROFILES:
+        raise ValueError(f"Unknown configuration profile '{name}' (expected one of {', '.join(PROFILES)})")
+    return PROFILES[name]
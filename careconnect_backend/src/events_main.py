@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.factory import create_app
+
+# gunicorn entry point for a process serving only GET /api/events (long-lived
+# streams), e.g. gunicorn -k gthread --threads 200 src.events_main:app
+app = create_app(blueprints=('events',))
@@ -0,0 +1,323 @@
+# src/factory.py
+"""
+Application factory.
+
+    from src.factory import create_app
+    app = create_app()                 # profile from APP_ENV
+    app = create_app('testing')        # in-memory SQLite, no optional blueprints
+
+Blueprints in BLUEPRINTS are always mounted. Those in OPTIONAL_BLUEPRINTS
+are mounted when named in the OPTIONAL_BLUEPRINTS setting, and if also
+named in LAZY_BLUEPRINTS they are not imported at startup: requests under
+their prefix go to a small app holding only that blueprint, built on the
+first such request (see LazyBlueprintDispatcher). The admin console is the
+main case: it pulls in the export stack (pyarrow included) that API
+workers rarely need. The lazily built app has its own engine/pool, created
+from the same settings.
+
+Flask-Migrate is only set up when the app is loaded by the flask CLI.
+
+Each startup step (model imports, every blueprint import, extension setup)
+is timed into app.extensions['startup_timings'] and logged when
+LOG_STARTUP_TIMINGS is on; `flask import-times` profiles a cold start in a
+fresh interpreter.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from dotenv import load_dotenv
+from flask import Flask, Response, request
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+
+load_dotenv()
+
+from src.config import PROFILES, get_config  # noqa: E402  (reads the environment loaded above)
+from src.utils.json_provider import FastJSONProvider  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+# Imported before any blueprint so every mapper and relationship target exists
+MODEL_MODULES = (
+    'src.models.user',
+    'src.models.child',
+    'src.models.incident',
+    'src.models.payment',
+    'src.models.activity',
+    'src.models.age_group',
+    'src.models.subscription',
+    'src.models.allergy',
+    'src.models.emergency_contact',
+    'src.models.access_permission',
+    'src.models.stats',
+    'src.models.job',
+    'src.models.sync',
+    'src.models.search',
+)
+
+BlueprintSpec = namedtuple('BlueprintSpec', 'module attribute url_prefix mount')
+
+# name -> spec, in registration order
+BLUEPRINTS = {
+    'auth': BlueprintSpec('src.routes.auth', 'auth_bp', '/api/auth', None),
+    'admin': BlueprintSpec('src.routes.admin', 'admin_bp', '/api/admin', None),
+    'daycare': BlueprintSpec('src.routes.daycare', 'daycare_bp', '/api/daycare', None),
+    'parent': BlueprintSpec('src.routes.parent', 'parent_bp', '/api/parent', None),
+    'public': BlueprintSpec('src.routes.public', 'public_bp', '/api/public', None),
+    'children': BlueprintSpec('src.routes.children', 'children_bp', '/api/daycare/children', None),
+    'age_groups': BlueprintSpec('src.routes.age_groups', 'age_groups_bp', '/api/daycare/age-groups', None),
+    'allergies': BlueprintSpec('src.routes.allergies', 'allergies_bp', None, None),
+    'subscription': BlueprintSpec('src.routes.subscriptions', 'subscription_bp', '/api/subscription', None),
+    'sync': BlueprintSpec('src.routes.sync', 'sync_bp', '/api/sync', None),
+    'events': BlueprintSpec('src.routes.events', 'events_bp', '/api/events', None),
+}
+
+# `mount` is the path prefix owning every route of the blueprint (used for lazy loading)
+OPTIONAL_BLUEPRINTS = {
+    'admin_web': BlueprintSpec('src.routes.admin_web', 'admin_web_bp', None, '/admin'),
+    'account': BlueprintSpec('src.routes.account', 'account_bp', '/api/account', '/api/account'),
+}
+
+jwt = JWTManager()
+
+
+class StartupTimer:
+    """Wall time of each named startup step, in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = {}
+
+    @contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def report(self):
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'steps': self.steps,
+        }
+
+
+def _load_blueprint(spec):
+    return getattr(importlib.import_module(spec.module), spec.attribute)
+
+
+class LazyBlueprintDispatcher:
+    """
+    WSGI middleware sending requests under a lazy blueprint's mount prefix
+    to an app built (once, on first use) with just that blueprint; anything
+    else goes to the wrapped app.
+    """
+
+    def __init__(self, app, config, overrides, names):
+        self.wsgi_app = app.wsgi_app
+        self.timings = app.extensions['startup_timings']
+        self.config = config
+        self.overrides = overrides
+        self.mounts = {OPTIONAL_BLUEPRINTS[name].mount: name for name in names}
+        self.apps = {}
+        self.lock = threading.Lock()
+
+    def _app_for(self, name):
+        app = self.apps.get(name)
+        if app is None:
+            with self.lock:
+                app = self.apps.get(name)
+                if app is None:
+                    started = time.perf_counter()
+                    app = create_app(self.config, blueprints=(name,), overrides=self.overrides)
+                    elapsed = round((time.perf_counter() - started) * 1000, 2)
+                    self.timings['steps'][f'lazy:{name}'] = elapsed
+                    logger.info('Loaded lazy blueprint %s in %.1f ms', name, elapsed)
+                    self.apps[name] = app
+        return app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        for mount, name in self.mounts.items():
+            if path == mount or path.startswith(mount + '/'):
+                return self._app_for(name)(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+
+def create_app(config=None, blueprints=None, overrides=None):
+    """
+    Build the Flask app.
+
+    config: profile name ('development', 'production', 'testing') or a config
+        class; defaults to APP_ENV
+    blueprints: names to register instead of the full set (no core routes,
+        CLI commands or lazy mounts); used for lazily loaded blueprints and
+        slimmed test apps
+    overrides: mapping applied on top of the profile
+    """
+    timer = StartupTimer()
+    if config is None or isinstance(config, str):
+        config = get_config(config)
+
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.json = FastJSONProvider(app)
+    app.config.from_object(config)
+    if overrides:
+        app.config.update(overrides)
+    # what this app was built from, for processes that must build the same one (jobs workers)
+    profile = next((name for name, profile_class in PROFILES.items() if profile_class is config), config)
+    app.extensions['app_profile'] = (profile, dict(overrides or {}))
+    app.extensions['startup_timings'] = timer.report()
+
+    with timer.step('models'):
+        for module in MODEL_MODULES:
+            importlib.import_module(module)
+
+    with timer.step('extensions'):
+        _init_extensions(app, 'default' if blueprints is None else '+'.join(blueprints))
+
+    if blueprints is None:
+        enabled = [name for name in OPTIONAL_BLUEPRINTS if name in app.config['OPTIONAL_BLUEPRINTS']]
+        lazy = [name for name in enabled if name in app.config['LAZY_BLUEPRINTS']]
+        specs = dict(BLUEPRINTS, **{name: OPTIONAL_BLUEPRINTS[name] for name in enabled if name not in lazy})
+    else:
+        lazy = []
+        specs = {name: BLUEPRINTS.get(name) or OPTIONAL_BLUEPRINTS[name] for name in blueprints}
+
+    for name, spec in specs.items():
+        with timer.step(f'blueprint:{name}'):
+            app.register_blueprint(_load_blueprint(spec), url_prefix=spec.url_prefix)
+
+    if blueprints is None:
+        with timer.step('routes'):
+            _register_core_routes(app)
+            from src.cli import register_commands
+            register_commands(app)
+        if lazy:
+            app.wsgi_app = LazyBlueprintDispatcher(app, config, overrides, lazy)
+
+    app.extensions['startup_timings'].update(timer.report())
+    if app.config['LOG_STARTUP_TIMINGS'] and blueprints is None:
+        report = app.extensions['startup_timings']
+        app.logger.info('App created in %.1f ms (%s)', report['total_ms'],
+                        ', '.join(f'{step} {ms:.1f}' for step, ms in report['steps'].items()))
+    return app
+
+
+def _init_extensions(app, pool_name):
+    from src.models.user import db, bcrypt
+    from src.utils import compression, events, instrumentation, metrics
+    import src.utils.principal  # noqa: F401  (token revocation hooks)
+
+    db.init_app(app)
+    # Alembic (~100 ms of imports) only serves `flask db ...`: register it when
+    # the app is being loaded by the flask CLI, not in web workers or tests
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    bcrypt.init_app(app)
+    jwt.init_app(app)
+    CORS(app, origins="*", expose_headers=['X-DB-Query-Count', 'X-DB-Time-Ms', 'X-Response-Time-Ms', 'X-DB-Repeated-Statements',
+                                      'X-Changed-Collections'])
+    instrumentation.init_app(app)
+    metrics.init_app(app)
+    compression.init_app(app)
+    events.init_app(app)
+    metrics.register_collector(background_job_gauges)
+    with app.app_context():
+        metrics.watch_pool(db.engine, pool_name)
+
+
+def background_job_gauges():
+    from src.models.job import JobHelper
+    from src.models.subscription import SubscriptionHelper
+
+    now = datetime.utcnow()
+    pending, oldest = SubscriptionHelper.notification_backlog()
+    lag = (now - datetime.combine(oldest, datetime.min.time())).total_seconds() if oldest else 0
+    gauges = [
+        ('notifications_due', 'Notifications due but not sent yet', {}, pending),
+        ('notification_job_lag_seconds', 'Age of the oldest due, unsent notification', {}, max(lag, 0)),
+    ]
+    for queue, stats in JobHelper.queue_stats().items():
+        for status in ('queued', 'running', 'failed'):
+            gauges.append(('jobs', 'Background jobs by queue and status', {'queue': queue, 'status': status},
+                           stats.get(status, 0)))
+        oldest_runnable = stats.get('oldest_runnable')
+        gauges.append(('job_queue_lag_seconds', 'How long the oldest runnable job has been waiting',
+                       {'queue': queue}, max((now - oldest_runnable).total_seconds(), 0) if oldest_runnable else 0))
+    return gauges
+
+
+# JWT error handlers
+@jwt.invalid_token_loader
+def invalid_token_callback(error):
+    return {'error': {'code': 'INVALID_TOKEN', 'message': 'Invalid token'}}, 401
+
+@jwt.unauthorized_loader
+def missing_token_callback(error):
+    return {'error': {'code': 'AUTHENTICATION_REQUIRED', 'message': 'Authentication token required'}}, 401
+
+@jwt.expired_token_loader
+def expired_token_callback(jwt_header, jwt_payload):
+    return {'error': {'code': 'TOKEN_EXPIRED', 'message': 'Token has expired'}}, 401
+
+@jwt.token_in_blocklist_loader
+def token_revoked_check(jwt_header, jwt_payload):
+    from src.utils.principal import is_token_revoked
+    return is_token_revoked(jwt_payload)
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    return {'error': {'code': 'TOKEN_REVOKED', 'message': 'Token has been revoked'}}, 401
+
+@jwt.token_verification_loader
+def token_scope_check(jwt_header, jwt_payload):
+    from src.utils.events import STREAM_SCOPE
+    # stream tokens (utils/events.py) only open the event stream
+    return jwt_payload.get('scope') != STREAM_SCOPE or request.endpoint == 'events.event_stream'
+
+@jwt.token_verification_failed_loader
+def token_scope_failed_callback(jwt_header, jwt_payload):
+    return {'error': {'code': 'INVALID_TOKEN', 'message': 'This token only opens the event stream'}}, 401
+
+
+def _register_core_routes(app):
+    from src.models.user import db
+    from src.utils import metrics, static_assets
+
+    # Prometheus scrape endpoint
+    @app.route('/metrics')
+    def prometheus_metrics():
+        token = app.config['METRICS_TOKEN']
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    # Health check endpoint
+    @app.route('/api/health')
+    def health_check():
+        return {
+            'status': 'healthy',
+            'timestamp': db.func.now(),
+            'version': '1.0.0'
+        }
+
+    # Serve React frontend (from the startup manifest, see utils/static_assets.py)
+    static_assets.init_app(app)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        response = static_assets.serve(path)
+        if response is None:
+            return "index.html not found", 404
+        return response
@@ -0,0 +1,81 @@
+# src/jobs/tasks.py
+"""
+Background tasks, run by `flask jobs-worker` (src/jobs/worker.py).
+
+A task is a function registered under a name with @task; it receives the
+job payload as keyword arguments and may return a JSON-serializable result
+that is stored on the job. Anything it raises fails the attempt and the job
+is retried with backoff (models/job.py). Tasks can run more than once for
+the same job (a worker may die after the work but before recording it), so
+each one must be safe to repeat.
+
+    enqueue('notifications.deliver', {'notification_id': 12},
+            idempotency_key='notification:12')
+"""
+import os
+from collections import namedtuple
+from datetime import datetime
+
+from flask import current_app
+
+from src.models.job import JobHelper
+
+TaskSpec = namedtuple('TaskSpec', 'func queue max_attempts')
+
+# name -> TaskSpec
+TASKS = {}
+
+
+def task(name, queue='default', max_attempts=5):
+    """Register the decorated function as the task `name`"""
+    def decorator(func):
+        TASKS[name] = TaskSpec(func, queue, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, run_at=None, commit=True):
+    """Queue a run of task `name` on its queue; see JobHelper.enqueue"""
+    spec = TASKS[name]
+    return JobHelper.enqueue(name, payload, idempotency_key=idempotency_key, queue=spec.queue,
+                             run_at=run_at, max_attempts=spec.max_attempts, commit=commit)
+
+
+@task('notifications.dispatch_due')
+def dispatch_due_notifications():
+    from src.models.subscription import SubscriptionHelper
+    return {'queued': SubscriptionHelper.queue_due_notifications()}
+
+
+@task('notifications.deliver', max_attempts=8)
+def deliver_notification(notification_id):
+    from src.models.subscription import SubscriptionHelper
+    return {'sent': SubscriptionHelper.deliver_notification(notification_id)}
+
+
+@task('subscriptions.create_reminders')
+def create_reminders():
+    from src.models.subscription import SubscriptionHelper
+    SubscriptionHelper.check_and_create_reminders()
+    return {'queued': SubscriptionHelper.queue_due_notifications()}
+
+
+@task('exports.write', queue='exports', max_attempts=3)
+def write_export(entity_type, format='csv', since=None):
+    """Write an admin export to EXPORT_DIR; returns the file path and size"""
+    from src.utils.export import EXPORTS, EXPORT_FORMATS, resolve_format, stream_export
+
+    spec, fmt = EXPORTS.get(entity_type), resolve_format(format)
+    if spec is None or fmt is None:
+        raise ValueError(f'Unknown export {entity_type!r} ({format})')
+
+    directory = current_app.config['EXPORT_DIR']
+    os.makedirs(directory, exist_ok=True)
+    started = datetime.utcnow()
+    path = os.path.join(directory, f'{entity_type}_export_{started:%Y%m%d_%H%M%S}.{EXPORT_FORMATS[fmt][1]}')
+    # written under a temporary name so a retried attempt never leaves half a file behind
+    with open(path + '.part', 'wb') as f:
+        for chunk in stream_export(spec, fmt, datetime.fromisoformat(since) if since else None):
+            f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    os.replace(path + '.part', path)
+    return {'path': path, 'bytes': os.path.getsize(path), 'format': fmt, 'watermark': started.isoformat()}
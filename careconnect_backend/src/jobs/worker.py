@@ -0,0 +1,157 @@
+# src/jobs/worker.py
+"""
+Job worker: claims runnable jobs from the `jobs` table and runs their task.
+
+    flask jobs-worker                          # one process, queue 'default'
+    flask jobs-worker -q default -q exports --processes 4
+    flask jobs-worker --burst                  # drain the queues, then exit
+
+Throughput scales with the number of worker processes (on any number of
+hosts): on PostgreSQL each claim skips rows other workers hold locked.
+While a batch runs, a heartbeat thread keeps its jobs' locks fresh, so a
+long task is not mistaken for one whose worker died.
+SIGTERM/SIGINT let the job in progress finish before the process exits.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from src.jobs.tasks import TASKS
+from src.models.job import HEARTBEAT_INTERVAL, JobHelper
+from src.models.user import db
+
+logger = logging.getLogger(__name__)
+
+# how often (in idle polls) a worker puts back jobs abandoned by dead workers
+STALE_CHECK_EVERY = 60
+
+
+class Heartbeat:
+    """Context manager refreshing the worker's job locks every `interval` seconds while open"""
+
+    def __init__(self, app, worker_id, interval=HEARTBEAT_INTERVAL):
+        self.app = app
+        self.worker_id = worker_id
+        self.interval = interval
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='job-heartbeat', daemon=True)
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    JobHelper.heartbeat(self.worker_id)
+            except Exception:
+                logger.exception('Job heartbeat of %s failed', self.worker_id)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.done.set()
+        self.thread.join()
+
+
+class Worker:
+    def __init__(self, app, queues=('default',), poll_interval=1.0, batch_size=1):
+        self.app = app
+        self.queues = tuple(queues)
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        self.processed = 0
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def execute(self, job):
+        spec = TASKS.get(job.task)
+        started = time.perf_counter()
+        try:
+            if spec is None:
+                raise LookupError(f'Unknown task {job.task!r}')
+            result = spec.func(**job.get_payload())
+        except Exception:
+            db.session.rollback()
+            logger.exception('Job %s (%s) failed, attempt %s of %s',
+                             job.id, job.task, job.attempts, job.max_attempts)
+            JobHelper.fail(job, traceback.format_exc(limit=20))
+            return False
+        JobHelper.complete(job, result)
+        logger.info('Job %s (%s) done in %.1f ms', job.id, job.task, (time.perf_counter() - started) * 1000)
+        return True
+
+    def run_once(self):
+        """Claim and run one batch; returns how many jobs were claimed"""
+        with self.app.app_context():
+            jobs = JobHelper.claim(self.worker_id, self.queues, self.batch_size)
+            if jobs:
+                with Heartbeat(self.app, self.worker_id):
+                    for job in jobs:
+                        self.execute(job)
+                        self.processed += 1
+            return len(jobs)
+
+    def requeue_stale(self):
+        with self.app.app_context():
+            requeued, failed = JobHelper.requeue_stale()
+        if requeued:
+            logger.warning('Requeued %s job(s) abandoned by dead workers', requeued)
+        if failed:
+            logger.warning('Failed %s job(s) whose last attempt lost its worker', failed)
+
+    def run(self, burst=False):
+        """Work until stopped (or, with burst, until no job is runnable); returns jobs processed"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info('Worker %s polling %s', self.worker_id, ', '.join(self.queues))
+        self.requeue_stale()
+        idle = 0
+        while not self.stopping:
+            if self.run_once():
+                idle = 0
+                continue
+            if burst:
+                break
+            idle += 1
+            if idle % STALE_CHECK_EVERY == 0:
+                self.requeue_stale()
+            time.sleep(self.poll_interval)
+        return self.processed
+
+
+def _run_process(profile, overrides, queues, poll_interval, batch_size, burst):
+    # spawned interpreter: build a fresh app (own engine and pool) for this process
+    from src.factory import create_app
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(message)s')
+    Worker(create_app(profile, overrides=overrides), queues, poll_interval, batch_size).run(burst)
+
+
+def run_workers(app, processes=1, queues=('default',), poll_interval=1.0, batch_size=1, burst=False):
+    """
+    Run `processes` workers; the first in this process, the others spawned
+    with the profile and overrides `app` was built from, so every worker
+    uses the same database and settings
+    """
+    profile, overrides = app.extensions['app_profile']
+    context = multiprocessing.get_context('spawn')
+    children = [
+        context.Process(target=_run_process,
+                        args=(profile, overrides, queues, poll_interval, batch_size, burst))
+        for _ in range(processes - 1)
+    ]
+    for child in children:
+        child.start()
+    processed = Worker(app, queues, poll_interval, batch_size).run(burst)
+    for child in children:
+        if not burst:
+            child.terminate()  # SIGTERM: finish the current job, then exit
+        child.join()
+    return processed
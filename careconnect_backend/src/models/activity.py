@@ -39,7 +39,7 @@ class Activity(db.Model):
             'materials_needed': self.materials_needed,
             'learning_objectives': self.learning_objectives,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class ChildActivityParticipation(db.Model):
@@ -60,6 +60,10 @@ class ChildActivityParticipation(db.Model):
     # Relationships
     recorder = db.relationship('DaycareStaff', backref='recorded_participations', foreign_keys=[recorded_by])
     
+    __table_args__ = (
+        db.Index('idx_participation_child_created', 'child_id', 'created_at', 'id'),
+    )
+    
     def get_photos(self):
         return json.loads(self.photos) if self.photos else []
     
@@ -71,14 +75,14 @@ class ChildActivityParticipation(db.Model):
             'id': self.id,
             'child_id': self.child_id,
             'activity_id': self.activity_id,
-            'participation_date': self.participation_date.isoformat() if self.participation_date else None,
-            'start_time': self.start_time.isoformat() if self.start_time else None,
-            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'participation_date': self.participation_date,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
             'participation_level': self.participation_level,
             'notes': self.notes,
             'photos': self.get_photos(),
             'recorded_by': self.recorded_by,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class Message(db.Model):
@@ -119,9 +123,9 @@ class Message(db.Model):
             'message_type': self.message_type,
             'priority': self.priority,
             'is_read': self.is_read,
-            'read_at': self.read_at.isoformat() if self.read_at else None,
+            'read_at': self.read_at,
             'attachments': self.get_attachments(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class AuditLog(db.Model):
@@ -164,7 +168,7 @@ class AuditLog(db.Model):
             'new_values': self.get_new_values(),
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class SystemSetting(db.Model):
@@ -197,7 +201,7 @@ class SystemSetting(db.Model):
             'setting_type': self.setting_type,
             'description': self.description,
             'is_public': self.is_public,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
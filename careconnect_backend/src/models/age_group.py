@@ -1,7 +1,17 @@
 # src/models/age_group.py 
+from bisect import bisect_right
+from calendar import monthrange
+from collections import Counter, defaultdict
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
 from src.models.user import db
+from src.utils.cache import TTLCache
+
+AGE_GROUP_INDEX_TTL = 300  # seconds; writes in this process invalidate immediately
+ROLLOVER_DAYCARE_BATCH = 200  # daycares processed (and committed) per round
+
+_age_group_indexes = TTLCache(AGE_GROUP_INDEX_TTL)  # daycare_id -> AgeGroupIndex
 
 class AgeGroup(db.Model):
     """
@@ -47,10 +57,96 @@ class AgeGroup(db.Model):
             'is_active': self.is_active,
             'is_standard': self.is_standard,
             'children_count': self.children.count() if self.children else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
+class AgeGroupIndex:
+    """
+    A daycare's active age groups flattened into disjoint month ranges, so
+    resolving an age is a bisect. Where ranges overlap, custom groups win
+    over standard ones (lowest id first within each kind).
+    """
+    
+    def __init__(self, groups):
+        # groups: (id, min_age_months, max_age_months, is_custom)
+        ranked = sorted(groups, key=lambda g: (not g[3], g[0]))
+        bounds = sorted({g[1] for g in groups} |
+                        {g[2] + 1 for g in groups if g[2] is not None})
+        
+        self.starts, self.ends, self.group_ids = [], [], []
+        for i, start in enumerate(bounds):
+            end = bounds[i + 1] if i + 1 < len(bounds) else None  # None = no upper limit
+            winner = next((gid for gid, lo, hi, _ in ranked
+                           if lo <= start and (hi is None or start <= hi)), None)
+            if winner is None:
+                continue
+            if self.group_ids and self.group_ids[-1] == winner and self.ends[-1] == start:
+                self.ends[-1] = end
+                continue
+            self.starts.append(start)
+            self.ends.append(end)
+            self.group_ids.append(winner)
+    
+    def lookup(self, age_months):
+        """Id of the age group covering `age_months`, or None"""
+        if age_months is None:
+            return None
+        i = bisect_right(self.starts, age_months) - 1
+        if i < 0:
+            return None
+        if self.ends[i] is not None and age_months >= self.ends[i]:
+            return None
+        return self.group_ids[i]
+    
+    @classmethod
+    def load(cls, daycare_id):
+        rows = db.session.query(
+            AgeGroup.id, AgeGroup.min_age_months, AgeGroup.max_age_months, AgeGroup.daycare_id
+        ).filter(
+            AgeGroup.is_active == True,
+            or_(
+                and_(AgeGroup.is_standard == True, AgeGroup.daycare_id.is_(None)),
+                and_(AgeGroup.is_standard == False, AgeGroup.daycare_id == daycare_id)
+            )
+        ).all()
+        return cls([(r.id, r.min_age_months, r.max_age_months, r.daycare_id is not None) for r in rows])
+    
+    @classmethod
+    def load_all(cls):
+        """
+        Indexes for every daycare with custom groups, plus the standard-only
+        index used by all the others, from a single query
+        """
+        rows = db.session.query(
+            AgeGroup.id, AgeGroup.min_age_months, AgeGroup.max_age_months,
+            AgeGroup.daycare_id, AgeGroup.is_standard
+        ).filter(AgeGroup.is_active == True).all()
+        
+        standard = [(r.id, r.min_age_months, r.max_age_months, False)
+                    for r in rows if r.is_standard and r.daycare_id is None]
+        custom = defaultdict(list)
+        for r in rows:
+            if not r.is_standard and r.daycare_id is not None:
+                custom[r.daycare_id].append((r.id, r.min_age_months, r.max_age_months, True))
+        
+        indexes = {daycare_id: cls(standard + groups) for daycare_id, groups in custom.items()}
+        return indexes, cls(standard)
+    
+    @staticmethod
+    def for_daycare(daycare_id):
+        """Cached index for a daycare (standard groups plus its custom ones)"""
+        return _age_group_indexes.get_or_set(daycare_id, lambda: AgeGroupIndex.load(daycare_id))
+    
+    @staticmethod
+    def invalidate(daycare_id=None):
+        """Drop one daycare's index, or every index when standard groups change"""
+        if daycare_id is None:
+            _age_group_indexes.clear()
+        else:
+            _age_group_indexes.invalidate(daycare_id)
+
+
 class AgeGroupHelper:
     """Helper class for age group calculations and management"""
     
@@ -122,9 +218,98 @@ class AgeGroupHelper:
         if isinstance(birth_date, str):
             birth_date = datetime.strptime(birth_date, '%Y-%m-%d').date()
         
-        # Calculate the difference
-        delta = relativedelta(today, birth_date)
-        return delta.years * 12 + delta.months
+        return AgeGroupHelper.age_in_months_on(birth_date, today)
+    
+    @staticmethod
+    def age_in_months_on(birth_date, as_of):
+        """
+        Whole months elapsed between birth_date and as_of (what
+        relativedelta's years * 12 + months gives), where a birthday on the
+        31st counts as reached on the last day of shorter months
+        """
+        months = (as_of.year - birth_date.year) * 12 + (as_of.month - birth_date.month)
+        if as_of.day < min(birth_date.day, monthrange(as_of.year, as_of.month)[1]):
+            months -= 1
+        return months
+    
+    @staticmethod
+    def rollover_age_groups(as_of=None, dry_run=False, daycare_id=None):
+        """
+        Move enrolled children whose age has crossed into another group.
+        
+        Daycares are processed ROLLOVER_DAYCARE_BATCH at a time: one query
+        reads (id, date_of_birth, daycare_id, age_group_id) for all their
+        enrolled children, ages and target groups are computed in memory,
+        and each (daycare, target group) gets one bulk UPDATE covering only
+        the children that actually change. Children matching no group keep
+        their current one, as in Child.calculate_and_assign_age_group.
+        The bulk UPDATEs skip the session hooks, so the moved children are
+        added to the sync change log explicitly (ChangeLogHelper.record).
+        
+        Returns a report; with dry_run=True nothing is written.
+        """
+        from src.models.child import Child
+        from src.models.sync import ChangeLogHelper
+        
+        as_of = as_of or date.today()
+        indexes, standard_index = AgeGroupIndex.load_all()
+        
+        daycare_query = db.session.query(Child.daycare_id).filter(
+            Child.status == 'enrolled', Child.date_of_birth.isnot(None)
+        ).distinct().order_by(Child.daycare_id)
+        if daycare_id is not None:
+            daycare_query = daycare_query.filter(Child.daycare_id == daycare_id)
+        daycare_ids = [row.daycare_id for row in daycare_query]
+        
+        report = {
+            'as_of': as_of.isoformat(),
+            'dry_run': dry_run,
+            'daycares': len(daycare_ids),
+            'children_scanned': 0,
+            'children_changed': 0,
+            'children_unmatched': 0,
+            'moves': []
+        }
+        
+        for start in range(0, len(daycare_ids), ROLLOVER_DAYCARE_BATCH):
+            batch = daycare_ids[start:start + ROLLOVER_DAYCARE_BATCH]
+            rows = db.session.query(
+                Child.id, Child.date_of_birth, Child.daycare_id, Child.age_group_id
+            ).filter(
+                Child.daycare_id.in_(batch),
+                Child.status == 'enrolled',
+                Child.date_of_birth.isnot(None)
+            ).all()
+            
+            targets = defaultdict(list)  # (daycare_id, new group) -> child ids
+            moves = Counter()            # (daycare_id, old group, new group) -> children
+            age_in_months_on = AgeGroupHelper.age_in_months_on
+            for child_id, birth_date, child_daycare_id, current_group_id in rows:
+                index = indexes.get(child_daycare_id, standard_index)
+                new_group_id = index.lookup(age_in_months_on(birth_date, as_of))
+                if new_group_id is None:
+                    report['children_unmatched'] += 1
+                elif new_group_id != current_group_id:
+                    targets[(child_daycare_id, new_group_id)].append(child_id)
+                    moves[(child_daycare_id, current_group_id, new_group_id)] += 1
+            
+            report['children_scanned'] += len(rows)
+            report['children_changed'] += sum(moves.values())
+            report['moves'].extend(
+                {'daycare_id': dc, 'from_age_group_id': old, 'to_age_group_id': new, 'children': n}
+                for (dc, old, new), n in sorted(moves.items(), key=lambda m: (m[0][0], m[0][1] or 0, m[0][2]))
+            )
+            
+            if dry_run or not targets:
+                continue
+            for (child_daycare_id, new_group_id), child_ids in targets.items():
+                Child.query.filter(Child.id.in_(child_ids))\
+                    .update({Child.age_group_id: new_group_id}, synchronize_session=False)
+                ChangeLogHelper.record('children', [{'id': child_id, 'daycare_id': child_daycare_id}
+                                                    for child_id in child_ids], 'update')
+            db.session.commit()
+        
+        return report
     
     @staticmethod
     def get_all_age_groups_for_daycare(daycare_id):
@@ -147,41 +332,24 @@ class AgeGroupHelper:
         return standard_groups + custom_groups
     
     @staticmethod
-    def get_age_group_for_child(birth_date, daycare_id):
+    def resolve_age_group_id(birth_date, daycare_id):
         """
-        Determine which age group a child belongs to and return the AgeGroup object
-        Returns the most specific match (custom groups take precedence over standard)
+        Id of the age group a child belongs to (custom groups take precedence
+        over standard ones), resolved from the cached AgeGroupIndex
         """
         age_months = AgeGroupHelper.calculate_age_in_months(birth_date)
-        
         if age_months is None:
             return None
-        
-        # First check custom age groups for this daycare
-        custom_groups = AgeGroup.query.filter_by(
-            daycare_id=daycare_id,
-            is_active=True,
-            is_standard=False
-        ).all()
-        
-        for group in custom_groups:
-            if group.min_age_months <= age_months:
-                if group.max_age_months is None or age_months <= group.max_age_months:
-                    return group
-        
-        # If no custom group matches, check standard age groups
-        standard_groups = AgeGroup.query.filter_by(
-            is_standard=True,
-            is_active=True,
-            daycare_id=None
-        ).all()
-        
-        for group in standard_groups:
-            if group.min_age_months <= age_months:
-                if group.max_age_months is None or age_months <= group.max_age_months:
-                    return group
-        
-        return None
+        return AgeGroupIndex.for_daycare(daycare_id).lookup(age_months)
+    
+    @staticmethod
+    def get_age_group_for_child(birth_date, daycare_id):
+        """
+        Determine which age group a child belongs to and return the AgeGroup object
+        Returns the most specific match (custom groups take precedence over standard)
+        """
+        group_id = AgeGroupHelper.resolve_age_group_id(birth_date, daycare_id)
+        return db.session.get(AgeGroup, group_id) if group_id else None
     
     @staticmethod
     def validate_age_group_range(min_age_months, max_age_months):
@@ -217,4 +385,30 @@ class AgeGroupHelper:
             if not (new_max < group_min or min_age_months > group_max):
                 return True, f"Age range conflicts with existing group '{group.name}'"
         
-        return False, None
\ No newline at end of file
+        return False, None
+
+
+# ---------- index invalidation ----------
+# Same pattern as the dashboard counts (models/stats.py): flushed age groups
+# mark their daycare (None = standard group, i.e. every daycare) and the
+# cached indexes are dropped on commit. On rollback they are dropped too,
+# since an index built mid-transaction may contain the discarded rows.
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_age_groups(session, flush_context):
+    changed = session.info.setdefault('age_group_daycares', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, AgeGroup):
+            changed.add(None if obj.is_standard or obj.daycare_id is None else obj.daycare_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_age_group_indexes(session):
+    for daycare_id in session.info.pop('age_group_daycares', ()):
+        AgeGroupIndex.invalidate(daycare_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_age_group_indexes(session, previous_transaction):
+    for daycare_id in session.info.pop('age_group_daycares', ()):
+        AgeGroupIndex.invalidate(daycare_id)
@@ -21,8 +21,8 @@ class Allergy(db.Model):
              "id":         self.id,
              "name":       self.name,
              "is_severe":  self.is_severe,
-             "created_at": self.created_at.isoformat() if self.created_at else None,
-             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+             "created_at": self.created_at,
+             "updated_at": self.updated_at,
         }
 
 class ChildAllergy(db.Model):
@@ -57,7 +57,7 @@ class ChildAllergy(db.Model):
             "severity":      self.severity,
             "reaction":      self.reaction,
             "doctor_notes":  self.doctor_notes,
-            "epipen_expiry": self.epipen_expiry.isoformat() if self.epipen_expiry else None,
+            "epipen_expiry": self.epipen_expiry,
         }
 
 def to_dict(self):
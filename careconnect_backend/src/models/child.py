@@ -7,6 +7,8 @@ from src.models.user import Parent, DaycareStaff
 from src.models.emergency_contact import EmergencyContact
 from src.models.access_permission import AccessPermission 
 from src.models.allergy import ChildAllergy 
+from sqlalchemy.orm import defaultload
+from src.utils.loaders import eager_options
 
 
 # ---------- association table  (MUST be above class Child) ----------
@@ -83,6 +85,39 @@ class Child(db.Model):
         cascade  = "all, delete-orphan",
         order_by="ChildAllergy.id",
     )
+
+    # Relationships each serialization profile walks. Routes apply
+    # Child.loader_options(profile) so listings batch-load them instead of
+    # issuing one query per child and relationship.
+    #   list   – to_dict, for the children listings and the sync feed
+    #   detail – a single child; same payload as list, so an alias of it
+    #   full   – to_dict_with_parents, adds parents and their user email
+    _TO_DICT_PATHS = (
+        'child_allergies.allergy',
+        'emergency_contacts',
+        'access_permissions',
+        'staff',
+        'age_group',
+    )
+    SERIALIZATION_PROFILES = {
+        'list': _TO_DICT_PATHS,
+        'detail': _TO_DICT_PATHS,
+        'full': _TO_DICT_PATHS + ('parent_relationships.parent.user',),
+    }
+
+    @classmethod
+    def loader_options(cls, profile='list'):
+        """Loader options covering everything `profile` serializes"""
+        return eager_options(cls, cls.SERIALIZATION_PROFILES[profile]) + [
+            # only staff ids are serialized; don't pull each staff member's children
+            defaultload(cls.staff).lazyload(DaycareStaff.children),
+        ]
+
+    def serialize(self, profile='list'):
+        """Serialize using the payload that matches `profile`"""
+        if profile == 'full':
+            return self.to_dict_with_parents()
+        return self.to_dict()
     
     def get_pickup_authorization(self):
         return json.loads(self.pickup_authorization) if self.pickup_authorization else []
@@ -97,17 +132,17 @@ class Child(db.Model):
         return None
     
     def calculate_and_assign_age_group(self):
-        """Calculate and assign the appropriate age group for this child"""
+        """Calculate and assign the appropriate age group for this child (returns its id)"""
         from src.models.age_group import AgeGroupHelper
         
         if self.date_of_birth and self.daycare_id:
-            age_group = AgeGroupHelper.get_age_group_for_child(
+            age_group_id = AgeGroupHelper.resolve_age_group_id(
                 self.date_of_birth, 
                 self.daycare_id
             )
-            if age_group:
-                self.age_group_id = age_group.id
-                return age_group
+            if age_group_id:
+                self.age_group_id = age_group_id
+                return age_group_id
         return None
     
     def get_age_in_months(self):
@@ -153,7 +188,7 @@ class Child(db.Model):
             'id': self.id,
             'first_name': self.first_name,
             'last_name': self.last_name,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
+            'date_of_birth': self.date_of_birth,
             'age': self.calculate_age(),
             'gender': self.gender,
             'medical_conditions': self.medical_conditions,
@@ -161,8 +196,8 @@ class Child(db.Model):
             'dietary_restrictions': self.dietary_restrictions,
             'emergency_medications': self.emergency_medications,
             'photo_url': self.photo_url,
-            'enrollment_date': self.enrollment_date.isoformat() if self.enrollment_date else None,
-            'withdrawal_date': self.withdrawal_date.isoformat() if self.withdrawal_date else None,
+            'enrollment_date': self.enrollment_date,
+            'withdrawal_date': self.withdrawal_date,
             'status': self.status,
             'daycare_id': self.daycare_id,
             'primary_parent_id': self.primary_parent_id,
@@ -194,8 +229,8 @@ class Child(db.Model):
                  for ap in self.access_permissions
             ],
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             "assigned_staff_ids": [s.id for s in self.staff],   # NEW
         }
     # --- NEW ---
@@ -224,6 +259,7 @@ class Child(db.Model):
     # ⬇️  add this block
     __table_args__ = (
         db.Index("idx_children_age_group", "age_group_id"),
+        db.Index("idx_children_updated_at", "updated_at"),
     )
 
 class ParentChildRelationship(db.Model):
@@ -251,7 +287,7 @@ class ParentChildRelationship(db.Model):
             'can_pickup': self.can_pickup,
             'can_authorize_medical': self.can_authorize_medical,
             'is_primary': self.is_primary,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class RegistrationRequest(db.Model):
@@ -309,18 +345,18 @@ class RegistrationRequest(db.Model):
             'daycare_id': self.daycare_id,
             'child_first_name': self.child_first_name,
             'child_last_name': self.child_last_name,
-            'child_date_of_birth': self.child_date_of_birth.isoformat() if self.child_date_of_birth else None,
+            'child_date_of_birth': self.child_date_of_birth,
             'parent_first_name': self.parent_first_name,
             'parent_last_name': self.parent_last_name,
             'parent_email': self.parent_email,
             'parent_phone': self.parent_phone,
-            'requested_start_date': self.requested_start_date.isoformat() if self.requested_start_date else None,
+            'requested_start_date': self.requested_start_date,
             'status': self.status,
             'invitation_token': self.invitation_token,
-            'invitation_sent_at': self.invitation_sent_at.isoformat() if self.invitation_sent_at else None,
-            'invitation_expires_at': self.invitation_expires_at.isoformat() if self.invitation_expires_at else None,
+            'invitation_sent_at': self.invitation_sent_at,
+            'invitation_expires_at': self.invitation_expires_at,
             'approved_by': self.approved_by,
-            'approved_at': self.approved_at.isoformat() if self.approved_at else None,
+            'approved_at': self.approved_at,
             'requested_age_group_id': self.requested_age_group_id,
             'requested_age_group': self.requested_age_group.to_dict() if self.requested_age_group else None,
             'calculated_age_group': calculated_age_group.to_dict() if calculated_age_group else None,
@@ -328,7 +364,7 @@ class RegistrationRequest(db.Model):
             'emergency_contacts'  : [c.to_dict() for c in self.emergency_contacts],
             'rejection_reason': self.rejection_reason,
             'additional_info': self.get_additional_info(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
@@ -33,6 +33,13 @@ class Incident(db.Model):
     reporter = db.relationship('DaycareStaff', backref='reported_incidents', foreign_keys=[reported_by])
     followups = db.relationship('IncidentFollowup', backref='incident', cascade='all, delete-orphan')
     
+    # Keyset pagination indexes for the newest-first incident feeds
+    __table_args__ = (
+        db.Index('idx_incidents_child_created', 'child_id', 'created_at', 'id'),
+        db.Index('idx_incidents_daycare_created', 'daycare_id', 'created_at', 'id'),
+        db.Index('idx_incidents_updated_at', 'updated_at'),
+    )
+    
     def get_attachments(self):
         return json.loads(self.attachments) if self.attachments else []
     
@@ -50,20 +57,20 @@ class Incident(db.Model):
             'title': self.title,
             'description': self.description,
             'location': self.location,
-            'incident_date': self.incident_date.isoformat() if self.incident_date else None,
-            'incident_time': self.incident_time.isoformat() if self.incident_time else None,
+            'incident_date': self.incident_date,
+            'incident_time': self.incident_time,
             'immediate_action_taken': self.immediate_action_taken,
             'medical_attention_required': self.medical_attention_required,
             'medical_attention_details': self.medical_attention_details,
             'parent_notified': self.parent_notified,
             'parent_notification_method': self.parent_notification_method,
-            'parent_notification_time': self.parent_notification_time.isoformat() if self.parent_notification_time else None,
+            'parent_notification_time': self.parent_notification_time,
             'follow_up_required': self.follow_up_required,
             'follow_up_notes': self.follow_up_notes,
             'status': self.status,
             'attachments': self.get_attachments(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class IncidentFollowup(db.Model):
@@ -88,12 +95,12 @@ class IncidentFollowup(db.Model):
             'id': self.id,
             'incident_id': self.incident_id,
             'staff_id': self.staff_id,
-            'follow_up_date': self.follow_up_date.isoformat() if self.follow_up_date else None,
-            'follow_up_time': self.follow_up_time.isoformat() if self.follow_up_time else None,
+            'follow_up_date': self.follow_up_date,
+            'follow_up_time': self.follow_up_time,
             'action_taken': self.action_taken,
             'outcome': self.outcome,
             'next_action_required': self.next_action_required,
-            'next_action_date': self.next_action_date.isoformat() if self.next_action_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'next_action_date': self.next_action_date,
+            'created_at': self.created_at
         }
 
@@ -0,0 +1,249 @@
+# src/models/job.py
+import json
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from src.models.user import db
+
+# seconds before the first retry; doubled on each further attempt
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+
+# a running job whose worker has been silent this long is considered lost
+STALE_AFTER = timedelta(minutes=15)
+# seconds between two locked_at refreshes of a worker's running jobs; well under STALE_AFTER
+HEARTBEAT_INTERVAL = 60
+
+
+class Job(db.Model):
+    """
+    A unit of background work, run by `flask jobs-worker` processes.
+
+    Workers claim queued rows whose run_at has passed with
+    SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL, so any number of them
+    can poll the same queue without handing out a job twice; SQLite has no
+    row locks and relies on the conditional UPDATE in JobHelper.claim.
+    While a worker runs jobs it refreshes their locked_at every
+    HEARTBEAT_INTERVAL; a running job silent for STALE_AFTER lost its
+    worker, and goes back to the queue (an attempt used) or, once out of
+    attempts, fails. A failed job is queued again with exponential backoff until it has
+    used max_attempts. Enqueueing with an idempotency_key that is already
+    taken returns the existing job instead of adding one, unless that job
+    has failed for good: it is then queued again with fresh attempts.
+    """
+    __tablename__ = 'jobs'
+
+    STATUSES = ('queued', 'running', 'done', 'failed')
+
+    id = db.Column(db.Integer, primary_key=True)
+    queue = db.Column(db.String(64), nullable=False, default='default')
+    task = db.Column(db.String(128), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    idempotency_key = db.Column(db.String(255), unique=True)
+
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(128))
+    locked_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    result = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # the claim query: next runnable jobs of a queue
+        db.Index('idx_jobs_queue_status_run_at', 'queue', 'status', 'run_at'),
+    )
+
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'queue': self.queue,
+            'task': self.task,
+            'payload': self.get_payload(),
+            'idempotency_key': self.idempotency_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at,
+            'last_error': self.last_error,
+            'result': json.loads(self.result) if self.result else None,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobHelper:
+    """Enqueueing, claiming and settling jobs"""
+
+    @staticmethod
+    def enqueue(task, payload=None, idempotency_key=None, queue='default', run_at=None,
+                max_attempts=5, commit=True):
+        """
+        Add a job (or return the one already holding `idempotency_key`,
+        queued again if it had failed for good).
+        With commit=False the job joins the caller's transaction, so it only
+        becomes visible to workers if that transaction commits.
+        """
+        if idempotency_key:
+            existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+            if existing:
+                if existing.status == 'failed':
+                    JobHelper._revive(existing, payload, run_at, max_attempts)
+                    if commit:
+                        db.session.commit()
+                return existing
+
+        job = Job(
+            task=task,
+            queue=queue,
+            payload=json.dumps(payload or {}),
+            idempotency_key=idempotency_key,
+            run_at=run_at or datetime.utcnow(),
+            max_attempts=max_attempts,
+        )
+        try:
+            # savepoint: losing an idempotency race must not undo the caller's work
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            job = Job.query.filter_by(idempotency_key=idempotency_key).one()
+        if commit:
+            db.session.commit()
+        return job
+
+    @staticmethod
+    def _revive(job, payload, run_at, max_attempts):
+        """Queue a job that used up its attempts again, from scratch"""
+        now = datetime.utcnow()
+        # conditional: two enqueuers reviving the same job reset it once
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == 'failed')
+            .values(status='queued', attempts=0, max_attempts=max_attempts,
+                    payload=json.dumps(payload or {}), run_at=run_at or now,
+                    locked_by=None, locked_at=None, finished_at=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.refresh(job)
+
+    @staticmethod
+    def claim(worker_id, queues=('default',), limit=1):
+        """Lock up to `limit` runnable jobs of `queues` for `worker_id` and return them"""
+        now = datetime.utcnow()
+        candidates = db.session.query(Job.id).filter(
+            Job.queue.in_(queues),
+            Job.status == 'queued',
+            Job.run_at <= now,
+        ).order_by(Job.run_at, Job.id).limit(limit)
+        if db.engine.dialect.name == 'postgresql':
+            candidates = candidates.with_for_update(skip_locked=True)
+        ids = [job_id for job_id, in candidates]
+        if not ids:
+            db.session.commit()
+            return []
+
+        # `status == 'queued'` makes the claim safe where rows cannot be locked
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_(ids), Job.status == 'queued')
+            .values(status='running', locked_by=worker_id, locked_at=now,
+                    attempts=Job.attempts + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return Job.query.filter(Job.id.in_(ids), Job.locked_by == worker_id,
+                                Job.status == 'running').order_by(Job.run_at, Job.id).all()
+
+    @staticmethod
+    def complete(job, result=None):
+        job.status = 'done'
+        job.result = json.dumps(result) if result is not None else None
+        job.finished_at = datetime.utcnow()
+        job.locked_by = None
+        job.last_error = None
+        db.session.commit()
+
+    @staticmethod
+    def retry_delay(attempts):
+        """Backoff before attempt `attempts + 1`: doubling, capped, with +/-20% jitter"""
+        delay = min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    @staticmethod
+    def fail(job, error):
+        """Record a failed attempt; queue the job again unless it is out of attempts"""
+        job.last_error = error
+        job.locked_by = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + JobHelper.retry_delay(job.attempts)
+        db.session.commit()
+
+    @staticmethod
+    def heartbeat(worker_id):
+        """
+        Refresh locked_at of the jobs `worker_id` is running; returns how
+        many. Commits on a connection of its own, outside the session the
+        task is using.
+        """
+        now = datetime.utcnow()
+        with db.engine.begin() as connection:
+            return connection.execute(
+                update(Job)
+                .where(Job.locked_by == worker_id, Job.status == 'running')
+                .values(locked_at=now)
+            ).rowcount
+
+    @staticmethod
+    def requeue_stale(stale_after=STALE_AFTER):
+        """
+        Settle running jobs whose worker stopped heartbeating: queued again,
+        or failed when the lost run was their last attempt (a task that
+        kills its worker must not be retried forever). Returns
+        (requeued, failed).
+        """
+        now = datetime.utcnow()
+        lost = (Job.status == 'running', Job.locked_at < now - stale_after)
+        failed = db.session.execute(
+            update(Job)
+            .where(*lost, Job.attempts >= Job.max_attempts)
+            .values(status='failed', locked_by=None, finished_at=now, updated_at=now,
+                    last_error=f'Worker lost: no heartbeat for {stale_after}')
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        requeued = db.session.execute(
+            update(Job)
+            .where(*lost)
+            .values(status='queued', locked_by=None, run_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return requeued, failed
+
+    @staticmethod
+    def queue_stats():
+        """{queue: {status: count, 'oldest_runnable': run_at of the oldest due queued job}}"""
+        stats = {}
+        rows = db.session.query(Job.queue, Job.status, func.count(Job.id)).group_by(Job.queue, Job.status)
+        for queue, status, count in rows:
+            stats.setdefault(queue, {})[status] = count
+        oldest = db.session.query(Job.queue, func.min(Job.run_at)).filter(
+            Job.status == 'queued', Job.run_at <= datetime.utcnow()
+        ).group_by(Job.queue)
+        for queue, run_at in oldest:
+            stats.setdefault(queue, {})['oldest_runnable'] = run_at
+        return stats
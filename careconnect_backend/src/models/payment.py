@@ -1,9 +1,9 @@
 from src.models.user import db
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from src.models.child import Child
-from sqlalchemy import Column
+from sqlalchemy import Column, func, select
 
 class PaymentPlan(db.Model):
     __tablename__ = 'payment_plans'
@@ -29,13 +29,13 @@ class PaymentPlan(db.Model):
             'daycare_id': self.daycare_id,
             'plan_name': self.plan_name,
             'plan_type': self.plan_type,
-            'base_amount': float(self.base_amount) if self.base_amount else 0,
+            'base_amount': self.base_amount or 0,
             'currency': self.currency,
             'age_group': self.age_group,
             'description': self.description,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class ChildPaymentAssignment(db.Model):
@@ -64,14 +64,14 @@ class ChildPaymentAssignment(db.Model):
             'id': self.id,
             'child_id': self.child_id,
             'payment_plan_id': self.payment_plan_id,
-            'custom_amount': float(self.custom_amount) if self.custom_amount else None,
-            'discount_percentage': float(self.discount_percentage) if self.discount_percentage else 0,
+            'custom_amount': self.custom_amount,
+            'discount_percentage': self.discount_percentage or 0,
             'discount_reason': self.discount_reason,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
             'is_active': self.is_active,
-            'effective_amount': float(self.get_effective_amount()),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'effective_amount': self.get_effective_amount(),
+            'created_at': self.created_at
         }
 
 class Invoice(db.Model):
@@ -100,9 +100,15 @@ class Invoice(db.Model):
     line_items = db.relationship('InvoiceLineItem', backref='invoice', cascade='all, delete-orphan')
     payments = db.relationship('Payment', backref='invoice', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('idx_invoices_parent_created', 'parent_id', 'created_at', 'id'),
+        db.Index('idx_invoices_updated_at', 'updated_at'),
+    )
+    
     def calculate_balance(self):
-        total_paid = sum(payment.amount for payment in self.payments if payment.status == 'completed')
-        return self.total_amount - total_paid
+        # amount_paid is loaded with the invoice row (see the column_property
+        # below Payment); refresh it after adding payments in the same session
+        return self.total_amount - (self.amount_paid or 0)
     
     def to_dict(self):
         return {
@@ -110,19 +116,19 @@ class Invoice(db.Model):
             'invoice_number': self.invoice_number,
             'parent_id': self.parent_id,
             'daycare_id': self.daycare_id,
-            'billing_period_start': self.billing_period_start.isoformat() if self.billing_period_start else None,
-            'billing_period_end': self.billing_period_end.isoformat() if self.billing_period_end else None,
-            'subtotal': float(self.subtotal) if self.subtotal else 0,
-            'tax_amount': float(self.tax_amount) if self.tax_amount else 0,
-            'total_amount': float(self.total_amount) if self.total_amount else 0,
-            'balance': float(self.calculate_balance()),
+            'billing_period_start': self.billing_period_start,
+            'billing_period_end': self.billing_period_end,
+            'subtotal': self.subtotal or 0,
+            'tax_amount': self.tax_amount or 0,
+            'total_amount': self.total_amount or 0,
+            'balance': self.calculate_balance(),
             'currency': self.currency,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'due_date': self.due_date,
             'status': self.status,
             'payment_terms': self.payment_terms,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class InvoiceLineItem(db.Model):
@@ -144,11 +150,11 @@ class InvoiceLineItem(db.Model):
             'invoice_id': self.invoice_id,
             'child_id': self.child_id,
             'description': self.description,
-            'quantity': float(self.quantity) if self.quantity else 1,
-            'unit_price': float(self.unit_price) if self.unit_price else 0,
-            'line_total': float(self.line_total) if self.line_total else 0,
+            'quantity': self.quantity or 1,
+            'unit_price': self.unit_price or 0,
+            'line_total': self.line_total or 0,
             'item_type': self.item_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class Payment(db.Model):
@@ -169,21 +175,36 @@ class Payment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_payments_parent_created', 'parent_id', 'created_at', 'id'),
+        db.Index('idx_payments_updated_at', 'updated_at'),
+        db.Index('idx_payments_invoice_status', 'invoice_id', 'status'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
             'invoice_id': self.invoice_id,
             'parent_id': self.parent_id,
             'payment_method': self.payment_method,
-            'amount': float(self.amount) if self.amount else 0,
+            'amount': self.amount or 0,
             'currency': self.currency,
             'transaction_id': self.transaction_id,
-            'payment_date': self.payment_date.isoformat() if self.payment_date else None,
+            'payment_date': self.payment_date,
             'status': self.status,
             'failure_reason': self.failure_reason,
-            'processing_fee': float(self.processing_fee) if self.processing_fee else 0,
+            'processing_fee': self.processing_fee or 0,
             'notes': self.notes,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
+# Sum of completed payments, selected as a correlated subquery in the same
+# statement that loads the invoices, so listing invoices with their balance
+# doesn't load every payment.
+Invoice.amount_paid = column_property(
+    select(func.coalesce(func.sum(Payment.amount), 0))
+    .where(Payment.invoice_id == Invoice.id, Payment.status == 'completed')
+    .correlate_except(Payment)
+    .scalar_subquery()
+)
@@ -0,0 +1,225 @@
+# src/models/search.py
+"""
+Full-text search over children, users (parents' names and emails) and
+daycares, for the list endpoints' `search` parameter.
+
+Each searchable record has a SearchDocument whose `body` is its text,
+lowercased with accents and ligatures folded ("Élise Côté" -> "elise
+cote"), so "elise", "Elise" and "élise" all match it. The database indexes
+the bodies:
+
+    PostgreSQL  GIN index on to_tsvector('simple', body)
+    SQLite      FTS5 table search_documents_fts, synced by triggers
+
+and SearchHelper.apply() turns a search into a ranked join on the index:
+every term must match the start of a word (prefix search), best matches
+first. The 'simple' configuration does no stemming, which suits names.
+
+Documents are refreshed by the session hooks below when the indexed
+columns change, in the same transaction. Core bulk writes call
+SearchHelper.index() themselves; the migration that adds the table fills
+it, and `flask reindex-search` rebuilds the lot.
+"""
+import re
+import unicodedata
+
+from sqlalchemy import DDL, delete, event, false, func, inspect, literal_column, select
+from sqlalchemy.orm import Session
+
+from src.models.user import db, User, Parent, Daycare
+from src.models.child import Child
+
+REINDEX_BATCH_SIZE = 1000
+
+# letters NFKD does not decompose
+_LIGATURES = str.maketrans({'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae', 'ß': 'ss',
+                            'ø': 'o', 'Ø': 'o', 'ł': 'l', 'Ł': 'l', 'đ': 'd', 'Đ': 'd'})
+_WORD = re.compile(r'[^\W_]+')
+
+
+def fold(text):
+    """Lowercase words of `text` without accents: the form bodies and search terms are compared in"""
+    text = unicodedata.normalize('NFKD', (text or '').translate(_LIGATURES))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(_WORD.findall(text))
+
+
+class SearchDocument(db.Model):
+    """Indexed text of one searchable record"""
+    __tablename__ = 'search_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(16), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    daycare_id = db.Column(db.Integer)  # children only: searches are per daycare
+    body = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'entity_id', name='uq_search_documents_entity'),
+        db.Index('idx_search_documents_entity_daycare', 'entity', 'daycare_id'),
+    )
+
+
+# the full-text index itself is dialect-specific; the migration creates the same objects
+_TSVECTOR = "to_tsvector('simple'::regconfig, body)"
+
+event.listen(SearchDocument.__table__, 'after_create', DDL(
+    f"CREATE INDEX idx_search_documents_body_fts ON search_documents USING gin ({_TSVECTOR})"
+).execute_if(dialect='postgresql'))
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE search_documents_fts USING fts5("
+    "body, content='search_documents', content_rowid='id')",
+    "CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_documents_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+_FTS_TABLE = db.table('search_documents_fts', db.column('rowid'))
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(SearchDocument.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(SearchDocument.__table__, 'before_drop',
+             DDL('DROP TABLE IF EXISTS search_documents_fts').execute_if(dialect='sqlite'))
+
+
+def _child_documents(connection, ids):
+    rows = connection.execute(
+        select(Child.id, Child.daycare_id, Child.first_name, Child.last_name).where(Child.id.in_(ids))
+    )
+    return [(row.id, row.daycare_id, f'{row.first_name} {row.last_name}') for row in rows]
+
+
+def _user_documents(connection, ids):
+    rows = connection.execute(
+        select(User.id, User.email, Parent.first_name, Parent.last_name)
+        .outerjoin(Parent, Parent.user_id == User.id).where(User.id.in_(ids))
+    )
+    return [(row.id, None, f'{row.email} {row.first_name or ""} {row.last_name or ""}') for row in rows]
+
+
+def _daycare_documents(connection, ids):
+    rows = connection.execute(
+        select(Daycare.id, Daycare.name, Daycare.city, Daycare.email).where(Daycare.id.in_(ids))
+    )
+    return [(row.id, None, f'{row.name} {row.city} {row.email or ""}') for row in rows]
+
+
+# entity -> (model, loader of (id, daycare_id, text) for the given ids)
+ENTITIES = {
+    'child': (Child, _child_documents),
+    'user': (User, _user_documents),
+    'daycare': (Daycare, _daycare_documents),
+}
+
+
+class SearchHelper:
+    """Querying and maintaining the search index"""
+
+    @staticmethod
+    def terms(text):
+        return fold(text).split()
+
+    @staticmethod
+    def matches(entity, text, daycare_id=None):
+        """
+        Subquery (entity_id, rank) of `entity` documents in which every term
+        of `text` starts a word; best rank first. A whole-word match counts
+        twice, so "zoe" ranks Zoé above Zoel.
+        """
+        terms = SearchHelper.terms(text)
+        doc = SearchDocument
+        criteria = [doc.entity == entity]
+        if daycare_id is not None:
+            criteria.append(doc.daycare_id == daycare_id)
+
+        if db.engine.dialect.name == 'sqlite':
+            fts = literal_column('search_documents_fts')
+            # bm25: lower is better
+            match = ' AND '.join(f'("{term}" OR "{term}"*)' for term in terms)
+            return select(doc.entity_id, func.bm25(fts).label('rank'))\
+                .join(_FTS_TABLE, _FTS_TABLE.c.rowid == doc.id)\
+                .where(fts.op('MATCH')(match), *criteria)\
+                .subquery()
+
+        tsvector = literal_column(_TSVECTOR)
+        tsquery = func.to_tsquery(literal_column("'simple'::regconfig"),
+                                  ' & '.join(f'({term} | {term}:*)' for term in terms))
+        # ts_rank: higher is better; negated so that both dialects sort ascending
+        return select(doc.entity_id, (-func.ts_rank(tsvector, tsquery)).label('rank'))\
+            .where(tsvector.op('@@')(tsquery), *criteria).subquery()
+
+    @staticmethod
+    def apply(query, model, entity, text, daycare_id=None):
+        """Restrict `query` (over `model`) to records matching `text`, best matches first"""
+        if not text:
+            return query
+        if not SearchHelper.terms(text):
+            # only punctuation: nothing can match it
+            return query.filter(false())
+        hits = SearchHelper.matches(entity, text, daycare_id)
+        return query.join(hits, hits.c.entity_id == model.id).order_by(hits.c.rank, model.id)
+
+    @staticmethod
+    def index(entity, ids, connection=None):
+        """(Re)write the documents of `entity` records `ids`; records that are gone lose theirs"""
+        ids = sorted(set(ids) - {None})
+        if not ids:
+            return
+        connection = connection or db.session.connection()
+        _, load = ENTITIES[entity]
+        documents = [
+            {'entity': entity, 'entity_id': entity_id, 'daycare_id': daycare_id, 'body': fold(text)}
+            for entity_id, daycare_id, text in load(connection, ids)
+        ]
+        table = SearchDocument.__table__
+        connection.execute(delete(table).where(table.c.entity == entity, table.c.entity_id.in_(ids)))
+        if documents:
+            connection.execute(table.insert(), documents)
+
+    @staticmethod
+    def rebuild():
+        """Reindex every searchable record; returns {entity: documents}"""
+        counts = {}
+        for entity, (model, _) in ENTITIES.items():
+            db.session.execute(delete(SearchDocument).where(SearchDocument.entity == entity))
+            ids = [row_id for row_id, in db.session.query(model.id).order_by(model.id)]
+            for start in range(0, len(ids), REINDEX_BATCH_SIZE):
+                SearchHelper.index(entity, ids[start:start + REINDEX_BATCH_SIZE])
+            counts[entity] = len(ids)
+        db.session.commit()
+        return counts
+
+
+# ---------- session hooks ----------
+
+# model -> (indexed attributes, function giving the (entity, id) documents to refresh)
+_SOURCES = {
+    Child: (('first_name', 'last_name', 'daycare_id'), lambda obj, state: [('child', obj.id)]),
+    Daycare: (('name', 'city', 'email'), lambda obj, state: [('daycare', obj.id)]),
+    User: (('email',), lambda obj, state: [('user', obj.id)]),
+    # a parent's name is part of their user's document (old user too, if it moved)
+    Parent: (('first_name', 'last_name', 'user_id'),
+             lambda obj, state: [('user', user_id) for user_id in
+                                 [obj.user_id, *state.attrs.user_id.history.deleted]]),
+}
+
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_documents(session, flush_context):
+    stale = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        source = _SOURCES.get(type(obj))
+        if source is None:
+            continue
+        attrs, documents = source
+        state = inspect(obj)
+        if obj in session.dirty and not any(state.attrs[attr].history.has_changes() for attr in attrs):
+            continue
+        for entity, entity_id in documents(obj, state):
+            stale.setdefault(entity, set()).add(entity_id)
+    for entity, ids in stale.items():
+        SearchHelper.index(entity, ids, session.connection())
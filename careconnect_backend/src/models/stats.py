@@ -0,0 +1,329 @@
+# src/models/stats.py
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import case, event, func, inspect, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models.user import db, User, Daycare, DaycareStaff, Parent
+from src.models.child import Child, RegistrationRequest
+from src.models.incident import Incident
+from src.models.activity import Activity
+from src.models.payment import Payment
+from src.utils.cache import TTLCache
+
+DASHBOARD_CACHE_TTL = 30  # seconds
+
+_dashboard_counts = TTLCache(DASHBOARD_CACHE_TTL)  # daycare_id -> counts dict
+
+# writes to these models change the dashboard counts of their daycare
+_DASHBOARD_MODELS = (Child, Incident, RegistrationRequest)
+
+
+class DaycareStatsHelper:
+    """Aggregated status counts for the daycare dashboard"""
+
+    @staticmethod
+    def _count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    @staticmethod
+    def compute_counts(daycare_id):
+        """All dashboard counts for a daycare in a single round trip"""
+        count_where = DaycareStatsHelper._count_where
+
+        children = db.session.query(
+            count_where(Child.status == 'enrolled').label('enrolled'),
+            count_where(Child.status == 'waitlist').label('waitlist'),
+            count_where(Child.status == 'withdrawn').label('withdrawn'),
+            count_where(Child.status == 'graduated').label('graduated'),
+        ).filter(Child.daycare_id == daycare_id).subquery()
+
+        registrations = db.session.query(
+            count_where(RegistrationRequest.status == 'pending').label('pending'),
+        ).filter(RegistrationRequest.daycare_id == daycare_id).subquery()
+
+        incidents = db.session.query(
+            count_where(Incident.status == 'open').label('open'),
+        ).filter(Incident.daycare_id == daycare_id).subquery()
+
+        # three single-row aggregates cross-joined into one row
+        row = db.session.query(
+            children.c.enrolled,
+            children.c.waitlist,
+            children.c.withdrawn,
+            children.c.graduated,
+            registrations.c.pending,
+            incidents.c.open,
+        ).select_from(children)\
+            .join(registrations, true())\
+            .join(incidents, true())\
+            .one()
+
+        return {
+            'enrolled_children': int(row.enrolled),
+            'waitlisted_children': int(row.waitlist),
+            'withdrawn_children': int(row.withdrawn),
+            'graduated_children': int(row.graduated),
+            'pending_registrations': int(row.pending),
+            'open_incidents': int(row.open),
+        }
+
+    @staticmethod
+    def get_counts(daycare_id):
+        """Dashboard counts, cached per daycare for DASHBOARD_CACHE_TTL seconds"""
+        return _dashboard_counts.get_or_set(
+            daycare_id, lambda: DaycareStatsHelper.compute_counts(daycare_id)
+        )
+
+    @staticmethod
+    def invalidate(daycare_id):
+        _dashboard_counts.invalidate(daycare_id)
+
+
+# ---------- cache invalidation ----------
+# Flushed child/incident/registration rows mark their daycare dirty; the
+# cached counts are dropped once the transaction actually commits.
+
+@event.listens_for(Session, 'after_flush')
+def _collect_dirty_daycares(session, flush_context):
+    dirty = session.info.setdefault('dashboard_dirty_daycares', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _DASHBOARD_MODELS) and obj.daycare_id is not None:
+            dirty.add(obj.daycare_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_dirty_daycares(session):
+    for daycare_id in session.info.pop('dashboard_dirty_daycares', ()):
+        DaycareStatsHelper.invalidate(daycare_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_dirty_daycares(session, previous_transaction):
+    session.info.pop('dashboard_dirty_daycares', None)
+
+
+# ---------- materialized counters ----------
+
+GLOBAL_SCOPE = 0  # daycare_id used for the system-wide counter rows
+
+
+class EntityCounter(db.Model):
+    """
+    Row counts maintained on write, so admin pages read a handful of rows
+    instead of running COUNT(*) over whole tables.
+
+    One row per (daycare_id, name); daycare_id = GLOBAL_SCOPE holds the
+    system-wide totals. Kept in step by the session hooks below and
+    repaired by `flask reconcile-counters` (CounterHelper.reconcile).
+    """
+    __tablename__ = 'entity_counters'
+
+    daycare_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CounterSpec:
+    """
+    What a counter counts: rows of `model` whose columns match `where`
+    (column name -> allowed values), also broken down per daycare when
+    `daycare_attr` is set.
+    """
+
+    def __init__(self, name, model, where=None, daycare_attr=None):
+        self.name = name
+        self.model = model
+        self.where = where or {}
+        self.daycare_attr = daycare_attr
+
+    @property
+    def watched_attrs(self):
+        attrs = list(self.where)
+        if self.daycare_attr:
+            attrs.append(self.daycare_attr)
+        return attrs
+
+    def matches(self, values):
+        return all(values.get(attr) in allowed for attr, allowed in self.where.items())
+
+    def sql_filter(self):
+        return [getattr(self.model, attr).in_(allowed) for attr, allowed in self.where.items()]
+
+
+COUNTERS = [
+    CounterSpec('users', User),
+    CounterSpec('daycares', Daycare),
+    CounterSpec('active_daycares', Daycare, where={'subscription_status': ('active',)}),
+    CounterSpec('parents', Parent),
+    CounterSpec('payments', Payment),
+    CounterSpec('staff', DaycareStaff, daycare_attr='daycare_id'),
+    CounterSpec('children', Child, daycare_attr='daycare_id'),
+    CounterSpec('activities', Activity, daycare_attr='daycare_id'),
+    CounterSpec('incidents', Incident, daycare_attr='daycare_id'),
+    CounterSpec('serious_incidents', Incident, where={'severity': ('serious', 'emergency')},
+                daycare_attr='daycare_id'),
+    CounterSpec('pending_registrations', RegistrationRequest, where={'status': ('pending',)},
+                daycare_attr='daycare_id'),
+]
+
+
+class CounterHelper:
+    """Read and repair the materialized counters"""
+
+    @staticmethod
+    def _read(daycare_id):
+        rows = EntityCounter.query.filter_by(daycare_id=daycare_id).all()
+        return {row.name: row.value for row in rows}
+
+    @staticmethod
+    def get_global():
+        """System-wide counters; bootstraps the table on first use"""
+        values = CounterHelper._read(GLOBAL_SCOPE)
+        if not values:
+            CounterHelper.reconcile()
+            values = CounterHelper._read(GLOBAL_SCOPE)
+        return {spec.name: values.get(spec.name, 0) for spec in COUNTERS}
+
+    @staticmethod
+    def get_for_daycare(daycare_id):
+        values = CounterHelper._read(daycare_id)
+        return {spec.name: values.get(spec.name, 0) for spec in COUNTERS if spec.daycare_attr}
+
+    @staticmethod
+    def compute_all():
+        """Recount every counter from the source tables: {(daycare_id, name): value}"""
+        actual = {}
+        for spec in COUNTERS:
+            total = db.session.query(func.count()).select_from(spec.model)\
+                .filter(*spec.sql_filter()).scalar()
+            actual[(GLOBAL_SCOPE, spec.name)] = total
+            if spec.daycare_attr:
+                column = getattr(spec.model, spec.daycare_attr)
+                rows = db.session.query(column, func.count())\
+                    .filter(*spec.sql_filter()).group_by(column).all()
+                for daycare_id, count in rows:
+                    if daycare_id is not None:
+                        actual[(daycare_id, spec.name)] = count
+        return actual
+
+    @staticmethod
+    def record_bulk_insert(model, rows):
+        """
+        Count rows of `model` written with bulk Core inserts (which skip the
+        session hooks). Applied on the session's connection, so the counters
+        commit or roll back with the rows.
+        """
+        deltas = defaultdict(int)
+        for spec in COUNTERS:
+            if spec.model is not model:
+                continue
+            for values in rows:
+                if not spec.matches(values):
+                    continue
+                deltas[(GLOBAL_SCOPE, spec.name)] += 1
+                if spec.daycare_attr and values.get(spec.daycare_attr) is not None:
+                    deltas[(values[spec.daycare_attr], spec.name)] += 1
+        if deltas:
+            _apply_counter_deltas(db.session.connection(), deltas)
+
+    @staticmethod
+    def reconcile():
+        """
+        Overwrite drifted counters with fresh counts.
+        Returns [(daycare_id, name, stored, actual)] for every row fixed.
+        """
+        actual = CounterHelper.compute_all()
+        stored = {(row.daycare_id, row.name): row for row in EntityCounter.query.all()}
+
+        drift = []
+        for key in set(actual) | set(stored):
+            expected = actual.get(key, 0)
+            row = stored.get(key)
+            if row is None:
+                if expected:
+                    db.session.add(EntityCounter(daycare_id=key[0], name=key[1], value=expected))
+                    drift.append((key[0], key[1], None, expected))
+            elif row.value != expected:
+                drift.append((key[0], key[1], row.value, expected))
+                row.value = expected
+
+        db.session.commit()
+        return sorted(drift, key=lambda d: (d[0], d[1]))
+
+
+def _counter_deltas(session):
+    """+1/-1 per counter for the rows being flushed"""
+    deltas = defaultdict(int)
+    specs_by_model = defaultdict(list)
+    for spec in COUNTERS:
+        specs_by_model[spec.model].append(spec)
+
+    def bump(spec, values, step):
+        if not spec.matches(values):
+            return
+        deltas[(GLOBAL_SCOPE, spec.name)] += step
+        if spec.daycare_attr and values.get(spec.daycare_attr) is not None:
+            deltas[(values[spec.daycare_attr], spec.name)] += step
+
+    for obj in session.new:
+        for spec in specs_by_model.get(type(obj), ()):
+            bump(spec, {a: getattr(obj, a) for a in spec.watched_attrs}, 1)
+
+    for obj in session.deleted:
+        for spec in specs_by_model.get(type(obj), ()):
+            bump(spec, {a: getattr(obj, a) for a in spec.watched_attrs}, -1)
+
+    for obj in session.dirty:
+        specs = specs_by_model.get(type(obj), ())
+        if not specs:
+            continue
+        state = inspect(obj)
+        for spec in specs:
+            new_values, old_values = {}, {}
+            for attr in spec.watched_attrs:
+                history = state.attrs[attr].history
+                new_values[attr] = getattr(obj, attr)
+                old_values[attr] = history.deleted[0] if history.deleted else new_values[attr]
+            if new_values != old_values:
+                bump(spec, old_values, -1)
+                bump(spec, new_values, 1)
+
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _apply_counter_deltas(connection, deltas):
+    table = EntityCounter.__table__
+    now = datetime.utcnow()
+    if connection.dialect.name in ('postgresql', 'sqlite'):
+        insert = pg_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+        for (daycare_id, name), delta in deltas.items():
+            stmt = insert(table).values(daycare_id=daycare_id, name=name, value=delta, updated_at=now)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.daycare_id, table.c.name],
+                set_={'value': table.c.value + stmt.excluded.value, 'updated_at': now},
+            ))
+        return
+
+    for (daycare_id, name), delta in deltas.items():
+        result = connection.execute(
+            table.update()
+            .where(table.c.daycare_id == daycare_id, table.c.name == name)
+            .values(value=table.c.value + delta, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(
+                daycare_id=daycare_id, name=name, value=delta, updated_at=now))
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_counters(session, flush_context):
+    # runs on the flush's own connection, so counters commit or roll back
+    # together with the rows they count
+    deltas = _counter_deltas(session)
+    if deltas:
+        _apply_counter_deltas(session.connection(), deltas)
@@ -3,7 +3,15 @@ from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from src.models.user import db
 from enum import Enum
-from sqlalchemy import Numeric, Column, String, Float, DateTime, Date, Boolean, Text, ForeignKey, Integer
+from sqlalchemy import Numeric, Column, String, Float, DateTime, Date, Boolean, Text, ForeignKey, Integer, case, exists, func, insert
+from src.utils.cache import TTLCache
+
+ADMIN_STATS_CACHE_TTL = 60  # seconds
+
+# expiry windows reported by the admin stats, in days
+EXPIRY_BUCKETS = (7, 30)
+
+_admin_stats = TTLCache(ADMIN_STATS_CACHE_TTL)
 
 
 class SubscriptionPlanType(Enum):
@@ -44,15 +52,15 @@ class SubscriptionPlan(db.Model):
         return {
             'id': self.id,
             'name': self.name,
-            'plan_type': self.plan_type.value,
-            'price': float(self.price),
+            'plan_type': self.plan_type,
+            'price': self.price,
             'currency': self.currency,
             'duration_months': self.duration_months,
             'description': self.description,
             'features': self.features,
             'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class DaycareSubscription(db.Model):
@@ -84,6 +92,11 @@ class DaycareSubscription(db.Model):
     # Relationships
     daycare = db.relationship('Daycare', backref='subscriptions')
     notifications = db.relationship('SubscriptionNotification', backref='subscription', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # reminder scan and expiry reports: subscriptions of a status ending on given dates
+        db.Index('idx_daycare_subscriptions_status_end_date', 'status', 'end_date'),
+    )
     
     def is_active(self):
         """Check if subscription is currently active"""
@@ -151,20 +164,20 @@ class DaycareSubscription(db.Model):
             'id': self.id,
             'daycare_id': self.daycare_id,
             'plan_id': self.plan_id,
-            'status': self.status.value,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'trial_end_date': self.trial_end_date.isoformat() if self.trial_end_date else None,
-            'last_payment_date': self.last_payment_date.isoformat() if self.last_payment_date else None,
-            'next_payment_date': self.next_payment_date.isoformat() if self.next_payment_date else None,
+            'status': self.status,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'trial_end_date': self.trial_end_date,
+            'last_payment_date': self.last_payment_date,
+            'next_payment_date': self.next_payment_date,
             'auto_renew': self.auto_renew,
             'is_active': self.is_active(),
             'is_trial': self.is_trial(),
             'days_until_expiry': self.days_until_expiry(),
             'days_until_trial_end': self.days_until_trial_end(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'cancelled_at': self.cancelled_at.isoformat() if self.cancelled_at else None,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'cancelled_at': self.cancelled_at,
             'cancelled_reason': self.cancelled_reason
         }
         
@@ -195,6 +208,11 @@ class SubscriptionNotification(db.Model):
     
     # Metadata
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # "already notified?" anti-join of the reminder scan
+        db.Index('idx_subscription_notifications_sub_type_date', 'subscription_id', 'notification_type', 'scheduled_date'),
+    )
     
     def to_dict(self):
         return {
@@ -203,10 +221,10 @@ class SubscriptionNotification(db.Model):
             'notification_type': self.notification_type,
             'title': self.title,
             'message': self.message,
-            'scheduled_date': self.scheduled_date.isoformat() if self.scheduled_date else None,
-            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'scheduled_date': self.scheduled_date,
+            'sent_at': self.sent_at,
             'is_sent': self.is_sent,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class SubscriptionHelper:
@@ -379,30 +397,48 @@ class SubscriptionHelper:
             print(f"Error scheduling notifications: {e}")
     
     @staticmethod
-    def check_and_send_notifications():
-        """Check for notifications that need to be sent today"""
-        today = date.today()
-        
-        pending_notifications = SubscriptionNotification.query.filter(
-            SubscriptionNotification.scheduled_date <= today,
+    def queue_due_notifications():
+        """
+        Queue a delivery job for every notification due today and not sent
+        yet; returns how many were queued. The idempotency key makes running
+        this again a no-op for notifications already queued.
+        """
+        from src.jobs.tasks import enqueue
+
+        due_ids = [notification_id for notification_id, in db.session.query(SubscriptionNotification.id).filter(
+            SubscriptionNotification.scheduled_date <= date.today(),
             SubscriptionNotification.is_sent == False
-        ).all()
-        
-        sent_count = 0
-        for notification in pending_notifications:
-            # Here you would integrate with your email/SMS service
-            # For now, we'll just mark as sent
-            notification.is_sent = True
-            notification.sent_at = datetime.utcnow()
-            sent_count += 1
-        
-        try:
-            db.session.commit()
-            return sent_count
-        except Exception as e:
-            db.session.rollback()
-            print(f"Error sending notifications: {e}")
-            return 0
+        )]
+        for notification_id in due_ids:
+            enqueue('notifications.deliver', {'notification_id': notification_id},
+                    idempotency_key=f'notification:{notification_id}', commit=False)
+        db.session.commit()
+        return len(due_ids)
+    
+    @staticmethod
+    def deliver_notification(notification_id):
+        """Send one notification (background job); False when it is gone or already sent"""
+        notification = db.session.get(SubscriptionNotification, notification_id)
+        if notification is None or notification.is_sent:
+            return False
+        # Here you would integrate with your email/SMS service
+        # For now, we'll just mark as sent
+        notification.is_sent = True
+        notification.sent_at = datetime.utcnow()
+        db.session.commit()
+        return True
+    
+    @staticmethod
+    def notification_backlog():
+        """(number of due unsent notifications, scheduled date of the oldest one)"""
+        row = db.session.query(
+            db.func.count(SubscriptionNotification.id),
+            db.func.min(SubscriptionNotification.scheduled_date)
+        ).filter(
+            SubscriptionNotification.scheduled_date <= date.today(),
+            SubscriptionNotification.is_sent == False
+        ).one()
+        return row[0], row[1]
     
     @staticmethod
     def get_expiring_subscriptions(days_ahead=30):
@@ -415,6 +451,41 @@ class SubscriptionHelper:
             DaycareSubscription.end_date >= date.today()
         ).all()
     
+    @staticmethod
+    def compute_admin_stats(today=None):
+        """
+        Active subscriptions per plan type, their total, and how many end
+        within each EXPIRY_BUCKETS window, from one grouped aggregate
+        """
+        today = today or date.today()
+        expiring = [
+            func.coalesce(func.sum(case(
+                (DaycareSubscription.end_date.between(today, today + timedelta(days=days)), 1), else_=0
+            )), 0)
+            for days in EXPIRY_BUCKETS
+        ]
+        rows = db.session.query(SubscriptionPlan.plan_type, func.count(DaycareSubscription.id), *expiring)\
+            .join(SubscriptionPlan, SubscriptionPlan.id == DaycareSubscription.plan_id)\
+            .filter(DaycareSubscription.status == SubscriptionStatus.ACTIVE)\
+            .group_by(SubscriptionPlan.plan_type)\
+            .all()
+
+        by_plan_type = {plan_type.value: 0 for plan_type in SubscriptionPlanType}
+        expiring_totals = dict.fromkeys(EXPIRY_BUCKETS, 0)
+        for plan_type, count, *buckets in rows:
+            by_plan_type[plan_type.value] = count
+            for days, value in zip(EXPIRY_BUCKETS, buckets):
+                expiring_totals[days] += int(value)
+
+        stats = {'by_plan_type': by_plan_type, 'total_active': sum(by_plan_type.values())}
+        stats.update({f'expiring_{days}_days': value for days, value in expiring_totals.items()})
+        return stats
+
+    @staticmethod
+    def get_admin_stats():
+        """Admin subscription stats, cached for ADMIN_STATS_CACHE_TTL seconds"""
+        return _admin_stats.get_or_set('admin', SubscriptionHelper.compute_admin_stats)
+    
     @staticmethod
     def create_notification(subscription_id, notification_type, title, message,
                             is_urgent=False, scheduled_for=None):
@@ -431,62 +502,80 @@ class SubscriptionHelper:
         db.session.commit()
         return notif
 
-    @staticmethod
-    def check_and_create_reminders():
-        """Scan ACTIVE/TRIAL subs and fire off any 30‑/7‑/0‑day reminders."""
-        subs = DaycareSubscription.query.filter(
-            DaycareSubscription.status.in_([SubscriptionStatus.ACTIVE,
-                                            SubscriptionStatus.TRIAL])
-        ).all()
-
-        for sub in subs:
-            if not sub.needs_renewal_reminder():
-                continue
+    # days before end_date -> (notification type, title, urgent)
+    RENEWAL_REMINDERS = {
+        30: ('renewal_reminder', 'Subscription Renewal Reminder', False),
+        7: ('renewal_reminder', 'Subscription Expires Soon', True),
+        0: ('subscription_expired', 'Subscription Expired', True),
+    }
 
-            days_left = sub.days_until_expiry()
-            key = f'reminder_{days_left}_days'
-            # skip if already created
-            existing = SubscriptionNotification.query.filter_by(
-                subscription_id=sub.id,
-                notification_type=key
-            ).first()
-            if existing:
-                continue
+    @staticmethod
+    def _reminder_message(days_left, plan_name, end_date):
+        if days_left == 30:
+            return (f"Your {plan_name} subscription will expire in 30 days "
+                    f"on {end_date.strftime('%B %d, %Y')}. Renew now to continue service.")
+        if days_left == 7:
+            return (f"Your {plan_name} subscription will expire in 7 days "
+                    f"on {end_date.strftime('%B %d, %Y')}. Please renew to avoid interruption.")
+        return (f"Your {plan_name} subscription expired today. "
+                "Renew now to restore access.")
 
-            # build title/message based on days_left
-            if days_left == 30:
-                title     = "Subscription Renewal Reminder"
-                message   = (
-                    f"Your {sub.plan.name} subscription will expire in 30 days "
-                    f"on {sub.end_date.strftime('%B %d, %Y')}. Renew now to continue service."
-                )
-                is_urgent = False
-            elif days_left == 7:
-                title     = "Subscription Expires Soon"
-                message   = (
-                    f"Your {sub.plan.name} subscription will expire in 7 days "
-                    f"on {sub.end_date.strftime('%B %d, %Y')}. Please renew to avoid interruption."
-                )
-                is_urgent = True
-            else:  # days_left == 0
-                title     = "Subscription Expired"
-                message   = (
-                    f"Your {sub.plan.name} subscription expired today. "
-                    "Renew now to restore access."
-                )
-                is_urgent = True
+    @staticmethod
+    def check_and_create_reminders(today=None):
+        """
+        Create today's 30-/7-/0-day reminders for ACTIVE/TRIAL subscriptions;
+        returns how many were created.
 
-            # create the notification
-            SubscriptionHelper.create_notification(
-                subscription_id=sub.id,
-                notification_type=key,
-                title=title,
-                message=message,
-                is_urgent=is_urgent,
-                scheduled_for=datetime.utcnow()
-            )
+        Set-based: one query selects the subscriptions ending on one of the
+        three reminder dates that have no reminder of that type scheduled
+        today yet (anti-join), and the notifications are inserted in one
+        batch and one transaction, so running it twice a day is harmless.
+        """
+        today = today or date.today()
+        end_dates = {today + timedelta(days=days): days for days in SubscriptionHelper.RENEWAL_REMINDERS}
+        days_left = case(
+            *[(DaycareSubscription.end_date == end_date, days) for end_date, days in end_dates.items()]
+        )
+        notification_type = case(
+            *[(DaycareSubscription.end_date == end_date, SubscriptionHelper.RENEWAL_REMINDERS[days][0])
+              for end_date, days in end_dates.items()]
+        )
+        already_reminded = exists().where(
+            SubscriptionNotification.subscription_id == DaycareSubscription.id,
+            SubscriptionNotification.notification_type == notification_type,
+            SubscriptionNotification.scheduled_date == today,
+        )
+        due = db.session.query(
+            DaycareSubscription.id, DaycareSubscription.end_date, SubscriptionPlan.name, days_left
+        ).join(SubscriptionPlan, SubscriptionPlan.id == DaycareSubscription.plan_id).filter(
+            DaycareSubscription.status.in_([SubscriptionStatus.ACTIVE, SubscriptionStatus.TRIAL]),
+            DaycareSubscription.end_date.in_(list(end_dates)),
+            ~already_reminded,
+        ).all()
+        if not due:
+            return 0
 
-        return True
+        now = datetime.utcnow()
+        rows = []
+        for subscription_id, end_date, plan_name, days in due:
+            notification_type, title, is_urgent = SubscriptionHelper.RENEWAL_REMINDERS[days]
+            rows.append({
+                'subscription_id': subscription_id,
+                'notification_type': notification_type,
+                'title': title,
+                'message': SubscriptionHelper._reminder_message(days, plan_name, end_date),
+                'scheduled_date': today,
+                'scheduled_for': now,
+                'is_urgent': is_urgent,
+                'is_sent': False,
+            })
+        try:
+            db.session.execute(insert(SubscriptionNotification), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
 
 
     @staticmethod
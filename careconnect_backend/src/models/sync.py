@@ -0,0 +1,391 @@
+# src/models/sync.py
+"""
+Per-tenant change log behind GET /api/sync.
+
+Every flushed insert, update or delete of a synced entity appends a
+ChangeLog row in the same transaction (session hooks below), so the log
+commits or rolls back with the change itself. Rows are tagged with the
+audience that may see them: the daycare and child they belong to, or the
+user for per-user entities (messages). Invoices are billed to one parent:
+their entries carry both the daycare, for its staff, and the billed
+parent's user, the only parent who sees them. Changes to a child's contacts,
+permissions, allergies or parent links are logged as an update of the
+child, whose payload embeds them, and payments as an update of their
+invoice, whose balance they change; a parent whose link to a child is
+removed gets the child's deletion addressed to them.
+
+Core bulk statements skip the hooks; code using them records its changes
+with ChangeLogHelper.record (roster import, diff updates of a child).
+
+Clients keep the `cursor` of their last sync and ask for what changed
+since. Entries are compacted to one per entity and resolved against the
+current rows, so a client receives each changed record once, in its
+latest state, or its id under `deletes`.
+
+A cursor is the id of the last entry read, but entries are read in
+(txid, id) order. Ids are handed out at flush time and become visible at
+commit, so a slow transaction can commit an id below one a client has
+already passed. On PostgreSQL `txid` is the id of the writing
+transaction, and readers stop before entries of transactions that may
+still be running (txid >= the snapshot's xmin): every entry that can
+still appear sorts after what has been read. SQLite runs one writing
+transaction at a time, so its ids are already in commit order (txid 0).
+A writing transaction left open holds sync back until it ends.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import event, func, inspect, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from src.models.user import db, Parent
+from src.models.child import Child, ParentChildRelationship
+from src.models.incident import Incident
+from src.models.activity import ChildActivityParticipation, Message, SystemSetting
+from src.models.payment import Invoice, Payment
+from src.models.allergy import ChildAllergy
+from src.models.emergency_contact import EmergencyContact
+from src.models.access_permission import AccessPermission
+
+SYNC_PAGE_SIZE = 500  # log entries read per sync request, at most
+
+PRUNED_SETTING = 'change_log_pruned_through'  # SystemSetting: id of the last pruned entry, in read order
+
+
+class ChangeLog(db.Model):
+    """One change to a synced entity; `id` is the sync cursor"""
+    __tablename__ = 'change_log'
+
+    OPS = ('insert', 'update', 'delete')
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity = db.Column(db.String(32), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(8), nullable=False)
+    daycare_id = db.Column(db.Integer)
+    child_id = db.Column(db.Integer)
+    user_id = db.Column(db.Integer)  # set for per-user entities only
+    txid = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')  # writing transaction (PostgreSQL)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        # read order, and one index per audience the sync query filters on
+        db.Index('idx_change_log_position', 'txid', 'id'),
+        db.Index('idx_change_log_daycare_id', 'daycare_id', 'txid', 'id'),
+        db.Index('idx_change_log_child_id', 'child_id', 'txid', 'id'),
+        db.Index('idx_change_log_user_id', 'user_id', 'txid', 'id'),
+    )
+
+    @classmethod
+    def position(cls):
+        """What entries are ordered and compared by"""
+        return tuple_(cls.txid, cls.id)
+
+
+class FeedSpec:
+    """
+    How rows of `model` appear in the sync feed as `entity`: the attributes
+    naming their daycare and child, or the users they belong to. Rows with
+    a `parent_attr` are seen by that parent only, rather than by every
+    parent of the child.
+    `loader_options` returns the options for loading rows to serialize
+    (called per query: the mappers are not configured at import time).
+    """
+
+    def __init__(self, entity, model, serialize, daycare_attr='daycare_id', child_attr='child_id',
+                 user_attrs=(), parent_attr=None, loader_options=tuple):
+        self.entity = entity
+        self.model = model
+        self.serialize = serialize
+        self.daycare_attr = daycare_attr
+        self.child_attr = child_attr
+        self.user_attrs = user_attrs
+        self.parent_attr = parent_attr
+        self.loader_options = loader_options
+
+    def entries(self, obj, op):
+        entry = {
+            'entity': self.entity,
+            'entity_id': obj.id,
+            'op': op,
+            'daycare_id': getattr(obj, self.daycare_attr) if self.daycare_attr else None,
+            'child_id': getattr(obj, self.child_attr) if self.child_attr else None,
+            'user_id': None,
+        }
+        if not self.user_attrs:
+            return [entry]
+        user_ids = {getattr(obj, attr) for attr in self.user_attrs} - {None}
+        return [dict(entry, user_id=user_id) for user_id in sorted(user_ids)]
+
+    def visible_to(self, principal):
+        """SQL criteria limiting rows of the model to what `principal` may read"""
+        if self.user_attrs:
+            return [or_(*(getattr(self.model, attr) == principal.user_id for attr in self.user_attrs))]
+        if self.parent_attr and not principal.staff:
+            return [getattr(self.model, self.parent_attr) == principal.parent.id]
+        child_id = getattr(self.model, self.child_attr)
+        if principal.staff:
+            if self.daycare_attr:
+                return [getattr(self.model, self.daycare_attr) == principal.staff.daycare_id]
+            return [child_id.in_(select(Child.id).where(Child.daycare_id == principal.staff.daycare_id))]
+        return [child_id.in_(select(ParentChildRelationship.child_id)
+                             .where(ParentChildRelationship.parent_id == principal.parent.id))]
+
+
+FEEDS = {spec.entity: spec for spec in (
+    FeedSpec('children', Child, lambda child: child.serialize('list'), child_attr='id',
+             loader_options=lambda: Child.loader_options('list')),
+    FeedSpec('incidents', Incident, Incident.to_dict),
+    # participations carry no daycare_id: resolved from their child when logged
+    FeedSpec('participations', ChildActivityParticipation, ChildActivityParticipation.to_dict,
+             daycare_attr=None),
+    # billed to one parent: logged for that parent's user (see _flushed_entries)
+    FeedSpec('invoices', Invoice, Invoice.to_dict, parent_attr='parent_id'),
+    FeedSpec('messages', Message, Message.to_dict, daycare_attr=None, user_attrs=('sender_id', 'recipient_id')),
+)}
+
+_FEEDS_BY_MODEL = {spec.model: spec for spec in FEEDS.values()}
+
+# (entity, foreign key, models) of rows reflected in that entity's payload:
+# any change to them is logged as an update of the record they point to
+_PARTS = (
+    ('children', 'child_id', (ChildAllergy, EmergencyContact, AccessPermission, ParentChildRelationship)),
+    ('invoices', 'invoice_id', (Payment,)),  # the invoice's balance
+)
+
+
+class ChangeLogHelper:
+    """Writing and reading the change log"""
+
+    @staticmethod
+    def record(entity, rows, op, connection=None):
+        """
+        Log changes written with Core statements. `rows` are dicts with the
+        entity's id and its daycare_id / child_id; `op` is one of OPS. Runs on the session's
+        connection, so the entries commit or roll back with the rows.
+        """
+        spec = FEEDS[entity]
+        entries = [{
+            'entity': entity,
+            'entity_id': row['id'],
+            'op': op,
+            'daycare_id': row.get('daycare_id'),
+            'child_id': row['id'] if spec.model is Child else row.get('child_id'),
+            'user_id': None,
+        } for row in rows]
+        _write_entries(connection or db.session.connection(), entries)
+
+    @staticmethod
+    def _audience(principal):
+        if principal.staff:
+            # the daycare's entries, those addressed to one of its parents (invoices) included
+            return or_(ChangeLog.user_id == principal.user_id, ChangeLog.daycare_id == principal.staff.daycare_id)
+        scope = ChangeLog.child_id.in_(select(ParentChildRelationship.child_id)
+                                       .where(ParentChildRelationship.parent_id == principal.parent.id))
+        return or_(ChangeLog.user_id == principal.user_id, (ChangeLog.user_id.is_(None)) & scope)
+
+    @staticmethod
+    def _settled():
+        """Criteria for entries no running transaction can still precede (see the module docstring)"""
+        if db.engine.dialect.name == 'postgresql':
+            return [ChangeLog.txid < func.txid_snapshot_xmin(func.txid_current_snapshot())]
+        return []
+
+    @staticmethod
+    def _position_of(cursor):
+        """(txid, id) of the entry `cursor`, or None when it is no longer in the log"""
+        if cursor == 0:
+            return None if ChangeLogHelper.pruned_through() else (0, 0)
+        row = db.session.query(ChangeLog.txid, ChangeLog.id).filter(ChangeLog.id == cursor).first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def current_cursor():
+        """Cursor to start syncing from after a full download"""
+        last = db.session.query(ChangeLog.id).filter(*ChangeLogHelper._settled())\
+            .order_by(ChangeLog.txid.desc(), ChangeLog.id.desc()).first()
+        return last.id if last else 0
+
+    @staticmethod
+    def inserts_since(cursor, entities, limit=SYNC_PAGE_SIZE):
+        """Settled 'insert' entries of `entities` after `cursor`, and the cursor to continue from"""
+        position = ChangeLogHelper._position_of(cursor)
+        if position is None:
+            return [], ChangeLogHelper.current_cursor()  # pruned meanwhile: carry on from now
+        rows = ChangeLog.query.filter(ChangeLog.position() > position, ChangeLog.entity.in_(entities),
+                                      ChangeLog.op == 'insert', *ChangeLogHelper._settled())\
+            .order_by(ChangeLog.txid, ChangeLog.id).limit(limit).all()
+        return rows, rows[-1].id if rows else cursor
+
+    @staticmethod
+    def pruned_through():
+        setting = SystemSetting.query.filter_by(setting_key=PRUNED_SETTING).first()
+        return setting.get_typed_value() if setting else 0
+
+    @staticmethod
+    def changes_since(principal, since, limit=SYNC_PAGE_SIZE):
+        """
+        What `principal` may see that changed after cursor `since`:
+        {'cursor', 'has_more', 'upserts': {entity: [payload]}, 'deletes': {entity: [id]}},
+        or None when `since` is older than the retained log
+        """
+        position = ChangeLogHelper._position_of(since)
+        if position is None:
+            return None
+        rows = db.session.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)\
+            .filter(ChangeLog.position() > position, ChangeLog.entity.in_(FEEDS),
+                    ChangeLogHelper._audience(principal), *ChangeLogHelper._settled())\
+            .order_by(ChangeLog.txid, ChangeLog.id).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        latest = {}  # (entity, id) -> op of the last entry
+        for row in rows:
+            latest[(row.entity, row.entity_id)] = row.op
+        wanted = defaultdict(list)
+        for (entity, entity_id), op in latest.items():
+            if op != 'delete':
+                wanted[entity].append(entity_id)
+
+        upserts, deletes = {}, defaultdict(list)
+        for entity, ids in wanted.items():
+            spec = FEEDS[entity]
+            found = spec.model.query.options(*spec.loader_options())\
+                .filter(spec.model.id.in_(ids), *spec.visible_to(principal))\
+                .order_by(spec.model.id).all()
+            upserts[entity] = [spec.serialize(obj) for obj in found]
+            # gone since, or moved out of the caller's reach
+            missing = set(ids) - {obj.id for obj in found}
+            deletes[entity].extend(sorted(missing))
+        for (entity, entity_id), op in latest.items():
+            if op == 'delete':
+                deletes[entity].append(entity_id)
+
+        return {
+            'cursor': rows[-1].id if rows else since,
+            'has_more': has_more,
+            'upserts': upserts,
+            'deletes': {entity: ids for entity, ids in deletes.items() if ids},
+        }
+
+    @staticmethod
+    def prune(older_than):
+        """
+        Delete entries created before `older_than`, and whatever precedes
+        them in read order, so a cursor still in the log has nothing missing
+        after it; returns how many
+        """
+        last = db.session.query(ChangeLog.txid, ChangeLog.id).filter(ChangeLog.created_at < older_than)\
+            .order_by(ChangeLog.txid.desc(), ChangeLog.id.desc()).first()
+        if last is None:
+            return 0
+        through = last.id
+        count = ChangeLog.query.filter(ChangeLog.position() <= tuple(last)).delete(synchronize_session=False)
+        setting = SystemSetting.query.filter_by(setting_key=PRUNED_SETTING).first()
+        if setting is None:
+            setting = SystemSetting(setting_key=PRUNED_SETTING, setting_type='integer',
+                                    description='Last change_log entry removed; cursors no longer in the log are expired')
+            db.session.add(setting)
+        setting.setting_value = str(through)
+        db.session.commit()
+        return count
+
+
+def _write_entries(connection, entries):
+    now = datetime.utcnow()
+    unique = {tuple(sorted(entry.items())): entry for entry in entries}
+    if unique:
+        statement = ChangeLog.__table__.insert()
+        if connection.dialect.name == 'postgresql':
+            statement = statement.values(txid=func.txid_current())
+        connection.execute(statement, [dict(entry, created_at=now) for entry in unique.values()])
+
+
+# ---------- session hooks ----------
+
+def _flushed_entries(session):
+    entries, pending_daycare, pending_parent = [], [], []
+
+    def add(spec, obj, op):
+        for entry in spec.entries(obj, op):
+            entries.append(entry)
+            if spec.parent_attr:
+                pending_parent.append((entry, getattr(obj, spec.parent_attr)))
+            if entry['daycare_id'] is None and entry['user_id'] is None:
+                pending_daycare.append(entry)
+
+    for obj in session.new:
+        spec = _FEEDS_BY_MODEL.get(type(obj))
+        if spec:
+            add(spec, obj, 'insert')
+    for obj in session.dirty:
+        spec = _FEEDS_BY_MODEL.get(type(obj))
+        if spec and session.is_modified(obj):
+            add(spec, obj, 'update')
+            if spec.parent_attr:
+                # billed to another parent: the previous one loses it
+                for previous in inspect(obj).attrs[spec.parent_attr].history.deleted:
+                    for entry in spec.entries(obj, 'delete'):
+                        entry['daycare_id'] = None
+                        entries.append(entry)
+                        pending_parent.append((entry, previous))
+    for obj in session.deleted:
+        spec = _FEEDS_BY_MODEL.get(type(obj))
+        if spec:
+            add(spec, obj, 'delete')
+
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    for entity, foreign_key, models in _PARTS:
+        spec = FEEDS[entity]
+        touched = set()
+        for obj in changed:
+            if isinstance(obj, models) and (obj in session.deleted or session.is_modified(obj)):
+                # the old owner matters too when a row is moved (e.g. a parent link)
+                history = inspect(obj).attrs[foreign_key].history
+                touched.update(history.added or [getattr(obj, foreign_key)], history.deleted or ())
+        touched -= {obj.id for obj in session.deleted if isinstance(obj, spec.model)} | {None}
+        touched -= {entry['entity_id'] for entry in entries if entry['entity'] == entity}
+        if touched:
+            names = ('id', spec.daycare_attr, spec.child_attr, spec.parent_attr)
+            columns = {name: getattr(spec.model, name) for name in names if name}
+            rows = session.connection().execute(
+                select(*columns.values()).where(spec.model.id.in_(touched))
+            )
+            for row in rows:
+                add(spec, row, 'update')
+
+    # a removed parent link takes the child out of that parent's scope: tell them directly
+    unlinked = [obj for obj in session.deleted if isinstance(obj, ParentChildRelationship)]
+    if unlinked:
+        users = dict(session.connection().execute(
+            select(Parent.id, Parent.user_id).where(Parent.id.in_({obj.parent_id for obj in unlinked}))
+        ).all())
+        entries.extend({
+            'entity': 'children', 'entity_id': obj.child_id, 'op': 'delete',
+            'daycare_id': None, 'child_id': obj.child_id, 'user_id': users.get(obj.parent_id),
+        } for obj in unlinked if users.get(obj.parent_id))
+
+    if pending_parent:
+        users = dict(session.connection().execute(
+            select(Parent.id, Parent.user_id).where(Parent.id.in_({parent_id for _, parent_id in pending_parent}))
+        ).all())
+        for entry, parent_id in pending_parent:
+            entry['user_id'] = users.get(parent_id)
+
+    if pending_daycare:
+        child_ids = {entry['child_id'] for entry in pending_daycare} - {None}
+        daycares = dict(session.connection().execute(
+            select(Child.id, Child.daycare_id).where(Child.id.in_(child_ids))
+        ).all()) if child_ids else {}
+        for entry in pending_daycare:
+            entry['daycare_id'] = daycares.get(entry['child_id'])
+    return entries
+
+
+@event.listens_for(Session, 'after_flush')
+def _log_changes(session, flush_context):
+    # same connection and transaction as the flushed rows
+    entries = _flushed_entries(session)
+    if entries:
+        _write_entries(session.connection(), entries)
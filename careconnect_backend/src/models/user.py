@@ -21,6 +21,8 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     preferred_language = db.Column(db.Enum('en', 'fr', name='languages'), default='en')
+    # Bumped to revoke every JWT issued to this user (see utils/principal.py)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     hoster = db.relationship('WebsiteHoster', backref='user', uselist=False, cascade='all, delete-orphan')
@@ -41,8 +43,8 @@ class User(db.Model):
             'is_active': self.is_active,
             'email_verified': self.email_verified,
             'preferred_language': self.preferred_language,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login
         }
 
 class WebsiteHoster(db.Model):
@@ -64,7 +66,7 @@ class WebsiteHoster(db.Model):
             'last_name': self.last_name,
             'phone': self.phone,
             'admin_level': self.admin_level,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class Daycare(db.Model):
@@ -234,10 +236,10 @@ class Daycare(db.Model):
             'age_groups': self.get_age_groups(),
             'subscription_plan': self.subscription_plan,
             'subscription_status': self.subscription_status,
-            'subscription_start_date': self.subscription_start_date.isoformat() if self.subscription_start_date else None,
-            'subscription_end_date': self.subscription_end_date.isoformat() if self.subscription_end_date else None,
+            'subscription_start_date': self.subscription_start_date,
+            'subscription_end_date': self.subscription_end_date,
             'features_enabled': self.get_features_enabled(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 class DaycareStaff(db.Model):
@@ -275,10 +277,10 @@ class DaycareStaff(db.Model):
             'user_id': self.user_id,
             'daycare_id': self.daycare_id,
             'role': self.role,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
+            'hire_date': self.hire_date,
             'is_active': self.is_active,
             'permissions': self.get_permissions(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
     
 
@@ -320,6 +322,6 @@ class Parent(db.Model):
             'emergency_contact_name': self.emergency_contact_name,
             'emergency_contact_phone': self.emergency_contact_phone,
             'emergency_contact_relationship': self.emergency_contact_relationship,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
@@ -1,8 +1,9 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, create_refresh_token
 from werkzeug.security import check_password_hash, generate_password_hash
 from src.models.user import User, Daycare, db
 from src.models.subscription import Subscription, SubscriptionPlan
+from src.utils.principal import identity_claims, refresh_claims
 from datetime import datetime, date
 import logging
 
@@ -214,13 +215,16 @@ def change_password():
                 }
             }), 400
         
-        # Update password
+        # Update password (revokes every token issued before, see utils/principal.py)
         user.password_hash = generate_password_hash(new_password)
         db.session.commit()
         
+        # fresh tokens so this session stays signed in
         return jsonify({
             'success': True,
-            'message': 'Password changed successfully'
+            'message': 'Password changed successfully',
+            'access_token': create_access_token(identity=str(user.id), additional_claims=identity_claims(user)),
+            'refresh_token': create_refresh_token(identity=str(user.id), additional_claims=refresh_claims(user))
         }), 200
         
     except Exception as e:
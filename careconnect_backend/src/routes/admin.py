@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date
 
 from src.models.user import db, User, WebsiteHoster, Daycare, DaycareStaff
+from src.models.search import SearchHelper
+from src.utils import instrumentation
+from src.utils.principal import current_principal
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -10,10 +13,7 @@ def require_hoster():
     """Decorator to ensure user is a website hoster"""
     def decorator(f):
         def wrapper(*args, **kwargs):
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user or user.user_type != 'hoster':
+            if not current_principal().is_hoster:
                 return jsonify({
                     'error': {
                         'code': 'PERMISSION_DENIED',
@@ -39,13 +39,7 @@ def list_daycares():
         query = Daycare.query
         
         if search:
-            query = query.filter(
-                db.or_(
-                    Daycare.name.ilike(f'%{search}%'),
-                    Daycare.email.ilike(f'%{search}%'),
-                    Daycare.city.ilike(f'%{search}%')
-                )
-            )
+            query = SearchHelper.apply(query, Daycare, 'daycare', search)
         
         if status:
             query = query.filter(Daycare.subscription_status == status)
@@ -344,3 +338,13 @@ def admin_dashboard():
             }
         }), 500
 
+
+@admin_bp.route('/query-stats', methods=['GET'])
+@jwt_required()
+@require_hoster()
+def query_stats():
+    """Per-endpoint SQL count / DB time / latency histograms of this worker process"""
+    return jsonify({
+        'repeat_threshold': current_app.config['SQL_REPEAT_THRESHOLD'],
+        'endpoints': instrumentation.snapshot()
+    }), 200
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, session, send_file, Response, abort, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from werkzeug.security import check_password_hash
 import json
@@ -17,6 +17,9 @@ from src.models.child import Child, ParentChildRelationship, RegistrationRequest
 from src.models.incident import Incident, IncidentFollowup
 from src.models.payment import PaymentPlan, ChildPaymentAssignment, Invoice, InvoiceLineItem, Payment
 from src.models.activity import Activity, ChildActivityParticipation, Message, AuditLog, SystemSetting
+from src.models.search import SearchHelper
+from src.models.stats import CounterHelper
+from src.utils.export import EXPORTS, EXPORT_FORMATS, resolve_format, stream_export
 
 admin_web_bp = Blueprint('admin_web', __name__, template_folder='../templates')
 
@@ -40,18 +43,19 @@ def admin_required(f):
 def dashboard():
     """Admin Dashboard - Overview of all system data"""
     
-    # Get statistics
+    # Get statistics (materialized counters, see models/stats.py)
+    counters = CounterHelper.get_global()
     stats = {
-        'total_users': User.query.count(),
-        'total_daycares': Daycare.query.count(),
-        'total_parents': Parent.query.count(),
-        'total_children': Child.query.count(),
-        'total_activities': Activity.query.count(),
-        'total_incidents': Incident.query.count(),
-        'total_payments': Payment.query.count(),
-        'active_daycares': Daycare.query.filter_by(subscription_status='active').count(),
-        'pending_registrations': RegistrationRequest.query.filter_by(status='pending').count(),
-        'recent_incidents': Incident.query.filter(Incident.severity.in_(['serious', 'emergency'])).count()
+        'total_users': counters['users'],
+        'total_daycares': counters['daycares'],
+        'total_parents': counters['parents'],
+        'total_children': counters['children'],
+        'total_activities': counters['activities'],
+        'total_incidents': counters['incidents'],
+        'total_payments': counters['payments'],
+        'active_daycares': counters['active_daycares'],
+        'pending_registrations': counters['pending_registrations'],
+        'recent_incidents': counters['serious_incidents']
     }
     
     # Get recent activities
@@ -120,7 +124,7 @@ def users():
     query = User.query
     
     if search:
-        query = query.filter(User.email.contains(search))
+        query = SearchHelper.apply(query, User, 'user', search)
     
     if user_type:
         query = query.filter(User.user_type == user_type)
@@ -152,7 +156,7 @@ def user_detail(user_id):
 def toggle_user_status(user_id):
     """Toggle User Active Status"""
     user = User.query.get_or_404(user_id)
-    user.is_active = not user.is_active
+    user.is_active = not user.is_active  # revokes the user's tokens (utils/principal.py)
     db.session.commit()
     
     status = "activated" if user.is_active else "deactivated"
@@ -170,7 +174,7 @@ def daycares():
     query = Daycare.query
     
     if search:
-        query = query.filter(Daycare.name.contains(search))
+        query = SearchHelper.apply(query, Daycare, 'daycare', search)
     
     daycares = query.order_by(desc(Daycare.created_at)).paginate(
         page=page, per_page=20, error_out=False)
@@ -184,16 +188,12 @@ def daycare_detail(daycare_id):
     daycare = Daycare.query.options(joinedload(Daycare.user)).get_or_404(daycare_id)
     
     # Get daycare statistics
-    children_count = Child.query.filter_by(daycare_id=daycare_id).count()
-    staff_count = DaycareStaff.query.filter_by(daycare_id=daycare_id).count()
-    activities_count = Activity.query.join(Child).filter(Child.daycare_id == daycare_id).count()
-    incidents_count = Incident.query.join(Child).filter(Child.daycare_id == daycare_id).count()
-    
+    counters = CounterHelper.get_for_daycare(daycare_id)
     stats = {
-        'children': children_count,
-        'staff': staff_count,
-        'activities': activities_count,
-        'incidents': incidents_count
+        'children': counters['children'],
+        'staff': counters['staff'],
+        'activities': counters['activities'],
+        'incidents': counters['incidents']
     }
     
     # Get recent children
@@ -221,10 +221,7 @@ def children():
     query = Child.query
     
     if search:
-        query = query.filter(
-            (Child.first_name.contains(search)) |
-            (Child.last_name.contains(search))
-        )
+        query = SearchHelper.apply(query, Child, 'child', search)
     
     if daycare_filter:
         query = query.filter(Child.daycare_id == daycare_filter)
@@ -562,59 +559,35 @@ def save_settings():
 @admin_web_bp.route('/admin/export/<entity_type>')
 @admin_required
 def export_data(entity_type):
-    """Export data to CSV"""
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    if entity_type == 'users':
-        writer.writerow(['ID', 'Email', 'Type', 'Active', 'Created At'])
-        users = User.query.all()
-        for user in users:
-            writer.writerow([user.id, user.email, user.user_type, user.is_active, user.created_at])
-    
-    elif entity_type == 'daycares':
-        writer.writerow(['ID', 'Name', 'Email', 'Phone', 'Address', 'Created At'])
-        daycares = Daycare.query.options(joinedload(Daycare.user)).all()
-        for daycare in daycares:
-            writer.writerow([
-                daycare.id, daycare.daycare_name, daycare.user.email,
-                daycare.phone_number, daycare.address, daycare.created_at
-            ])
-    
-    elif entity_type == 'children':
-        writer.writerow(['ID', 'First Name', 'Last Name', 'DOB', 'Daycare', 'Created At'])
-        children = Child.query.options(joinedload(Child.daycare)).all()
-        for child in children:
-            writer.writerow([
-                child.id, child.first_name, child.last_name, child.date_of_birth,
-                child.daycare.daycare_name if child.daycare else 'N/A', child.created_at
-            ])
-    
-    elif entity_type == 'incidents':
-        writer.writerow(['ID', 'Type', 'Severity', 'Child', 'Daycare', 'Date'])
-        incidents = Incident.query.options(
-            joinedload(Incident.child).joinedload(Child.daycare)
-        ).all()
-        for incident in incidents:
-            writer.writerow([
-                incident.id, incident.incident_type, incident.severity,
-                f"{incident.child.first_name} {incident.child.last_name}",
-                incident.child.daycare.daycare_name if incident.child.daycare else 'N/A',
-                incident.incident_date
-            ])
-    
-    output.seek(0)
-    
-    # Create file-like object
-    file_output = io.BytesIO()
-    file_output.write(output.getvalue().encode('utf-8'))
-    file_output.seek(0)
-    
-    return send_file(
-        file_output,
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'{entity_type}_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    """
+    Export data, streamed in batches.
+    ?format=csv (default) | ndjson | ndjson.gz | parquet
+    ?since=<ISO datetime> only exports rows updated at or after that time
+    """
+    spec = EXPORTS.get(entity_type)
+    fmt = resolve_format(request.args.get('format', 'csv'))
+    if spec is None or fmt is None:
+        abort(404)
+    
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            abort(400)
+    
+    # rows updated from here on are picked up by the next `since` export
+    watermark = datetime.utcnow().isoformat()
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f'{entity_type}_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+    return Response(
+        stream_with_context(stream_export(spec, fmt, since or None)),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Export-Format': fmt,
+            'X-Export-Watermark': watermark
+        }
     )
 
 # API ENDPOINTS FOR AJAX CALLS
@@ -622,13 +595,15 @@ def export_data(entity_type):
 @admin_required
 def api_stats():
     """API endpoint for dashboard statistics"""
+    counters = CounterHelper.get_global()
     stats = {
-        'total_users': User.query.count(),
-        'total_daycares': Daycare.query.count(),
-        'total_children': Child.query.count(),
-        'total_activities': Activity.query.count(),
-        'total_incidents': Incident.query.count(),
-        'active_daycares': Daycare.query.join(User).filter(User.is_active == True).count(),
+        'total_users': counters['users'],
+        'total_daycares': counters['daycares'],
+        'total_children': counters['children'],
+        'total_activities': counters['activities'],
+        'total_incidents': counters['incidents'],
+        # daycares whose subscription_status is 'active', as on /admin
+        'active_daycares': counters['active_daycares'],
     }
     return jsonify(stats)
 
@@ -3,11 +3,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import DaycareStaff, db
 from src.models.age_group import AgeGroup
+from src.utils.principal import current_principal
 
 age_groups_bp = Blueprint("age_groups", __name__)
 
 def _current_daycare_id():
-    staff = DaycareStaff.query.filter_by(user_id=get_jwt_identity()).first()
+    staff = current_principal().staff
     return staff.daycare_id if staff else None
 
 @age_groups_bp.route("", methods=["GET"])
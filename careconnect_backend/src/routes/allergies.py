@@ -3,18 +3,17 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from src.models.user import db, DaycareStaff
 from src.models.allergy import Allergy
+from src.utils.principal import current_principal
 
 allergies_bp = Blueprint("allergies", __name__)
 
 def _current_daycare_id():
-    uid = get_jwt_identity()
-    staff = DaycareStaff.query.filter_by(user_id=uid).first()
+    staff = current_principal().staff
     return staff.daycare_id if staff else None
 
 # helper: daycare_id of the logged-in staff member
 def _daycare_id_of_current_staff():
-    from flask_jwt_extended import get_jwt_identity
-    staff = DaycareStaff.query.filter_by(user_id=get_jwt_identity()).first()
+    staff = current_principal().staff
     return staff.daycare_id if staff else None
 
 
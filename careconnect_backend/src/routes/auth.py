@@ -17,6 +17,7 @@ from src.models.subscription import SubscriptionPlan, SubscriptionHelper
 
 from src.models.user import db, User, WebsiteHoster, DaycareStaff, Parent
 from src.models.child import RegistrationRequest
+from src.utils.principal import identity_claims, refresh_claims
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -59,8 +60,10 @@ def login():
         db.session.commit()
         
         # Create tokens
-        access_token = create_access_token(identity=str(user.id))  # ✅ cast to string
-        refresh_token = create_refresh_token(identity=user.id)
+        access_token = create_access_token(identity=str(user.id),  # ✅ cast to string
+                                           additional_claims=identity_claims(user))
+        refresh_token = create_refresh_token(identity=str(user.id),
+                                             additional_claims=refresh_claims(user))
         
         return jsonify({
             'success': True,
@@ -246,8 +249,10 @@ def register():
         db.session.commit()
 
         # generate tokens
-        access_token  = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        access_token  = create_access_token(identity=str(user.id),
+                                            additional_claims=identity_claims(user))
+        refresh_token = create_refresh_token(identity=str(user.id),
+                                             additional_claims=refresh_claims(user))
         
         return jsonify({
             'success': True,
@@ -298,7 +303,9 @@ def refresh():
                 }
             }), 401
         
-        access_token = create_access_token(identity=user.id)
+        # re-read role/daycare so refreshed claims pick up any change
+        access_token = create_access_token(identity=str(user.id),
+                                           additional_claims=identity_claims(user))
         
         
         return jsonify({
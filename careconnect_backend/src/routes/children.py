@@ -15,16 +15,26 @@ from src.models.age_group import AgeGroup, AgeGroupHelper
 from src.models.emergency_contact import EmergencyContact
 from src.models.access_permission import AccessPermission
 from src.models.allergy import Allergy, ChildAllergy
+from src.models.stats import DaycareStatsHelper
+from src.models.sync import ChangeLogHelper
+from src.utils.principal import current_principal
+from src.utils.reconcile import CollectionSpec, reconcile
+from src.utils.roster_import import RosterImporter, RosterError, read_rows
 
 
 
 children_bp = Blueprint('children', __name__)
 
+# natural keys the child's sub-collections are matched on when a child is updated
+EMERGENCY_CONTACTS = CollectionSpec(EmergencyContact, key=('name',), fields=('phone', 'relation'))
+ACCESS_PERMISSIONS = CollectionSpec(AccessPermission, key=('name',),
+                                    fields=('phone', 'relation', 'is_authorized', 'can_pickup'))
+CHILD_ALLERGIES = CollectionSpec(ChildAllergy, key=('allergy_id',), fields=('severity',))
+
 
 def _get_daycare_id_for_current_user():
     """Helper: only DaycareStaff may CRUD children for their own daycare."""
-    user_id = get_jwt_identity()
-    staff = DaycareStaff.query.filter_by(user_id=user_id).first()
+    staff = current_principal().staff
     if not staff:
         return None
     return staff.daycare_id
@@ -44,7 +54,7 @@ def list_children():
 
     # kids = Child.query.filter_by(daycare_id=daycare_id).all()
     # Build query
-    query = Child.query.filter_by(daycare_id=daycare_id)
+    query = Child.query.options(*Child.loader_options('list')).filter_by(daycare_id=daycare_id)
 
     if age_group_id:
         query = query.filter_by(age_group_id=age_group_id)
@@ -53,7 +63,7 @@ def list_children():
         query = query.filter_by(status=status)
     
     kids = query.all()
-    return jsonify([c.to_dict() for c in kids]), 200
+    return jsonify([c.serialize('list') for c in kids]), 200
 
 
 @children_bp.route('/<int:child_id>', methods=['GET'])
@@ -63,8 +73,9 @@ def get_child(child_id):
     if daycare_id is None:
         return jsonify({ 'error': { 'code': 'FORBIDDEN', 'message': 'Not a daycare user' }}), 403
 
-    c = Child.query.filter_by(id=child_id, daycare_id=daycare_id).first_or_404()
-    return jsonify(c.to_dict()), 200
+    c = (Child.query.options(*Child.loader_options('detail'))
+         .filter_by(id=child_id, daycare_id=daycare_id).first_or_404())
+    return jsonify(c.serialize('detail')), 200
 
 
 # @children_bp.route('/ping', methods=['GET'], strict_slashes=False)
@@ -235,6 +246,33 @@ def create_child():
     return jsonify(child.to_dict()), 201
 
 
+@children_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_children():
+    """
+    Create children (with their parents, emergency contact and allergies)
+    from an uploaded CSV/XLSX roster in the multipart field `file`; see
+    utils/roster_import.py for the columns. ?dry_run=1 only validates.
+    Returns counts and a per-row error report.
+    """
+    daycare_id = _get_daycare_id_for_current_user()
+    if daycare_id is None:
+        return jsonify({'error': {'code':'FORBIDDEN','message':'Not a daycare user'}}), 403
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error':{'code':'VALIDATION_ERROR','message':'A roster file is required (field `file`)'}}), 422
+
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    try:
+        report = RosterImporter(daycare_id, dry_run=dry_run).run(read_rows(upload.stream, upload.filename))
+    except RosterError as e:
+        db.session.rollback()
+        return jsonify({'error':{'code':'INVALID_ROSTER','message':str(e)}}), 422
+
+    return jsonify(report), 201 if report['imported'] and not dry_run else 200
+
+
 @children_bp.route('/<int:child_id>', methods=['PUT'])
 @jwt_required()
 def update_child(child_id):
@@ -247,40 +285,26 @@ def update_child(child_id):
     if "medical_info" in data:
         c.medical_info = json.dumps(data["medical_info"])
 
+    # sub-collections are diffed against the stored rows: only what changed is written
+    owner = {'daycare_id': c.daycare_id, 'child_id': c.id}
+    changes = {}
     if 'emergency_contacts' in data:
-        # a) wipe existing ones that belong to this child
-        for ec in list(c.emergency_contacts):
-            db.session.delete(ec)
-
-        # b) insert the fresh list
-        for ec in data['emergency_contacts']:
-            new_ec = EmergencyContact(
-                daycare_id = c.daycare_id,  # same daycare as the child
-                child_id   = c.id,
-                name       = ec['name'],
-                phone      = ec['phone'],
-                relation   = ec.get('relation')
-            )
-            db.session.add(new_ec)
+        changes['emergency_contacts'] = reconcile(EMERGENCY_CONTACTS, c.emergency_contacts, [
+            {'name': ec['name'], 'phone': ec['phone'], 'relation': ec.get('relation')}
+            for ec in data['emergency_contacts']
+        ], owner)
 
     if "access_permissions" in data:
-        # a) delete the old links
-        for ap in list(c.access_permissions):
-            db.session.delete(ap)
-
-        # b) insert the new list from the payload
-        for ap in data["access_permissions"]:
-            db.session.add(
-                AccessPermission(
-                    daycare_id    = c.daycare_id,
-                    child_id      = c.id,
-                    name          = ap["name"],
-                    phone         = ap.get("phone"),
-                    relation      = ap.get("relation"),
-                    is_authorized = ap.get("is_authorized", True),
-                    can_pickup    = ap.get("can_pickup", False),
-                )
-            )
+        changes['access_permissions'] = reconcile(ACCESS_PERMISSIONS, c.access_permissions, [
+            {
+                'name':          ap["name"],
+                'phone':         ap.get("phone"),
+                'relation':      ap.get("relation"),
+                'is_authorized': ap.get("is_authorized", True),
+                'can_pickup':    ap.get("can_pickup", False),
+            }
+            for ap in data["access_permissions"]
+        ], owner)
     if "allergies" in data and "allergy_ids" not in data:
         name_list = [s.strip() for s in data["allergies"].split(",") if s.strip()]
         ids = [
@@ -290,21 +314,14 @@ def update_child(child_id):
         data["allergy_ids"] = ids
     # UPDATE  ------------------------------
     if "allergy_links" in data or "allergy_ids" in data:
-        ChildAllergy.query.filter_by(child_id=c.id).delete()
-
         links = data.get("allergy_links") or [
             {"id": aid, "severity": None}
             for aid in data.get("allergy_ids", [])
         ]
-        for link in links:
-            db.session.add(
-                ChildAllergy(
-                    daycare_id = daycare_id,
-                    child_id   = c.id,
-                    allergy_id = link["id"],
-                    severity   = link.get("severity"),
-                )
-        )
+        changes['allergies'] = reconcile(CHILD_ALLERGIES, c.child_allergies, [
+            {'allergy_id': link["id"], 'severity': link.get("severity")}
+            for link in links
+        ], owner)
 
 
     # # Age group is a simple column; keep what you already had:
@@ -396,8 +413,18 @@ def update_child(child_id):
 
     
 
+    changed = [name for name, diff in changes.items() if diff.changed]
+    if changed:
+        # written with Core statements: the change log's session hooks don't see them
+        ChangeLogHelper.record('children', [{'id': c.id, 'daycare_id': c.daycare_id}], 'update')
+
     db.session.commit()
-    return jsonify(c.to_dict_with_parents()), 200
+
+    # reload in one go: the commit expired every relationship on `c`
+    c = Child.query.options(*Child.loader_options('full')).filter_by(id=c.id).one()
+    response = jsonify(c.serialize('full'))
+    response.headers['X-Changed-Collections'] = ','.join(changed)
+    return response, 200
 
 
 @children_bp.route('/<int:child_id>', methods=['DELETE'])
@@ -419,15 +446,14 @@ def daycare_stats():
     if daycare_id is None:
         return jsonify({ 'error': { 'code':'FORBIDDEN','message':'Not a daycare user' }}), 403
 
-    # grab whatever aggregates you need
-    enrolled   = Child.query.filter_by(daycare_id=daycare_id, status='enrolled').count()
-    waitlisted = Child.query.filter_by(daycare_id=daycare_id, status='waitlist').count()
-    # you can add more: present_today, recent_incidents, etc.
+    # shares the dashboard's cached aggregate
+    counts = DaycareStatsHelper.get_counts(daycare_id)
 
     return jsonify({
-        'enrolled_children': enrolled,
-        'waitlisted':        waitlisted,
-        # …and any other stats…
+        'enrolled_children':     counts['enrolled_children'],
+        'waitlisted':            counts['waitlisted_children'],
+        'pending_registrations': counts['pending_registrations'],
+        'open_incidents':        counts['open_incidents'],
     }), 200
 
 @children_bp.route("/<int:child_id>/full", methods=["GET"])
@@ -435,11 +461,8 @@ def daycare_stats():
 def get_child_full(child_id):
     child = (
         Child.query
-        .options(
-            joinedload(Child.parent_relationships)
-            .joinedload(ParentChildRelationship.parent)   # <— attribute, not string
-        )
+        .options(*Child.loader_options('full'))
         .get_or_404(child_id)
     )
 
-    return jsonify(child.to_dict_with_parents()), 200
\ No newline at end of file
+    return jsonify(child.serialize('full')), 200
\ No newline at end of file
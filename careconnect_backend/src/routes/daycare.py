@@ -8,18 +8,16 @@ from src.models.child import Child, RegistrationRequest
 from src.models.incident import Incident, IncidentFollowup
 from src.models.payment import PaymentPlan, Invoice, Payment
 from src.models.activity import Activity, ChildActivityParticipation
+from src.models.search import SearchHelper
+from src.models.stats import DaycareStatsHelper
+from src.utils.principal import current_principal
+from src.utils.pagination import feed_page
 
 daycare_bp = Blueprint('daycare', __name__)
 
 def get_daycare_staff():
-    """Get current user's daycare staff record"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or user.user_type != 'daycare':
-        return None
-    
-    return DaycareStaff.query.filter_by(user_id=user.id, is_active=True).first()
+    """Get current user's daycare staff reference (id, daycare_id) from the token"""
+    return current_principal().staff
 
 def require_daycare_staff():
     """Decorator to ensure user is daycare staff"""
@@ -46,10 +44,8 @@ def dashboard():
         staff = get_daycare_staff()
         daycare_id = staff.daycare_id
         
-        # Get dashboard statistics
-        total_children = Child.query.filter_by(daycare_id=daycare_id, status='enrolled').count()
-        pending_registrations = RegistrationRequest.query.filter_by(daycare_id=daycare_id, status='pending').count()
-        open_incidents = Incident.query.filter_by(daycare_id=daycare_id, status='open').count()
+        # Get dashboard statistics (one aggregate query, cached per daycare)
+        counts = DaycareStatsHelper.get_counts(daycare_id)
         
         # Get recent incidents
         recent_incidents = Incident.query.filter_by(daycare_id=daycare_id)\
@@ -62,9 +58,9 @@ def dashboard():
         
         return jsonify({
             'statistics': {
-                'total_children': total_children,
-                'pending_registrations': pending_registrations,
-                'open_incidents': open_incidents
+                'total_children': counts['enrolled_children'],
+                'pending_registrations': counts['pending_registrations'],
+                'open_incidents': counts['open_incidents']
             },
             'recent_incidents': [incident.to_dict() for incident in recent_incidents],
             'recent_activities': [activity.to_dict() for activity in recent_activities]
@@ -92,15 +88,11 @@ def list_children():
         status = request.args.get('status', '')
         room = request.args.get('room', '')
         
-        query = Child.query.filter_by(daycare_id=daycare_id)
+        query = Child.query.options(*Child.loader_options('list')).filter_by(daycare_id=daycare_id)
         
         if search:
-            query = query.filter(
-                or_(
-                    Child.first_name.ilike(f'%{search}%'),
-                    Child.last_name.ilike(f'%{search}%')
-                )
-            )
+            # full-text index: prefix and accent-insensitive, best matches first
+            query = SearchHelper.apply(query, Child, 'child', search, daycare_id)
         
         if status:
             query = query.filter(Child.status == status)
@@ -112,7 +104,7 @@ def list_children():
         children = query.offset((page - 1) * limit).limit(limit).all()
         
         return jsonify({
-            'children': [child.to_dict() for child in children],
+            'children': [child.serialize('list') for child in children],
             'total': total,
             'page': page,
             'limit': limit
@@ -224,7 +216,8 @@ def list_children():
 def get_child(child_id):
     try:
         staff = get_daycare_staff()
-        child = Child.query.filter_by(id=child_id, daycare_id=staff.daycare_id).first()
+        child = Child.query.options(*Child.loader_options('detail'))\
+            .filter_by(id=child_id, daycare_id=staff.daycare_id).first()
         
         if not child:
             return jsonify({
@@ -241,7 +234,7 @@ def get_child(child_id):
         recent_activities = ChildActivityParticipation.query.filter_by(child_id=child_id)\
             .order_by(ChildActivityParticipation.created_at.desc()).limit(10).all()
         
-        child_data = child.to_dict()
+        child_data = child.serialize('detail')
         child_data['recent_incidents'] = [incident.to_dict() for incident in recent_incidents]
         child_data['recent_activities'] = [activity.to_dict() for activity in recent_activities]
         
@@ -313,8 +306,6 @@ def list_incidents():
         staff = get_daycare_staff()
         daycare_id = staff.daycare_id
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         child_id = request.args.get('child_id', type=int)
         severity = request.args.get('severity', '')
         status = request.args.get('status', '')
@@ -338,16 +329,16 @@ def list_incidents():
         if date_to:
             query = query.filter(Incident.incident_date <= datetime.strptime(date_to, '%Y-%m-%d').date())
         
-        total = query.count()
-        incidents = query.order_by(Incident.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, Incident, 'incidents')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'incidents': [incident.to_dict() for incident in incidents],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -440,8 +431,6 @@ def list_registrations():
         staff = get_daycare_staff()
         daycare_id = staff.daycare_id
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         status = request.args.get('status', '')
         
         query = RegistrationRequest.query.filter_by(daycare_id=daycare_id)
@@ -449,16 +438,16 @@ def list_registrations():
         if status:
             query = query.filter(RegistrationRequest.status == status)
         
-        total = query.count()
-        requests = query.order_by(RegistrationRequest.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, RegistrationRequest, 'requests')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'requests': [req.to_dict() for req in requests],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -0,0 +1,49 @@
+# src/routes/events.py
+from datetime import timedelta
+
+from flask import Blueprint, Response, current_app, jsonify
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity, get_jwt_request_location, jwt_required
+
+from src.utils import events
+from src.utils.principal import current_principal
+
+events_bp = Blueprint('events', __name__)
+
+
+@events_bp.route('/token', methods=['POST'])
+@jwt_required()
+def stream_token():
+    """Short-lived token for opening the event stream from a URL (EventSource cannot set headers)"""
+    claims = get_jwt()
+    ttl = current_app.config['EVENTS_TOKEN_TTL']
+    token = create_access_token(
+        identity=get_jwt_identity(),
+        expires_delta=timedelta(seconds=ttl),
+        additional_claims=dict({key: claims[key] for key in events.STREAM_TOKEN_CLAIMS if key in claims},
+                               scope=events.STREAM_SCOPE),
+    )
+    return jsonify({'token': token, 'expires_in': ttl}), 200
+
+
+@events_bp.route('', methods=['GET'])
+# EventSource cannot set headers: a stream token may come as ?jwt=<token> instead
+@jwt_required(locations=['headers', 'query_string'])
+def event_stream():
+    """Server-Sent Events for the caller (see src/utils/events.py)"""
+    if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != events.STREAM_SCOPE:
+        # access tokens stay out of URLs (and so out of access logs)
+        return jsonify({'error': {'code': 'STREAM_TOKEN_REQUIRED',
+                                  'message': 'Pass a token from POST /api/events/token in the URL'}}), 401
+
+    principal = current_principal()
+    if principal.user_id is None:
+        return jsonify({'error': {'code': 'FORBIDDEN', 'message': 'Unknown user'}}), 403
+
+    config = current_app.config
+    subscription = events.broker.subscribe(events.user_channel(principal.user_id), config['EVENTS_QUEUE_SIZE'])
+    events.relay.ensure_running(current_app._get_current_object())
+    body = events.stream(subscription, config['EVENTS_KEEPALIVE'], config['EVENTS_MAX_STREAM_SECONDS'])
+    return Response(body, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # nginx: pass events through as they come
+    })
@@ -1,25 +1,26 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from sqlalchemy import and_, or_
+from datetime import datetime, date
+from sqlalchemy import and_, or_, select
 
 from src.models.user import db, User, Parent
-from src.models.child import Child, ParentChildRelationship
+from src.models.child import Child, ParentChildRelationship, child_staff
+from src.models.age_group import AgeGroup
+from src.models.allergy import Allergy, ChildAllergy
+from src.models.emergency_contact import EmergencyContact
+from src.models.access_permission import AccessPermission
 from src.models.incident import Incident
 from src.models.payment import Invoice, Payment
 from src.models.activity import ChildActivityParticipation
+from src.utils.principal import current_principal
+from src.utils.pagination import feed_page
+from src.utils.etag import conditional, source, version_tag
 
 parent_bp = Blueprint('parent', __name__)
 
 def get_parent():
-    """Get current user's parent record"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user or user.user_type != 'parent':
-        return None
-    
-    return Parent.query.filter_by(user_id=user.id).first()
+    """Get current user's parent reference (id) from the token"""
+    return current_principal().parent
 
 def require_parent():
     """Decorator to ensure user is a parent"""
@@ -38,15 +39,54 @@ def require_parent():
         return wrapper
     return decorator
 
-def get_parent_children(parent_id):
+def get_parent_children(parent_id, profile='list'):
     """Get all children associated with a parent"""
-    relationships = ParentChildRelationship.query.filter_by(parent_id=parent_id).all()
-    child_ids = [rel.child_id for rel in relationships]
-    return Child.query.filter(Child.id.in_(child_ids)).all()
+    return Child.query\
+        .join(ParentChildRelationship, ParentChildRelationship.child_id == Child.id)\
+        .filter(ParentChildRelationship.parent_id == parent_id)\
+        .options(*Child.loader_options(profile))\
+        .all()
+
+def children_sources(parent_id):
+    """ETag sources for the rows Child 'list' serialization reads, for a parent's children"""
+    child_ids = select(ParentChildRelationship.child_id).where(ParentChildRelationship.parent_id == parent_id)
+    return (
+        source(ParentChildRelationship, ParentChildRelationship.created_at, ParentChildRelationship.parent_id == parent_id),
+        source(Child, Child.updated_at, Child.id.in_(child_ids)),
+        source(ChildAllergy, ChildAllergy.updated_at, ChildAllergy.child_id.in_(child_ids)),
+        source(Allergy, Allergy.updated_at,
+               Allergy.id.in_(select(ChildAllergy.allergy_id).where(ChildAllergy.child_id.in_(child_ids)))),
+        source(EmergencyContact, EmergencyContact.updated_at, EmergencyContact.child_id.in_(child_ids)),
+        source(AccessPermission, AccessPermission.updated_at, AccessPermission.child_id.in_(child_ids)),
+        # no timestamps on the association: a changed assignment moves the sum of staff ids
+        source(child_staff, child_staff.c.staff_id, child_staff.c.child_id.in_(child_ids), aggregate=db.func.sum),
+        source(AgeGroup, AgeGroup.updated_at,
+               AgeGroup.id.in_(select(Child.age_group_id).where(Child.id.in_(child_ids)))),
+    )
+
+def children_version():
+    parent_id = get_parent().id
+    # ages in the payload are computed against today's date
+    return version_tag(('children', parent_id, date.today()), *children_sources(parent_id))
+
+def dashboard_version():
+    parent_id = get_parent().id
+    child_ids = select(ParentChildRelationship.child_id).where(ParentChildRelationship.parent_id == parent_id)
+    return version_tag(
+        ('dashboard', parent_id, date.today()),
+        *children_sources(parent_id),
+        source(ChildActivityParticipation, ChildActivityParticipation.created_at,
+               ChildActivityParticipation.child_id.in_(child_ids)),
+        source(Incident, Incident.updated_at, Incident.child_id.in_(child_ids)),
+        source(Invoice, Invoice.updated_at, Invoice.parent_id == parent_id),
+        # invoice balances depend on their payments
+        source(Payment, Payment.updated_at, Payment.parent_id == parent_id),
+    )
 
 @parent_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 @require_parent()
+@conditional(dashboard_version)
 def dashboard():
     try:
         parent = get_parent()
@@ -71,7 +111,7 @@ def dashboard():
         pending_invoices = Invoice.query.filter_by(parent_id=parent.id, status='sent').all()
         
         return jsonify({
-            'children': [child.to_dict() for child in children],
+            'children': [child.serialize('list') for child in children],
             'recent_activities': [activity.to_dict() for activity in recent_activities],
             'recent_incidents': [incident.to_dict() for incident in recent_incidents],
             'pending_payments': [invoice.to_dict() for invoice in pending_invoices]
@@ -88,6 +128,7 @@ def dashboard():
 @parent_bp.route('/children', methods=['GET'])
 @jwt_required()
 @require_parent()
+@conditional(children_version)
 def list_children():
     try:
         parent = get_parent()
@@ -126,7 +167,7 @@ def get_child(child_id):
                 }
             }), 404
         
-        child = Child.query.get(child_id)
+        child = Child.query.options(*Child.loader_options('detail')).filter_by(id=child_id).first()
         if not child:
             return jsonify({
                 'error': {
@@ -142,7 +183,7 @@ def get_child(child_id):
         recent_incidents = Incident.query.filter_by(child_id=child_id)\
             .order_by(Incident.created_at.desc()).limit(10).all()
         
-        child_data = child.to_dict()
+        child_data = child.serialize('detail')
         child_data['recent_activities'] = [activity.to_dict() for activity in recent_activities]
         child_data['recent_incidents'] = [incident.to_dict() for incident in recent_incidents]
         child_data['relationship'] = relationship.to_dict()
@@ -178,8 +219,6 @@ def get_child_incidents(child_id):
                 }
             }), 404
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         date_from = request.args.get('date_from', '')
         date_to = request.args.get('date_to', '')
         
@@ -191,16 +230,16 @@ def get_child_incidents(child_id):
         if date_to:
             query = query.filter(Incident.incident_date <= datetime.strptime(date_to, '%Y-%m-%d').date())
         
-        total = query.count()
-        incidents = query.order_by(Incident.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, Incident, 'incidents')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'incidents': [incident.to_dict() for incident in incidents],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -231,8 +270,6 @@ def get_child_activities(child_id):
                 }
             }), 404
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         date_from = request.args.get('date_from', '')
         date_to = request.args.get('date_to', '')
         
@@ -244,16 +281,16 @@ def get_child_activities(child_id):
         if date_to:
             query = query.filter(ChildActivityParticipation.participation_date <= datetime.strptime(date_to, '%Y-%m-%d').date())
         
-        total = query.count()
-        activities = query.order_by(ChildActivityParticipation.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, ChildActivityParticipation, 'activities')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'activities': [activity.to_dict() for activity in activities],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -270,8 +307,6 @@ def list_invoices():
     try:
         parent = get_parent()
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         status = request.args.get('status', '')
         date_from = request.args.get('date_from', '')
         date_to = request.args.get('date_to', '')
@@ -287,16 +322,16 @@ def list_invoices():
         if date_to:
             query = query.filter(Invoice.billing_period_end <= datetime.strptime(date_to, '%Y-%m-%d').date())
         
-        total = query.count()
-        invoices = query.order_by(Invoice.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, Invoice, 'invoices')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'invoices': [invoice.to_dict() for invoice in invoices],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -344,8 +379,6 @@ def list_payments():
     try:
         parent = get_parent()
         
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
         date_from = request.args.get('date_from', '')
         date_to = request.args.get('date_to', '')
         
@@ -357,16 +390,16 @@ def list_payments():
         if date_to:
             query = query.filter(Payment.payment_date <= datetime.strptime(date_to, '%Y-%m-%d').date())
         
-        total = query.count()
-        payments = query.order_by(Payment.created_at.desc())\
-            .offset((page - 1) * limit).limit(limit).all()
+        body, error = feed_page(query, Payment, 'payments')
+        if error:
+            return jsonify({
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': error
+                }
+            }), 422
         
-        return jsonify({
-            'payments': [payment.to_dict() for payment in payments],
-            'total': total,
-            'page': page,
-            'limit': limit
-        }), 200
+        return jsonify(body), 200
         
     except Exception as e:
         return jsonify({
@@ -426,6 +459,8 @@ def process_payment():
         )
         
         db.session.add(payment)
+        db.session.flush()
+        db.session.refresh(invoice, ['amount_paid'])
         
         # Update invoice status if fully paid
         if invoice.calculate_balance() <= 0:
@@ -8,6 +8,8 @@ from src.models.subscription import (
     SubscriptionHelper, SubscriptionPlanType, SubscriptionStatus
 )
 from src.routes.daycare import get_daycare_staff
+from src.utils.principal import current_principal
+from src.jobs.tasks import enqueue
 
 subscription_bp = Blueprint('subscription', __name__)
 
@@ -392,10 +394,7 @@ def get_subscription_notifications():
 def send_pending_notifications():
     """Send pending notifications (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.user_type != 'hoster':
+        if not current_principal().is_hoster:
             return jsonify({
                 'error': {
                     'code': 'UNAUTHORIZED',
@@ -403,13 +402,15 @@ def send_pending_notifications():
                 }
             }), 403
         
-        sent_count = SubscriptionHelper.check_and_send_notifications()
+        # delivered by the job workers; one dispatch per minute however often this is called
+        job = enqueue('notifications.dispatch_due',
+                      idempotency_key=f"notifications.dispatch_due:{datetime.utcnow():%Y-%m-%dT%H:%M}")
         
         return jsonify({
             'success': True,
-            'sent_count': sent_count,
-            'message': f'Sent {sent_count} notifications'
-        }), 200
+            'job': job.to_dict(),
+            'message': 'Notification delivery queued'
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -424,10 +425,7 @@ def send_pending_notifications():
 def get_expiring_subscriptions():
     """Get subscriptions expiring soon (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.user_type != 'hoster':
+        if not current_principal().is_hoster:
             return jsonify({
                 'error': {
                     'code': 'UNAUTHORIZED',
@@ -457,10 +455,7 @@ def get_expiring_subscriptions():
 def get_subscription_stats():
     """Get subscription statistics (admin only)"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.user_type != 'hoster':
+        if not current_principal().is_hoster:
             return jsonify({
                 'error': {
                     'code': 'UNAUTHORIZED',
@@ -468,30 +463,9 @@ def get_subscription_stats():
                 }
             }), 403
         
-        # Get subscription counts by plan type
-        stats = {}
-        for plan_type in SubscriptionPlanType:
-            count = DaycareSubscription.query.join(SubscriptionPlan).filter(
-                SubscriptionPlan.plan_type == plan_type,
-                DaycareSubscription.status == SubscriptionStatus.ACTIVE
-            ).count()
-            stats[plan_type.value] = count
-        
-        # Get total active subscriptions
-        total_active = DaycareSubscription.query.filter_by(status=SubscriptionStatus.ACTIVE).count()
-        
-        # Get expiring soon
-        expiring_30_days = len(SubscriptionHelper.get_expiring_subscriptions(30))
-        expiring_7_days = len(SubscriptionHelper.get_expiring_subscriptions(7))
-        
         return jsonify({
             'success': True,
-            'stats': {
-                'by_plan_type': stats,
-                'total_active': total_active,
-                'expiring_30_days': expiring_30_days,
-                'expiring_7_days': expiring_7_days
-            }
+            'stats': SubscriptionHelper.get_admin_stats()
         }), 200
         
     except Exception as e:
@@ -0,0 +1,37 @@
+# src/routes/sync.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+
+from src.models.sync import ChangeLogHelper, SYNC_PAGE_SIZE
+from src.utils.principal import current_principal
+
+sync_bp = Blueprint('sync', __name__)
+
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def sync():
+    """
+    Changes since `since` (the cursor of the previous sync) to the caller's
+    children, incidents, activity participations, invoices and messages.
+    Without `since`, only returns the cursor to start from after a full
+    download of the listings.
+    """
+    principal = current_principal()
+    if not (principal.staff or principal.parent):
+        return jsonify({'error': {'code': 'FORBIDDEN', 'message': 'Not a daycare or parent user'}}), 403
+
+    if 'since' not in request.args:
+        return jsonify({'cursor': ChangeLogHelper.current_cursor(), 'has_more': False,
+                        'upserts': {}, 'deletes': {}}), 200
+
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': {'code': 'VALIDATION_ERROR', 'message': 'since must be a sync cursor'}}), 422
+
+    limit = max(1, min(request.args.get('limit', SYNC_PAGE_SIZE, type=int), SYNC_PAGE_SIZE))
+    changes = ChangeLogHelper.changes_since(principal, since, limit)
+    if changes is None:
+        return jsonify({'error': {'code': 'CURSOR_EXPIRED',
+                                  'message': 'Changes since this cursor are no longer kept; download the listings again'}}), 410
+    return jsonify(changes), 200
@@ -0,0 +1,271 @@
+# src/seeders/seed_synthetic.py
+"""
+Reproducible synthetic dataset for load testing and benchmarks.
+
+    flask seed-synthetic --scale small|medium|large [--seed 42]
+
+The same scale and seed always produce the same rows. Rows are built in
+Python and written with Core executemany inserts (no ORM objects, one
+round trip per batch and table), with ids allocated up front so related
+rows can be generated without reading anything back.
+
+Every synthetic user has the password SYNTHETIC_PASSWORD; the first
+daycare's owner, the first parent and the hoster are the accounts the
+benchmark harness (src/benchmarks/endpoints.py) signs in as.
+
+Bulk inserts bypass the ORM session hooks, so the materialized counters
+are reconciled and the search index is rebuilt at the end.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, text
+
+from src.models.user import db, User, Daycare, DaycareStaff, Parent
+from src.models.child import Child, ParentChildRelationship, child_staff
+from src.models.activity import Activity, ChildActivityParticipation
+from src.models.incident import Incident
+from src.models.payment import Invoice, Payment
+from src.models.age_group import AgeGroupHelper, AgeGroupIndex
+from src.models.stats import CounterHelper
+from src.models.search import SearchHelper
+
+SYNTHETIC_PASSWORD = 'synthetic-pass'
+HOSTER_EMAIL = 'hoster@synthetic.test'
+
+# per-daycare shape; "large" is ~5k daycares / 300k children / 3M participations
+SCALES = {
+    'small': {'daycares': 5, 'children_per_daycare': 20},
+    'medium': {'daycares': 200, 'children_per_daycare': 60},
+    'large': {'daycares': 5000, 'children_per_daycare': 60},
+}
+STAFF_PER_DAYCARE = 6
+ACTIVITIES_PER_DAYCARE = 20
+PARTICIPATIONS_PER_CHILD = 10
+INCIDENTS_PER_CHILD = 0.5
+INVOICE_MONTHS = 6
+SIBLING_RATE = 0.2  # share of children whose parent already has a child here
+
+FIRST_NAMES = ['Emma', 'Liam', 'Olivia', 'Noah', 'Léa', 'William', 'Alice', 'Thomas', 'Chloé',
+               'Jacob', 'Zoé', 'Félix', 'Charlotte', 'Nathan', 'Rosalie', 'Samuel', 'Maëlle', 'Adam']
+LAST_NAMES = ['Tremblay', 'Gagnon', 'Roy', 'Côté', 'Bouchard', 'Gauthier', 'Morin', 'Lavoie',
+              'Fortin', 'Smith', 'Brown', 'Wilson', 'Martin', 'Nguyen', 'Singh', 'Ouellet']
+CITIES = [('Montréal', 'QC'), ('Québec', 'QC'), ('Toronto', 'ON'), ('Ottawa', 'ON'),
+          ('Vancouver', 'BC'), ('Calgary', 'AB'), ('Halifax', 'NS'), ('Winnipeg', 'MB')]
+ACTIVITY_TYPES = ['learning', 'play', 'meal', 'nap', 'outdoor', 'art', 'music', 'reading']
+
+# insert order respects foreign keys
+TABLES = [
+    User.__table__, Daycare.__table__, DaycareStaff.__table__, Parent.__table__,
+    Child.__table__, child_staff, ParentChildRelationship.__table__, Activity.__table__,
+    ChildActivityParticipation.__table__, Incident.__table__, Invoice.__table__, Payment.__table__,
+]
+
+
+class _Writer:
+    """Buffers rows per table and writes them in FK order once any buffer is full"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = {table.name: [] for table in TABLES}
+        self.written = {table.name: 0 for table in TABLES}
+
+    def add(self, table, row):
+        buffer = self.buffers[table.name]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table in TABLES:
+            rows = self.buffers[table.name]
+            if rows:
+                db.session.execute(table.insert(), rows)
+                self.written[table.name] += len(rows)
+                self.buffers[table.name] = []
+        db.session.commit()
+
+
+def _next_ids():
+    models = {'users': User, 'daycares': Daycare, 'daycare_staff': DaycareStaff, 'parents': Parent,
+              'children': Child, 'parent_child_relationships': ParentChildRelationship,
+              'activities': Activity, 'child_activity_participation': ChildActivityParticipation,
+              'incidents': Incident, 'invoices': Invoice, 'payments': Payment}
+    return {name: (db.session.query(func.max(model.id)).scalar() or 0) + 1
+            for name, model in models.items()}
+
+
+def _sync_sequences():
+    """Move PostgreSQL id sequences past the explicitly inserted ids"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        if 'id' in table.c:
+            db.session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+            ))
+    db.session.commit()
+
+
+def run(scale='small', seed=42, batch_size=5000, as_of=None, daycares=None, children_per_daycare=None):
+    """Generate a dataset; returns {table: rows written}"""
+    shape = dict(SCALES[scale])
+    if daycares:
+        shape['daycares'] = daycares
+    if children_per_daycare:
+        shape['children_per_daycare'] = children_per_daycare
+
+    rng = random.Random(seed)
+    as_of = as_of or date(2026, 1, 1)
+    now = datetime.combine(as_of, time(12))
+
+    AgeGroupHelper.ensure_standard_age_groups()
+    age_index = AgeGroupIndex.load_all()[1]
+
+    probe = User(email='', user_type='parent')
+    probe.set_password(SYNTHETIC_PASSWORD)  # bcrypt once, shared by every synthetic user
+    password_hash = probe.password_hash
+
+    ids = _next_ids()
+    writer = _Writer(batch_size)
+
+    def new_id(table):
+        value = ids[table]
+        ids[table] += 1
+        return value
+
+    def stamp(days_back):
+        return now - timedelta(days=days_back, seconds=rng.randint(0, 86399))
+
+    if not User.query.filter_by(email=HOSTER_EMAIL).first():
+        writer.add(User.__table__, {'id': new_id('users'), 'email': HOSTER_EMAIL,
+                                    'password_hash': password_hash, 'user_type': 'hoster',
+                                    'is_active': True, 'email_verified': True})
+
+    for d in range(shape['daycares']):
+        daycare_id = new_id('daycares')
+        city, province = rng.choice(CITIES)
+        writer.add(Daycare.__table__, {
+            'id': daycare_id, 'name': f'Garderie {rng.choice(LAST_NAMES)} {daycare_id}',
+            'street': f'{rng.randint(1, 9999)} rue Principale', 'city': city, 'province': province,
+            'postal_code': f'H{rng.randint(0, 9)}A {rng.randint(0, 9)}B{rng.randint(0, 9)}',
+            'phone': f'514-555-{daycare_id % 10000:04d}', 'email': f'daycare{daycare_id}@synthetic.test',
+            'capacity': shape['children_per_daycare'] + 20,
+            'subscription_status': rng.choice(['trial', 'active', 'active', 'active', 'suspended']),
+            'created_at': stamp(rng.randint(400, 900)),
+        })
+
+        staff_ids = []
+        for s in range(STAFF_PER_DAYCARE):
+            user_id, staff_id = new_id('users'), new_id('daycare_staff')
+            writer.add(User.__table__, {'id': user_id, 'email': f'staff{user_id}@synthetic.test',
+                                        'password_hash': password_hash, 'user_type': 'daycare',
+                                        'is_active': True, 'email_verified': True})
+            writer.add(DaycareStaff.__table__, {
+                'id': staff_id, 'user_id': user_id, 'daycare_id': daycare_id,
+                'role': 'owner' if s == 0 else rng.choice(['teacher', 'teacher', 'assistant', 'director']),
+                'hire_date': as_of - timedelta(days=rng.randint(30, 2000)), 'is_active': True,
+            })
+            staff_ids.append(staff_id)
+
+        activity_ids = []
+        for _ in range(ACTIVITIES_PER_DAYCARE):
+            activity_id = new_id('activities')
+            kind = rng.choice(ACTIVITY_TYPES)
+            writer.add(Activity.__table__, {
+                'id': activity_id, 'daycare_id': daycare_id, 'activity_name': f'{kind.title()} time',
+                'activity_type': kind, 'duration_minutes': rng.choice([15, 30, 45, 60]),
+                'is_active': True, 'created_at': stamp(rng.randint(60, 400)),
+            })
+            activity_ids.append(activity_id)
+
+        parents = []  # (parent_id, last_name)
+        for _ in range(shape['children_per_daycare']):
+            if parents and rng.random() < SIBLING_RATE:
+                parent_id, last_name = rng.choice(parents)
+            else:
+                user_id, parent_id = new_id('users'), new_id('parents')
+                last_name = rng.choice(LAST_NAMES)
+                writer.add(User.__table__, {'id': user_id, 'email': f'parent{user_id}@synthetic.test',
+                                            'password_hash': password_hash, 'user_type': 'parent',
+                                            'is_active': True, 'email_verified': True})
+                writer.add(Parent.__table__, {
+                    'id': parent_id, 'user_id': user_id, 'first_name': rng.choice(FIRST_NAMES),
+                    'last_name': last_name, 'phone': f'438-555-{parent_id % 10000:04d}',
+                })
+                parents.append((parent_id, last_name))
+
+            child_id = new_id('children')
+            birth_date = as_of - timedelta(days=rng.randint(120, 2200))
+            enrolled_on = stamp(rng.randint(30, 700))
+            writer.add(Child.__table__, {
+                'id': child_id, 'first_name': rng.choice(FIRST_NAMES), 'last_name': last_name,
+                'date_of_birth': birth_date, 'daycare_id': daycare_id, 'primary_parent_id': parent_id,
+                'age_group_id': age_index.lookup(AgeGroupHelper.age_in_months_on(birth_date, as_of)),
+                'status': rng.choices(['enrolled', 'waitlist', 'withdrawn', 'graduated'], [85, 8, 4, 3])[0],
+                'created_at': enrolled_on, 'updated_at': enrolled_on,
+            })
+            writer.add(child_staff, {'child_id': child_id, 'staff_id': rng.choice(staff_ids)})
+            writer.add(ParentChildRelationship.__table__, {
+                'id': new_id('parent_child_relationships'), 'parent_id': parent_id, 'child_id': child_id,
+                'relationship_type': rng.choice(['mother', 'father', 'guardian']), 'is_primary': True,
+                'can_pickup': True,
+            })
+
+            for _ in range(PARTICIPATIONS_PER_CHILD):
+                days_back = rng.randint(0, 180)
+                writer.add(ChildActivityParticipation.__table__, {
+                    'id': new_id('child_activity_participation'), 'child_id': child_id,
+                    'activity_id': rng.choice(activity_ids), 'participation_date': as_of - timedelta(days=days_back),
+                    'participation_level': rng.choices(['full', 'partial', 'observer', 'absent'], [70, 15, 5, 10])[0],
+                    'recorded_by': rng.choice(staff_ids), 'created_at': stamp(days_back),
+                })
+
+            incidents = int(INCIDENTS_PER_CHILD) + (rng.random() < INCIDENTS_PER_CHILD % 1)
+            for _ in range(incidents):
+                days_back = rng.randint(0, 365)
+                created = stamp(days_back)
+                writer.add(Incident.__table__, {
+                    'id': new_id('incidents'), 'child_id': child_id, 'daycare_id': daycare_id,
+                    'reported_by': rng.choice(staff_ids),
+                    'incident_type': rng.choice(['accident', 'injury', 'illness', 'behavioral', 'other']),
+                    'severity': rng.choices(['minor', 'moderate', 'serious', 'emergency'], [70, 22, 7, 1])[0],
+                    'title': 'Synthetic incident', 'description': 'Generated for load testing.',
+                    'incident_date': created.date(), 'incident_time': time(rng.randint(7, 17), rng.choice([0, 15, 30, 45])),
+                    'status': rng.choice(['open', 'resolved', 'resolved', 'closed']),
+                    'created_at': created, 'updated_at': created,
+                })
+
+            for month in range(INVOICE_MONTHS):
+                invoice_id = new_id('invoices')
+                # whole calendar months, most recent (the one before as_of) first
+                period_start = as_of.replace(day=1) - relativedelta(months=month + 1)
+                period_end = period_start + relativedelta(months=1) - timedelta(days=1)
+                total = Decimal(rng.choice([650, 850, 1100, 1350])).quantize(Decimal('0.01'))
+                created = datetime.combine(period_end, time(9)) + timedelta(days=1)
+                paid = month > 0 or rng.random() < 0.5
+                writer.add(Invoice.__table__, {
+                    'id': invoice_id, 'invoice_number': f'SYN-{invoice_id:08d}', 'parent_id': parent_id,
+                    'daycare_id': daycare_id, 'child_id': child_id,
+                    'billing_period_start': period_start, 'billing_period_end': period_end,
+                    'subtotal': total, 'tax_amount': Decimal('0.00'), 'total_amount': total,
+                    'due_date': period_end + timedelta(days=15), 'status': 'paid' if paid else 'sent',
+                    'created_at': created, 'updated_at': created,
+                })
+                if paid:
+                    writer.add(Payment.__table__, {
+                        'id': new_id('payments'), 'invoice_id': invoice_id, 'parent_id': parent_id,
+                        'payment_method': rng.choice(['credit_card', 'debit_card', 'bank_transfer']),
+                        'amount': total, 'payment_date': period_end + timedelta(days=rng.randint(1, 14)),
+                        'status': 'completed', 'created_at': created + timedelta(days=3),
+                        'updated_at': created + timedelta(days=3),
+                    })
+
+    writer.flush()
+    _sync_sequences()
+    CounterHelper.reconcile()
+    SearchHelper.rebuild()
+    return writer.written
@@ -0,0 +1,60 @@
+# src/utils/cache.py
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache whose entries expire after `ttl`
+    seconds. Each gunicorn worker keeps its own copy, so anything cached
+    here may be up to `ttl` seconds stale in the other workers.
+
+    Expired entries are dropped as new ones are set, and `maxsize` (if
+    given) caps the entry count by evicting the oldest, so caches keyed by
+    open-ended values (query params...) stay bounded.
+    """
+
+    def __init__(self, ttl, maxsize=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}  # key -> (value, stored at), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit and now - hit[1] < self.ttl:
+                return hit[0]
+        return default
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)  # re-inserted last: the dict stays in storage order
+            self._data[key] = (value, now)
+            self._evict(now)
+
+    def _evict(self, now):
+        while self._data:
+            oldest = next(iter(self._data))
+            if now - self._data[oldest][1] < self.ttl and (self.maxsize is None or len(self._data) <= self.maxsize):
+                break
+            del self._data[oldest]
+
+    def get_or_set(self, key, loader):
+        """Cached value for `key`, calling `loader()` on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,88 @@
+# src/utils/compression.py
+"""
+Transparent response compression.
+
+An after_request hook compresses bodies of at least COMPRESS_MIN_SIZE bytes
+whose mimetype is textual (JSON, HTML, CSS, JS, SVG, CSV), picking the
+best encoding the client accepts: brotli when the `brotli` package is
+installed (optional dependency), gzip otherwise. Streamed responses, files
+sent with direct passthrough and bodies that already carry a
+Content-Encoding are left alone.
+
+A strong ETag identifies one byte-exact representation, so the compressed
+body gets the tag with the encoding appended ("<tag>-gzip"); utils/etag.py
+matches If-None-Match against either form.
+"""
+import gzip
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/',
+)
+
+ETAG_SUFFIXES = ('-br', '-gzip')
+
+
+def _encode(body, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['COMPRESS_BR_QUALITY'])
+    return gzip.compress(body, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compressible(response, min_size):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.is_streamed or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    return response.content_length is not None and response.content_length >= min_size
+
+
+def _compress_response(response):
+    if not (response.mimetype or '').startswith(COMPRESSIBLE_MIMETYPES):
+        return response
+    config = current_app.config
+    response.vary.add('Accept-Encoding')
+    if not _compressible(response, config['COMPRESS_MIN_SIZE']):
+        return response
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(_encode(response.get_data(), encoding, config))
+    response.headers['Content-Encoding'] = encoding
+    tag, weak = response.get_etag()
+    if tag and not weak:
+        response.set_etag(f'{tag}-{encoding}')
+    return response
+
+
+def init_app(app):
+    """
+    Compress responses.
+    COMPRESS_MIN_SIZE: smallest body (bytes) worth compressing
+    COMPRESS_LEVEL: gzip level (1-9)
+    COMPRESS_BR_QUALITY: brotli quality (0-11); 4-5 suits dynamic responses
+    """
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_QUALITY', 5)
+    app.after_request(_compress_response)
@@ -0,0 +1,99 @@
+# src/utils/etag.py
+"""
+Conditional GET for read-heavy endpoints.
+
+A view decorated with @conditional(version) gets a strong ETag computed
+from the rows it would serialize, *before* it runs: `version` returns a tag
+built by version_tag() from one aggregate statement (row count plus latest
+updated_at, per source table). When the client's If-None-Match holds that
+tag the view is skipped and a bodiless 304 is sent, so neither the ORM
+objects nor the JSON are built.
+
+    @parent_bp.route('/children')
+    @jwt_required()
+    @require_parent()
+    @conditional(lambda: children_version(get_parent().id))
+    def list_children(): ...
+
+Counting rows as well as taking the latest timestamp catches deletes, which
+leave no updated_at behind. Tags of compressed representations carry an
+encoding suffix (utils/compression.py) that is ignored when matching.
+"""
+import hashlib
+import logging
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import String, cast, func, literal, select, union_all
+
+from src.models.user import db
+from src.utils.compression import ETAG_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+
+def source(table, stamp, *criteria, aggregate=func.max):
+    """Rows of `table` matching `criteria`, summarized as (count, aggregate(stamp))"""
+    return table, stamp, criteria, aggregate
+
+
+def version_tag(scope, *sources):
+    """
+    Strong ETag value for `scope` (anything identifying the payload's shape
+    and audience, e.g. endpoint and parent id) and the current state of
+    `sources`, read in a single statement.
+    """
+    parts = [repr(scope)]
+    if sources:
+        statement = union_all(*[
+            select(literal(index).label('source'), func.count().label('rows'),
+                   cast(aggregate(stamp), String).label('version'))
+            .select_from(table).where(*criteria)
+            for index, (table, stamp, criteria, aggregate) in enumerate(sources)
+        ])
+        parts.extend(repr(tuple(row)) for row in sorted(db.session.execute(statement)))
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:32]
+
+
+def _matching(tag):
+    """The If-None-Match entry naming `tag` in any encoding ('*' counts), or None"""
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return tag
+    for candidate in if_none_match.as_set(include_weak=True):
+        for suffix in ETAG_SUFFIXES:
+            if candidate == tag + suffix:
+                return candidate
+        if candidate == tag:
+            return candidate
+    return None
+
+
+def conditional(version):
+    """Decorator: ETag from `version(*view_args)`, 304 on a matching If-None-Match"""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            try:
+                tag = version(*args, **kwargs)
+            except Exception:
+                # never fail the request over a cache validator; serve it uncached
+                logger.exception('Could not compute ETag for %s', request.path)
+                db.session.rollback()
+                return f(*args, **kwargs)
+
+            matched = _matching(tag)
+            if matched:
+                # echo the representation the client holds (e.g. "<tag>-gzip")
+                response = current_app.response_class(status=304)
+                response.set_etag(matched)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(tag)
+            # the payload is per-user and must be revalidated on every use
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
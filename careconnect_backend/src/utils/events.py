@@ -0,0 +1,261 @@
+# src/utils/events.py
+"""
+Server-Sent Events push channel (GET /api/events).
+
+Parents keep one EventSource open instead of polling the dashboard, and
+receive new incidents and activity participations of their children and
+new messages addressed to them:
+
+    id: 1842                      <- change log cursor (usable with /api/sync)
+    event: incidents
+    data: {...incident...}
+
+Fan-out is in-process: each open stream subscribes to its user's channel
+on the LocalBroker. Events come from the sync change log (models/sync.py)
+rather than from the request that made the change, so every process sees
+the inserts committed by any other: one relay thread per process tails
+the log (one query per EVENTS_POLL_INTERVAL for all of that process's
+streams, none while it has no stream open) and publishes to the local
+channels. A shared broker (Redis pub/sub, PostgreSQL LISTEN/NOTIFY)
+would only replace the relay's source.
+
+A stream holds a thread while open: serve it from threaded or gevent
+workers, or from the dedicated process in src/events_main.py. Streams
+close after EVENTS_MAX_STREAM_SECONDS and when a client falls too far
+behind; EventSource reconnects by itself, and the client catches up with
+/api/sync from the last event id it received.
+
+EventSource cannot set headers, so browsers pass a token in the URL,
+where access logs keep it. That token is a stream token from
+POST /api/events/token: valid for EVENTS_TOKEN_TTL seconds and for
+opening the stream only (factory.token_scope_check), never the access
+token itself. A client whose stream ends asks for a new one to reconnect.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+
+from src.models.user import db, Parent
+from src.models.child import ParentChildRelationship
+from src.models.sync import ChangeLogHelper, FEEDS
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# change log entities pushed, and whom they go to
+PUSHED_ENTITIES = ('incidents', 'participations', 'messages')
+
+# `scope` claim of stream tokens
+STREAM_SCOPE = 'events'
+# identity claims a stream token carries over from the access token it was issued for
+STREAM_TOKEN_CLAIMS = ('user_type', 'staff_id', 'parent_id', 'daycare_id', 'tv')
+
+_CLOSE = object()  # queued to end a subscription's stream
+
+
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue(maxsize)
+
+    def get(self, timeout):
+        """Next encoded event, None on timeout, or _CLOSE"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Channel -> subscriptions of this process"""
+
+    def __init__(self):
+        self.channels = defaultdict(set)
+        self.lock = threading.Lock()
+        self.subscribed = threading.Event()  # set while any stream is open
+
+    def subscribe(self, channel, queue_size=100):
+        subscription = Subscription(self, channel, queue_size)
+        with self.lock:
+            self.channels[channel].add(subscription)
+            self.subscribed.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[subscription.channel]
+            if not self.channels:
+                self.subscribed.clear()
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                # too far behind: end the stream, the client resyncs on reconnect
+                self.unsubscribe(subscription)
+                _drain(subscription.queue)
+                subscription.queue.put_nowait(_CLOSE)
+
+    def open_streams(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.channels.values())
+
+
+def _drain(q):
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def encode(event_id, event, data):
+    """One SSE message; `data` is serialized with the app's JSON provider"""
+    return f'id: {event_id}\nevent: {event}\ndata: {current_app.json.dumps(data)}\n\n'
+
+
+def deliveries(entries):
+    """
+    (user ids, event_id, entity, payload) for change log insert `entries`:
+    incidents and participations go to the parents of their child,
+    messages to their recipient. One query per entity, one for the parents.
+    """
+    first_entry = {}
+    for entry in entries:
+        first_entry.setdefault((entry.entity, entry.entity_id), entry.id)
+
+    records = {}
+    for entity in PUSHED_ENTITIES:
+        ids = [entity_id for kind, entity_id in first_entry if kind == entity]
+        if ids:
+            spec = FEEDS[entity]
+            for obj in spec.model.query.filter(spec.model.id.in_(ids)):
+                records[(entity, obj.id)] = obj
+
+    child_ids = {obj.child_id for (entity, _), obj in records.items() if entity != 'messages'}
+    parents = defaultdict(list)
+    if child_ids:
+        rows = db.session.query(ParentChildRelationship.child_id, Parent.user_id)\
+            .join(Parent, Parent.id == ParentChildRelationship.parent_id)\
+            .filter(ParentChildRelationship.child_id.in_(child_ids))
+        for child_id, user_id in rows:
+            parents[child_id].append(user_id)
+
+    for key, event_id in sorted(first_entry.items(), key=lambda item: item[1]):
+        obj = records.get(key)
+        if obj is None:
+            continue  # deleted since
+        entity = key[0]
+        users = [obj.recipient_id] if entity == 'messages' else parents[obj.child_id]
+        if users:
+            yield users, event_id, entity, FEEDS[entity].serialize(obj)
+
+
+class ChangeLogRelay:
+    """
+    Tails the change log and publishes inserts of PUSHED_ENTITIES to the
+    channels of the users they concern. Runs in a daemon thread, started
+    with the first stream of the process.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.cursor = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def ensure_running(self, app):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, args=(app,), name='sse-relay', daemon=True)
+                self.thread.start()
+
+    def run(self, app):
+        poll_interval = app.config['EVENTS_POLL_INTERVAL']
+        while True:
+            if not self.broker.subscribed.is_set():
+                # nobody listening: stop polling, and skip what happened meanwhile
+                self.cursor = None
+                self.broker.subscribed.wait()
+            started = time.monotonic()
+            try:
+                with app.app_context():
+                    self.poll()
+            except Exception:
+                logger.exception('Event relay poll failed')
+            time.sleep(max(poll_interval - (time.monotonic() - started), 0))
+
+    def poll(self):
+        try:
+            if self.cursor is None:
+                self.cursor = ChangeLogHelper.current_cursor()
+                return
+            entries, self.cursor = ChangeLogHelper.inserts_since(self.cursor, PUSHED_ENTITIES)
+            for user_ids, event_id, entity, payload in deliveries(entries):
+                message = encode(event_id, entity, payload)
+                for user_id in user_ids:
+                    self.broker.publish(user_channel(user_id), message)
+        finally:
+            db.session.remove()
+
+
+# one of each per process, shared by every app built in it
+broker = LocalBroker()
+relay = ChangeLogRelay(broker)
+
+
+def stream(subscription, keepalive, max_seconds):
+    """SSE body for `subscription`; ends after `max_seconds` or when the broker closes it"""
+    deadline = time.monotonic() + max_seconds
+    try:
+        # reconnect delay for EventSource, in milliseconds
+        yield 'retry: 3000\n\n'
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = subscription.get(min(keepalive, remaining))
+            if message is _CLOSE:
+                return
+            yield message if message is not None else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+def open_stream_gauges():
+    return [('sse_open_streams', 'Server-Sent Event streams open', {}, broker.open_streams())]
+
+
+def init_app(app):
+    """
+    EVENTS_POLL_INTERVAL: seconds between two change log reads of the relay
+    EVENTS_KEEPALIVE: seconds of silence before a comment line keeps the stream open
+    EVENTS_MAX_STREAM_SECONDS: streams end after this long; clients reconnect
+    EVENTS_QUEUE_SIZE: undelivered events a stream may hold before it is closed
+    EVENTS_TOKEN_TTL: seconds a stream token (?jwt=) can be used to open a stream
+    """
+    app.config.setdefault('EVENTS_POLL_INTERVAL', 1.0)
+    app.config.setdefault('EVENTS_KEEPALIVE', 15)
+    app.config.setdefault('EVENTS_MAX_STREAM_SECONDS', 300)
+    app.config.setdefault('EVENTS_QUEUE_SIZE', 100)
+    app.config.setdefault('EVENTS_TOKEN_TTL', 60)
+    metrics.register_process_gauge(open_stream_gauges)
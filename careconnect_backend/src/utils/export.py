@@ -0,0 +1,270 @@
+# src/utils/export.py
+"""
+Streaming exports for the admin console.
+
+Each export selects plain columns (no ORM objects, no identity map) and is
+read with `yield_per`, which makes SQLAlchemy use a server-side cursor on
+PostgreSQL. Rows are encoded and handed to the WSGI server a batch at a
+time, so memory stays bounded and the first bytes go out before the last
+row has been read.
+
+Formats:
+
+* csv – human-readable columns (`ExportSpec.headers` / `row`).
+* ndjson, ndjson.gz – one JSON object per row with the raw query columns
+  plus `updated_at`, for the analytics pipelines.
+* parquet – the same columns as typed Parquet row groups, one per batch.
+  Needs the optional `pyarrow` package; without it the request falls back
+  to ndjson.gz (see `resolve_format`).
+
+Passing `since` restricts any format to rows whose `updated_at` is at or
+after it, so nightly jobs can pull only what changed since the watermark
+of their previous run.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import sqlalchemy as sa
+
+from src.models.user import db, User, Daycare
+from src.models.child import Child
+from src.models.incident import Incident
+from src.models.payment import Invoice, Payment
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pq = None
+
+EXPORT_BATCH_SIZE = 1000  # rows fetched per round trip / flushed per chunk
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'ndjson.gz': ('application/gzip', 'ndjson.gz'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+class ExportSpec:
+    """Source model, CSV headers, the query producing the rows and a CSV row formatter"""
+
+    def __init__(self, model, headers, query, row=tuple):
+        self.model = model
+        self.headers = headers
+        self.query = query
+        self.row = row
+
+    def statement(self, since=None, with_updated_at=False):
+        query = self.query()
+        if since is not None:
+            query = query.filter(self.model.updated_at >= since)
+        if with_updated_at:
+            query = query.add_columns(self.model.updated_at.label('updated_at'))
+        return query.statement
+
+
+def _address(row):
+    return ', '.join(part for part in (row.street, row.city, row.province, row.postal_code) if part)
+
+
+EXPORTS = {
+    'users': ExportSpec(
+        User,
+        ['ID', 'Email', 'Type', 'Active', 'Created At'],
+        lambda: db.session.query(
+            User.id, User.email, User.user_type, User.is_active, User.created_at
+        ).order_by(User.id),
+    ),
+    'daycares': ExportSpec(
+        Daycare,
+        ['ID', 'Name', 'Email', 'Phone', 'Address', 'Created At'],
+        lambda: db.session.query(
+            Daycare.id, Daycare.name, Daycare.email, Daycare.phone,
+            Daycare.street, Daycare.city, Daycare.province, Daycare.postal_code,
+            Daycare.created_at
+        ).order_by(Daycare.id),
+        lambda r: (r.id, r.name, r.email, r.phone, _address(r), r.created_at),
+    ),
+    'children': ExportSpec(
+        Child,
+        ['ID', 'First Name', 'Last Name', 'DOB', 'Daycare', 'Created At'],
+        lambda: db.session.query(
+            Child.id, Child.first_name, Child.last_name, Child.date_of_birth,
+            Daycare.name.label('daycare_name'), Child.created_at
+        ).outerjoin(Daycare, Child.daycare_id == Daycare.id).order_by(Child.id),
+        lambda r: (r.id, r.first_name, r.last_name, r.date_of_birth,
+                   r.daycare_name or 'N/A', r.created_at),
+    ),
+    'incidents': ExportSpec(
+        Incident,
+        ['ID', 'Type', 'Severity', 'Child', 'Daycare', 'Date'],
+        lambda: db.session.query(
+            Incident.id, Incident.incident_type, Incident.severity,
+            Child.first_name, Child.last_name,
+            Daycare.name.label('daycare_name'), Incident.incident_date
+        ).join(Child, Incident.child_id == Child.id)
+         .outerjoin(Daycare, Child.daycare_id == Daycare.id)
+         .order_by(Incident.id),
+        lambda r: (r.id, r.incident_type, r.severity, f"{r.first_name} {r.last_name}",
+                   r.daycare_name or 'N/A', r.incident_date),
+    ),
+    'invoices': ExportSpec(
+        Invoice,
+        ['ID', 'Invoice Number', 'Parent ID', 'Daycare ID', 'Child ID', 'Period Start',
+         'Period End', 'Total', 'Currency', 'Status', 'Due Date', 'Created At'],
+        lambda: db.session.query(
+            Invoice.id, Invoice.invoice_number, Invoice.parent_id, Invoice.daycare_id,
+            Invoice.child_id, Invoice.billing_period_start, Invoice.billing_period_end,
+            Invoice.total_amount, Invoice.currency, Invoice.status, Invoice.due_date,
+            Invoice.created_at
+        ).order_by(Invoice.id),
+    ),
+    'payments': ExportSpec(
+        Payment,
+        ['ID', 'Invoice ID', 'Parent ID', 'Method', 'Amount', 'Currency', 'Status',
+         'Payment Date', 'Created At'],
+        lambda: db.session.query(
+            Payment.id, Payment.invoice_id, Payment.parent_id, Payment.payment_method,
+            Payment.amount, Payment.currency, Payment.status, Payment.payment_date,
+            Payment.created_at
+        ).order_by(Payment.id),
+    ),
+}
+
+
+def resolve_format(fmt):
+    """The format actually produced for `fmt`, or None if unknown"""
+    if fmt not in EXPORT_FORMATS:
+        return None
+    if fmt == 'parquet' and pq is None:
+        return 'ndjson.gz'
+    return fmt
+
+
+def iter_batches(stmt, batch_size=EXPORT_BATCH_SIZE):
+    """Lists of up to `batch_size` rows, read through a server-side cursor"""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    yield from result.partitions()
+
+
+def stream_export(spec, fmt, since=None, batch_size=EXPORT_BATCH_SIZE):
+    """Byte chunks of `spec` in `fmt` (as returned by resolve_format)"""
+    if fmt == 'csv':
+        return stream_csv(spec, since, batch_size)
+    stmt = spec.statement(since, with_updated_at=True)
+    if fmt == 'ndjson':
+        return stream_ndjson(stmt, batch_size)
+    if fmt == 'ndjson.gz':
+        return _gzip(stream_ndjson(stmt, batch_size))
+    return stream_parquet(stmt, batch_size)
+
+
+def stream_csv(spec, since=None, batch_size=EXPORT_BATCH_SIZE):
+    """UTF-8 CSV chunks: the header line, then one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk.encode('utf-8')
+
+    writer.writerow(spec.headers)
+    yield drain()
+
+    for batch in iter_batches(spec.statement(since), batch_size):
+        writer.writerows(spec.row(row) for row in batch)
+        yield drain()
+
+
+# ---------- ndjson ----------
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)  # keep the exact amount
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def stream_ndjson(stmt, batch_size=EXPORT_BATCH_SIZE):
+    """One JSON object per line, one chunk per batch"""
+    for batch in iter_batches(stmt, batch_size):
+        lines = [json.dumps(row._asdict(), default=_json_default, ensure_ascii=False)
+                 for row in batch]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ---------- parquet ----------
+
+def _arrow_type(sql_type):
+    if isinstance(sql_type, sa.Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, sa.Integer):
+        return pa.int64()
+    if isinstance(sql_type, sa.Float):
+        return pa.float64()
+    if isinstance(sql_type, sa.Numeric):
+        return pa.decimal128(sql_type.precision or 18, sql_type.scale or 2)
+    if isinstance(sql_type, sa.DateTime):
+        return pa.timestamp('us')
+    if isinstance(sql_type, sa.Date):
+        return pa.date32()
+    return pa.string()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out by drain()"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(stmt, batch_size=EXPORT_BATCH_SIZE):
+    """Parquet file bytes, one row group per batch; the footer comes last"""
+    schema = pa.schema([(column.name, _arrow_type(column.type)) for column in stmt.selected_columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for batch in iter_batches(stmt, batch_size):
+            writer.write_table(pa.Table.from_pylist([row._asdict() for row in batch], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
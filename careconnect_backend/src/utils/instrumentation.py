@@ -0,0 +1,159 @@
+# src/utils/instrumentation.py
+"""
+Per-request SQL instrumentation.
+
+Engine-level cursor hooks count every statement a request issues and time
+it. At the end of the request:
+
+* the statement count, DB time and total latency are folded into
+  per-endpoint histograms in the metrics registry (always on, cheap; see
+  utils/metrics.py and `snapshot()`);
+* statements whose shape repeats more than SQL_REPEAT_THRESHOLD times in
+  one request are logged as a likely N+1 and counted against the endpoint;
+* outside production (INSTRUMENTATION_HEADERS) the numbers are also sent
+  back as X-DB-* response headers.
+
+A statement's "shape" is its SQL text with whitespace collapsed and
+bound-parameter lists folded, so `WHERE id = ?` issued for fifty different
+ids is one fingerprint seen fifty times.
+"""
+import hashlib
+import re
+import time
+from collections import Counter, defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.utils import metrics
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAM_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+
+
+def fingerprint(statement):
+    """Short, stable id for the shape of a SQL statement"""
+    shape = _PARAM_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+    return hashlib.sha1(shape.encode()).hexdigest()[:10]
+
+
+class QueryStats:
+    """Statements issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.db_time += elapsed
+        fp = fingerprint(statement)
+        self.fingerprints[fp] += 1
+        self.samples.setdefault(fp, statement)
+
+    def repeated(self, threshold):
+        """[(fingerprint, times, sample statement)] for shapes seen more than `threshold` times"""
+        return [(fp, n, self.samples[fp]) for fp, n in self.fingerprints.most_common() if n > threshold]
+
+
+def snapshot():
+    """Aggregated per-endpoint stats for this process"""
+    requests_by_endpoint = defaultdict(int)
+    for labels, value in metrics.registry.counters('http_requests_total').items():
+        requests_by_endpoint[dict(labels)['endpoint']] += value
+    repeated = {dict(labels)['endpoint']: value for labels, value
+                in metrics.registry.counters('db_repeated_statement_requests_total').items()}
+
+    out = {endpoint: {'requests': n, 'repeated_statement_requests': repeated.get(endpoint, 0)}
+           for endpoint, n in requests_by_endpoint.items()}
+    for name, key in (('db_queries_per_request', 'queries'),
+                      ('db_time_per_request_seconds', 'db_time_seconds'),
+                      ('http_request_duration_seconds', 'latency_seconds')):
+        for labels, histogram in metrics.registry.histograms(name).items():
+            endpoint = dict(labels)['endpoint']
+            if endpoint in out:
+                out[endpoint][key] = histogram.to_dict()
+    return dict(sorted(out.items()))
+
+
+# ---------- SQLAlchemy hooks ----------
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    if has_request_context():
+        stats = g.get('query_stats')
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+# ---------- Flask hooks ----------
+
+def _start_request():
+    g.query_stats = QueryStats()
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+
+    latency_ms = (time.perf_counter() - g.request_started) * 1000
+    db_time_ms = stats.db_time * 1000
+    endpoint = request.endpoint or 'unmatched'
+    repeated = stats.repeated(current_app.config['SQL_REPEAT_THRESHOLD'])
+
+    if repeated:
+        current_app.logger.warning(
+            'Repeated SQL statements in %s %s (%s): %s',
+            request.method, request.path, endpoint,
+            '; '.join(f'{n}x [{fp}] {_WHITESPACE.sub(" ", sample)[:200]}' for fp, n, sample in repeated)
+        )
+
+    blueprint = request.blueprint or ''
+    registry = metrics.registry
+    registry.inc('http_requests_total', blueprint=blueprint, endpoint=endpoint,
+                 method=request.method, status=str(response.status_code))
+    registry.observe('http_request_duration_seconds', latency_ms / 1000,
+                     blueprint=blueprint, endpoint=endpoint)
+    registry.observe('db_queries_per_request', stats.count, endpoint=endpoint)
+    registry.observe('db_time_per_request_seconds', stats.db_time, endpoint=endpoint)
+    if repeated:
+        registry.inc('db_repeated_statement_requests_total', endpoint=endpoint)
+    metrics.ensure_flusher()
+
+    if current_app.config['INSTRUMENTATION_HEADERS']:
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-Ms'] = f'{db_time_ms:.1f}'
+        response.headers['X-Response-Time-Ms'] = f'{latency_ms:.1f}'
+        if repeated:
+            response.headers['X-DB-Repeated-Statements'] = ','.join(f'{fp}x{n}' for fp, n, _ in repeated)
+    return response
+
+
+def init_app(app):
+    """
+    Turn on request instrumentation.
+    SQL_REPEAT_THRESHOLD: same statement shape allowed this many times per request
+    INSTRUMENTATION_HEADERS: add X-DB-* headers to responses (keep off in production)
+    """
+    app.config.setdefault('SQL_REPEAT_THRESHOLD', 5)
+    app.config.setdefault('INSTRUMENTATION_HEADERS', app.debug)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,72 @@
+# src/utils/json_provider.py
+"""
+JSON provider for API responses (app.json, used by jsonify and request.get_json).
+
+Encodes with orjson when it is installed (optional dependency) and with the
+standard library otherwise. Both paths handle, without help from the caller:
+
+* datetime / date / time -> ISO 8601 strings (not Flask's RFC 822 dates)
+* Decimal -> number
+* Enum -> its value (e.g. SubscriptionStatus.ACTIVE -> "active")
+
+so model to_dict() methods return these values as they are. Anything else
+goes through Flask's default handling (UUID, dataclasses, Markup).
+"""
+import enum
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, enum.Enum):
+        return o.value
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+    ensure_ascii = False
+
+    def _orjson_option(self, indent):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False):
+        """UTF-8 bytes of `obj`; stdlib when orjson is missing or refuses (e.g. ints over 64 bits)"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+            except TypeError:
+                pass
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,27 @@
+# src/utils/loaders.py
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def eager_options(model, paths):
+    """
+    Turn dotted relationship paths ("child_allergies.allergy", "age_group")
+    into loader options for `model`.
+
+    Collections are loaded with selectinload (one extra query per
+    relationship, whatever the page size) and many-to-one links with
+    joinedload, so serializing a list of rows costs a constant number of
+    round trips instead of one per row.
+    """
+    options = []
+    for path in paths:
+        current_model = model
+        loader = None
+        for name in path.split('.'):
+            attr = getattr(current_model, name)
+            prop = inspect(current_model).relationships[name]
+            strategy = selectinload if prop.uselist else joinedload
+            loader = strategy(attr) if loader is None else getattr(loader, strategy.__name__)(attr)
+            current_model = prop.mapper.class_
+        options.append(loader)
+    return options
@@ -0,0 +1,392 @@
+# src/utils/metrics.py
+"""
+In-process metrics exported at /metrics in the Prometheus text format.
+
+Counters and histograms live in a per-process registry guarded by one
+lock; recording a sample is a dict lookup and a few integer additions.
+
+Under gunicorn each worker has its own registry. When METRICS_DIR is set,
+every worker writes its registry there as `<pid>-<start>.json`
+(atomically, every METRICS_FLUSH_INTERVAL seconds and on each scrape), and
+whichever worker answers the scrape merges all the files, so counters and
+histograms cover the whole deployment. A worker that stopped writing more
+than METRICS_STALE_AFTER seconds ago is gone (exited, or recycled after
+max_requests): its counters and histograms are folded into `archive.json`,
+and only its process gauges are dropped. Scrapes archive and read under
+one file lock, so each file is counted once. Exported counters therefore never go down,
+which Prometheus would read as a reset. Without METRICS_DIR the endpoint
+reports the answering process only.
+
+Gauges come from two kinds of callbacks:
+
+* process gauges (`register_process_gauge`, e.g. DB pool usage) describe
+  one worker; they are sampled into its snapshot and exported with a
+  `pid` label;
+* collectors (`register_collector`, e.g. the notification backlog) read
+  shared state such as the database and run only at scrape time.
+"""
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+METRICS_FLUSH_INTERVAL = 10   # seconds between worker snapshots
+METRICS_STALE_AFTER = 300     # seconds before a silent worker's file is archived
+
+ARCHIVE_FILE = 'archive.json'  # counters and histograms of workers that are gone
+ARCHIVE_LOCK_FILE = 'archive.lock'
+
+# name -> (type, help, buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'HTTP requests by route, method and status', None),
+    'http_request_duration_seconds': (
+        'histogram', 'HTTP request latency by route', LATENCY_BUCKETS),
+    'db_queries_per_request': (
+        'histogram', 'SQL statements issued per request', QUERY_COUNT_BUCKETS),
+    'db_time_per_request_seconds': (
+        'histogram', 'Time spent in SQL per request', DB_TIME_BUCKETS),
+    'db_repeated_statement_requests_total': (
+        'counter', 'Requests repeating one statement shape past SQL_REPEAT_THRESHOLD', None),
+}
+
+PREFIX = 'careconnect_'
+
+
+class Histogram:
+    """Per-bucket counts (last slot = +Inf), sum and count; callers hold the lock"""
+
+    def __init__(self, buckets, counts=None, total=0.0, count=0):
+        self.buckets = tuple(buckets)
+        self.counts = list(counts) if counts else [0] * (len(self.buckets) + 1)
+        self.sum = total
+        self.count = count
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)] including +Inf"""
+        out, running = [], 0
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            running += n
+            out.append((bound, running))
+        return out
+
+    def to_dict(self):
+        return {
+            'buckets': [['+Inf' if b == math.inf else b, n] for b, n in self.cumulative()],
+            'sum': round(self.sum, 6),
+            'count': self.count,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def histograms(self, name):
+        """{labels dict as tuple: Histogram copy} for one histogram metric"""
+        with self._lock:
+            return {labels: Histogram(h.buckets, h.counts, h.sum, h.count)
+                    for (n, labels), h in self._histograms.items() if n == name}
+
+    def counters(self, name):
+        with self._lock:
+            return {labels: v for (n, labels), v in self._counters.items() if n == name}
+
+    def dump(self):
+        with self._lock:
+            return {
+                'counters': [[n, list(map(list, labels)), v] for (n, labels), v in self._counters.items()],
+                'histograms': [[n, list(map(list, labels)), h.counts, h.sum, h.count]
+                               for (n, labels), h in self._histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+registry = MetricsRegistry()
+
+# callables returning [(name, help, labels dict, value)] gauges
+_process_gauges = []
+_collectors = []
+_watched_engines = set()
+
+_config = {'directory': None, 'flusher_pid': None, 'snapshot_pid': None, 'snapshot_name': None}
+
+
+def register_process_gauge(gauge):
+    if gauge not in _process_gauges:
+        _process_gauges.append(gauge)
+    return gauge
+
+
+def register_collector(collector):
+    if collector not in _collectors:
+        _collectors.append(collector)
+    return collector
+
+
+def _sample_process_gauges():
+    pid = str(os.getpid())
+    samples = []
+    for gauge in _process_gauges:
+        for name, help_text, labels, value in gauge():
+            samples.append([name, help_text, sorted(dict(labels, pid=pid).items()), value])
+    return samples
+
+
+def watch_pool(engine, name='default'):
+    """Export `engine`'s connection pool usage as process gauges labelled pool=`name`"""
+    if engine in _watched_engines:
+        return
+    _watched_engines.add(engine)
+
+    def pool_gauges():
+        pool, labels = engine.pool, {'pool': name}
+        if not hasattr(pool, 'checkedout'):
+            return []  # e.g. SQLite's singleton/static pools
+        return [
+            ('db_pool_checked_out', 'Connections currently checked out of the pool', labels, pool.checkedout()),
+            ('db_pool_overflow', 'Connections open beyond pool_size', labels, max(pool.overflow(), 0)),
+            ('db_pool_size', 'Configured pool size', labels, pool.size()),
+        ]
+    register_process_gauge(pool_gauges)
+
+
+# ---------- multi-process snapshots ----------
+
+def _snapshot_path(directory):
+    # the start time keeps a recycled pid from overwriting its predecessor's file
+    if _config['snapshot_pid'] != os.getpid():
+        _config['snapshot_pid'] = os.getpid()
+        _config['snapshot_name'] = f'{os.getpid()}-{time.time_ns()}.json'
+    return os.path.join(directory, _config['snapshot_name'])
+
+
+def _write_json(path, state):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_snapshot(directory):
+    state = registry.dump()
+    state['gauges'] = _sample_process_gauges()
+    _write_json(_snapshot_path(directory), state)
+
+
+def _add_dump(counters, histograms, dump):
+    """Sum the counters and histograms of a registry dump into `counters` and `histograms`"""
+    for name, labels, value in dump['counters']:
+        key = (name, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, counts, total, count in dump['histograms']:
+        if name not in METRICS:
+            continue
+        key = (name, tuple(map(tuple, labels)))
+        incoming = Histogram(METRICS[name][2], counts, total, count)
+        if key in histograms:
+            histograms[key].merge(incoming)
+        else:
+            histograms[key] = incoming
+
+
+def _archive_stale(directory, paths):
+    """Fold the snapshots `paths` of workers that are gone into the archive, then remove them"""
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    counters, histograms = {}, {}
+    if os.path.exists(archive_path):
+        _add_dump(counters, histograms, _read_json(archive_path))
+    for path in paths:
+        try:
+            _add_dump(counters, histograms, _read_json(path))
+        except ValueError:
+            pass  # unreadable: nothing to keep
+    _write_json(archive_path, {
+        'counters': [[n, list(map(list, labels)), v] for (n, labels), v in counters.items()],
+        'histograms': [[n, list(map(list, labels)), h.counts, h.sum, h.count]
+                       for (n, labels), h in histograms.items()],
+    })
+    for path in paths:
+        os.remove(path)
+
+
+def _read_snapshots(directory):
+    """
+    Dumps of the archive and of every live worker, archiving stale ones
+    first. Runs under an exclusive lock on the directory, so a scrape never
+    reads a file and the archive it is being folded into.
+    """
+    with open(os.path.join(directory, ARCHIVE_LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            live, stale = [], []
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == ARCHIVE_FILE:
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    (stale if now - os.path.getmtime(path) > METRICS_STALE_AFTER else live).append(path)
+                except OSError:
+                    continue
+            if stale:
+                _archive_stale(directory, stale)
+
+            dumps = []
+            for path in [os.path.join(directory, ARCHIVE_FILE)] + live:
+                try:
+                    dumps.append(_read_json(path))
+                except (OSError, ValueError):
+                    continue  # no archive yet
+            return dumps
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _merged_state(directory):
+    """Counters and histograms summed over every worker snapshot and the archive"""
+    counters, histograms, gauges = {}, {}, []
+    if directory:
+        write_snapshot(directory)
+        dumps = _read_snapshots(directory)
+    else:
+        dump = registry.dump()
+        dump['gauges'] = _sample_process_gauges()
+        dumps = [dump]
+
+    for dump in dumps:
+        _add_dump(counters, histograms, dump)
+        gauges.extend(dump.get('gauges', ()))
+    return counters, histograms, gauges
+
+
+def ensure_flusher():
+    """
+    Start this process's snapshot thread if it has none yet. Called per
+    request rather than at startup so that gunicorn workers forked from a
+    preloaded app each get their own thread.
+    """
+    directory = _config['directory']
+    if not directory or _config['flusher_pid'] == os.getpid():
+        return
+    _config['flusher_pid'] = os.getpid()
+
+    def run():
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            try:
+                write_snapshot(directory)
+            except OSError:
+                pass
+
+    threading.Thread(target=run, name='metrics-flusher', daemon=True).start()
+
+
+# ---------- text format ----------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    counters, histograms, process_gauges = _merged_state(_config['directory'])
+    lines = []
+
+    for name, (kind, help_text, _) in METRICS.items():
+        full = PREFIX + name
+        lines.append(f'# HELP {full} {help_text}')
+        lines.append(f'# TYPE {full} {kind}')
+        if kind == 'counter':
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f'{full}{_labels(labels)} {_number(value)}')
+        else:
+            for (n, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+                if n != name:
+                    continue
+                for bound, running in histogram.cumulative():
+                    lines.append(f'{full}_bucket{_labels(labels + (("le", _number(bound)),))} {running}')
+                lines.append(f'{full}_sum{_labels(labels)} {_number(histogram.sum)}')
+                lines.append(f'{full}_count{_labels(labels)} {histogram.count}')
+
+    gauges = [(name, help_text, tuple(map(tuple, labels)), value)
+              for name, help_text, labels, value in process_gauges]
+    for collector in _collectors:
+        gauges.extend((name, help_text, tuple(sorted(labels.items())), value)
+                      for name, help_text, labels, value in collector())
+
+    seen = set()
+    for name, help_text, labels, value in sorted(gauges, key=lambda g: g[0]):
+        full = PREFIX + name
+        if full not in seen:
+            seen.add(full)
+            lines.append(f'# HELP {full} {help_text}')
+            lines.append(f'# TYPE {full} gauge')
+        lines.append(f'{full}{_labels(labels)} {_number(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def init_app(app):
+    """
+    METRICS_DIR: shared directory for per-worker snapshots (multi-process deployments)
+    METRICS_TOKEN: if set, /metrics requires `Authorization: Bearer <token>`
+    """
+    app.config.setdefault('METRICS_DIR', None)
+    app.config.setdefault('METRICS_TOKEN', None)
+    _config['directory'] = app.config['METRICS_DIR']
+    if _config['directory']:
+        os.makedirs(_config['directory'], exist_ok=True)
@@ -0,0 +1,115 @@
+# src/utils/pagination.py
+"""
+Pagination for the newest-first feeds (incidents, activities, invoices,
+payments).
+
+Two modes, chosen from the request args:
+
+* offset (default) – `page` / `limit`, with an exact `total`. Kept for
+  existing clients; cost grows with the page number.
+* cursor – pass `cursor` (empty for the first page, then the returned
+  `next_cursor`). Rows are ordered by (created_at, id) descending and each
+  page is a keyset seek, so deep pages cost the same as the first one.
+  Rows without a created_at come last. `total` is only computed when
+  `include_total=1`, and is then served from a short-lived per-process
+  cache.
+"""
+import base64
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_, nulls_last
+
+from src.utils.cache import TTLCache
+
+COUNT_CACHE_TTL = 60  # seconds
+COUNT_CACHE_SIZE = 1024  # distinct statements (filters x params) kept per process
+
+_counts = TTLCache(COUNT_CACHE_TTL, COUNT_CACHE_SIZE)  # statement key -> count
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row):
+    # an empty timestamp stands for a NULL created_at
+    created_at = row.created_at.isoformat() if row.created_at is not None else ''
+    raw = f"{created_at}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def newest_first(model):
+    """Feed order: (created_at, id) descending, NULL created_at last on every backend"""
+    return nulls_last(model.created_at.desc()), model.id.desc()
+
+
+def cached_count(query):
+    """query.count(), reused for COUNT_CACHE_TTL seconds per distinct statement"""
+    compiled = query.statement.compile()
+    key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    return _counts.get_or_set(key, query.count)
+
+
+def keyset_page(query, model, cursor, limit):
+    """Rows after `cursor` (newest first) plus the cursor of the next page"""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            query = query.filter(model.created_at.is_(None), model.id < row_id)
+        else:
+            query = query.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+                model.created_at.is_(None),
+            ))
+
+    rows = query.order_by(*newest_first(model)).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def feed_page(query, model, items_key):
+    """
+    Paginate `query` according to the request args.
+
+    Returns (body, error) – body is the JSON dict for the response, error a
+    validation message when the cursor can't be decoded.
+    """
+    limit = request.args.get('limit', 20, type=int)
+
+    if 'cursor' not in request.args:
+        page = request.args.get('page', 1, type=int)
+        total = query.count()
+        rows = query.order_by(*newest_first(model))\
+            .offset((page - 1) * limit).limit(limit).all()
+        return {
+            items_key: [row.to_dict() for row in rows],
+            'total': total,
+            'page': page,
+            'limit': limit
+        }, None
+
+    limit = max(limit, 1)
+    try:
+        rows, next_cursor = keyset_page(query, model, request.args['cursor'], limit)
+    except InvalidCursor as e:
+        return None, str(e)
+
+    body = {
+        items_key: [row.to_dict() for row in rows],
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
+    if request.args.get('include_total', '') in ('1', 'true'):
+        body['total'] = cached_count(query)
+    return body, None
@@ -0,0 +1,196 @@
+# src/utils/principal.py
+"""
+Request-scoped identity resolved from JWT claims.
+
+Access tokens minted by auth.login / auth.refresh carry the caller's
+user_type, staff/parent id and daycare_id, so the role decorators no
+longer hit `users`, `daycare_staff` or `parents` on every request.
+Tokens issued before the claims existed fall back to a one-off lookup.
+
+Each token also carries the user's `token_version` ("tv"). Bumping the
+version revokes every outstanding token; the current versions are cached
+per process for a short TTL so the check costs at most one query per user
+per TTL window. The session hook at the bottom bumps it whenever a flush
+changes what a token vouches for: the password, activation, user type, or
+staff/parent membership.
+"""
+from collections import namedtuple
+
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, lazyload
+
+from src.models.user import db, User, DaycareStaff, Parent
+from src.utils.cache import TTLCache
+
+TOKEN_VERSION_TTL = 60  # seconds a cached token version is trusted
+
+StaffRef = namedtuple('StaffRef', ['id', 'daycare_id'])
+ParentRef = namedtuple('ParentRef', ['id'])
+
+_versions = TTLCache(TOKEN_VERSION_TTL)  # user_id -> (token_version, is_active)
+
+
+class Principal:
+    """Who is calling: user id, role and the staff/parent record it maps to"""
+
+    def __init__(self, user_id, user_type=None, staff_id=None, parent_id=None, daycare_id=None):
+        self.user_id = user_id
+        self.user_type = user_type
+        self.staff_id = staff_id
+        self.parent_id = parent_id
+        self.daycare_id = daycare_id
+
+    @property
+    def staff(self):
+        if self.user_type != 'daycare' or self.staff_id is None:
+            return None
+        return StaffRef(self.staff_id, self.daycare_id)
+
+    @property
+    def parent(self):
+        if self.user_type != 'parent' or self.parent_id is None:
+            return None
+        return ParentRef(self.parent_id)
+
+    @property
+    def is_hoster(self):
+        return self.user_type == 'hoster'
+
+    @classmethod
+    def from_claims(cls, claims):
+        """Build from token claims, or None for tokens minted without them"""
+        if 'user_type' not in claims:
+            return None
+        return cls(
+            user_id=int(claims['sub']),
+            user_type=claims.get('user_type'),
+            staff_id=claims.get('staff_id'),
+            parent_id=claims.get('parent_id'),
+            daycare_id=claims.get('daycare_id'),
+        )
+
+    @classmethod
+    def load(cls, user_id):
+        """Resolve from the database (legacy tokens and token minting)"""
+        user = User.query.get(user_id) if user_id is not None else None
+        if not user:
+            return cls(user_id=None)
+        return cls.for_user(user)
+
+    @classmethod
+    def for_user(cls, user):
+        principal = cls(user_id=user.id, user_type=user.user_type)
+        if user.user_type == 'daycare':
+            staff = DaycareStaff.query.options(lazyload(DaycareStaff.children))\
+                .filter_by(user_id=user.id, is_active=True).first()
+            if staff:
+                principal.staff_id = staff.id
+                principal.daycare_id = staff.daycare_id
+        elif user.user_type == 'parent':
+            parent = Parent.query.filter_by(user_id=user.id).first()
+            if parent:
+                principal.parent_id = parent.id
+        return principal
+
+
+def identity_claims(user):
+    """Additional claims to embed in an access token for `user`"""
+    principal = Principal.for_user(user)
+    return {
+        'user_type': principal.user_type,
+        'staff_id': principal.staff_id,
+        'parent_id': principal.parent_id,
+        'daycare_id': principal.daycare_id,
+        'tv': user.token_version or 0,
+    }
+
+
+def refresh_claims(user):
+    """Claims for a refresh token: only the version, so it can be revoked"""
+    return {'tv': user.token_version or 0}
+
+
+def current_principal():
+    """The caller's Principal, resolved once per request"""
+    if 'principal' not in g:
+        g.principal = (Principal.from_claims(get_jwt())
+                       or Principal.load(get_jwt_identity()))
+    return g.principal
+
+
+def _load_token_state(user_id):
+    row = db.session.query(User.token_version, User.is_active).filter(User.id == user_id).first()
+    return ((row.token_version or 0), bool(row.is_active)) if row else (None, False)
+
+
+def _token_state(user_id):
+    return _versions.get_or_set(user_id, lambda: _load_token_state(user_id))
+
+
+def is_token_revoked(jwt_payload):
+    """True when the token's version is stale or its user is gone/disabled"""
+    if 'tv' not in jwt_payload:
+        return False  # issued before versioning; expires on its own
+    version, is_active = _token_state(int(jwt_payload['sub']))
+    return not is_active or version != jwt_payload['tv']
+
+
+def bump_token_version(user):
+    """Revoke every token issued to `user` (takes effect on commit)"""
+    user.token_version = (user.token_version or 0) + 1
+    _versions.invalidate(user.id)
+    # again once committed, in case a request cached the old version meanwhile
+    session = inspect(user).session
+    if session is not None:
+        session.info.setdefault('revoked_users', set()).add(user.id)
+
+
+# ---------- session hooks ----------
+
+# model -> attributes whose change invalidates the tokens of the user(s) it belongs to
+_CREDENTIALS = {
+    User: ('password_hash', 'is_active', 'user_type'),
+    DaycareStaff: ('user_id', 'daycare_id', 'role', 'is_active'),
+    Parent: ('user_id',),
+}
+
+
+def _affected_users(session, obj, attrs):
+    """Ids of the users whose tokens `obj`'s pending change invalidates"""
+    state = inspect(obj)
+    if isinstance(obj, User):
+        changed = any(state.attrs[attr].history.has_changes() for attr in attrs)
+        return [obj.id] if changed and not state.pending else []
+    if state.pending or obj in session.deleted:
+        return [obj.user_id if obj.user_id is not None else getattr(obj.user, 'id', None)]
+    if any(state.attrs[attr].history.has_changes() for attr in attrs):
+        return [obj.user_id, *state.attrs.user_id.history.deleted]
+    return []
+
+
+@event.listens_for(Session, 'before_flush')
+def _revoke_changed_credentials(session, flush_context, instances):
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        attrs = _CREDENTIALS.get(type(obj))
+        if attrs is not None:
+            user_ids.update(_affected_users(session, obj, attrs))
+    for user_id in user_ids - {None}:
+        user = session.get(User, user_id)
+        if user is None or user in session.new or user in session.deleted:
+            continue  # no token issued yet, or none left to revoke
+        if not inspect(user).attrs.token_version.history.has_changes():
+            bump_token_version(user)
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_revoked_versions(session):
+    for user_id in session.info.pop('revoked_users', ()):
+        _versions.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_revoked_versions(session):
+    session.info.pop('revoked_users', None)
@@ -0,0 +1,84 @@
+# src/utils/reconcile.py
+"""
+Diff-based updates of a record's sub-collections (a child's emergency
+contacts, access permissions, allergies...).
+
+Instead of deleting every row and inserting the payload again, the incoming
+items are matched to the existing rows by a natural key (e.g. a contact's
+name, case-insensitively, or an allergy id) and only the differences are
+written: one batched INSERT for new items, one executemany UPDATE for
+matched rows whose values changed, one DELETE for rows no longer present.
+Unchanged rows keep their id and updated_at, so ETags and change feeds
+built on them only move when something really changed.
+
+The statements bypass the ORM unit of work; the caller commits, and loaded
+collections must be refreshed afterwards (a commit expires them anyway).
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from sqlalchemy import delete, insert, update
+
+from src.models.user import db
+
+
+class CollectionDiff(namedtuple('CollectionDiff', 'inserted updated deleted')):
+    """Row counts written by reconcile()"""
+
+    @property
+    def changed(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+
+def _normalize(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+class CollectionSpec:
+    """Rows of `model` matched on the `key` columns; `fields` are the other columns kept in sync"""
+
+    def __init__(self, model, key, fields):
+        self.model = model
+        self.key = tuple(key)
+        self.fields = tuple(fields)
+
+    @property
+    def columns(self):
+        return self.key + self.fields
+
+    def key_of(self, values):
+        return tuple(_normalize(values[column]) for column in self.key)
+
+
+def reconcile(spec, existing, incoming, owner):
+    """
+    Make the rows of `existing` (loaded objects) match `incoming` (dicts
+    holding every column of `spec`); `owner` holds the columns each new row
+    gets (e.g. child_id, daycare_id). Returns a CollectionDiff.
+    """
+    unmatched = defaultdict(list)
+    for row in existing:
+        unmatched[spec.key_of({column: getattr(row, column) for column in spec.columns})].append(row)
+
+    now = datetime.utcnow()
+    inserts, updates = [], []
+    for values in incoming:
+        candidates = unmatched.get(spec.key_of(values))
+        if not candidates:
+            inserts.append(dict(owner, **{column: values[column] for column in spec.columns}))
+            continue
+        row = candidates.pop(0)
+        changed = {column: values[column] for column in spec.columns if getattr(row, column) != values[column]}
+        if changed:
+            updates.append(dict(changed, id=row.id, updated_at=now))
+    deletes = [row.id for rows in unmatched.values() for row in rows]
+
+    if inserts:
+        db.session.execute(insert(spec.model), inserts)
+    if updates:
+        db.session.execute(update(spec.model), updates)
+    if deletes:
+        db.session.execute(
+            delete(spec.model).where(spec.model.id.in_(deletes)).execution_options(synchronize_session=False)
+        )
+    return CollectionDiff(len(inserts), len(updates), len(deletes))
@@ -0,0 +1,384 @@
+# src/utils/roster_import.py
+"""
+Bulk child roster import (POST /api/daycare/children/import).
+
+A roster is a CSV or Excel (.xlsx) file with a header row and one child
+per row. Header names are matched case-insensitively, spaces and
+underscores alike:
+
+    first_name, last_name, date_of_birth (YYYY-MM-DD)      required
+    gender, status, enrollment_date, room_assignment,
+    medical_conditions, dietary_restrictions, notes        optional
+    allergies         "Peanuts; Eggs:severe" (known allergy names,
+                      optional ":severity")
+    parent1_first_name, parent1_last_name, parent1_email,
+    parent1_phone, parent1_relation                        required
+    parent2_...                                            optional
+    emergency_contact_name, emergency_contact_phone,
+    emergency_contact_relation                             optional
+
+The whole file is read first, so an upload that is unreadable or over
+IMPORT_MAX_ROWS is refused before anything is written; the rows are then
+processed in chunks of IMPORT_CHUNK_SIZE. For each chunk, one query finds the parent emails already registered,
+allergies and age groups come from lookups cached for the import, and
+users, parents, children, links, emergency contacts and child allergies
+are each written with one batched INSERT, in one transaction per chunk.
+A row that fails validation is reported and skipped; a chunk that fails
+to save is rolled back as a whole and all of its rows are reported.
+
+Siblings may share a parent: an email that is already registered is an
+error (as for children created one at a time), while an email repeated
+within the file creates the parent once and links it to each child.
+The bulk inserts skip the session hooks, so the materialized counters are
+adjusted explicitly (CounterHelper.record_bulk_insert), the new children
+are added to the sync change log (ChangeLogHelper.record) and the new
+children and parents to the search index (SearchHelper.index).
+"""
+import csv
+import io
+import re
+import secrets
+from datetime import date, datetime
+from itertools import islice
+
+from sqlalchemy import insert
+
+from src.models.user import db, bcrypt, User, Parent
+from src.models.child import Child, ParentChildRelationship
+from src.models.age_group import AgeGroupHelper, AgeGroupIndex
+from src.models.allergy import Allergy, ChildAllergy
+from src.models.emergency_contact import EmergencyContact
+from src.models.search import SearchHelper
+from src.models.stats import CounterHelper, DaycareStatsHelper
+from src.models.sync import ChangeLogHelper
+
+try:
+    import openpyxl
+except ImportError:  # optional dependency, only needed for .xlsx rosters
+    openpyxl = None
+
+IMPORT_CHUNK_SIZE = 200
+IMPORT_MAX_ROWS = 5000
+MAX_PARENTS = 2
+
+GENDERS = ('male', 'female', 'other', 'prefer_not_to_say')
+STATUSES = ('enrolled', 'waitlist', 'withdrawn', 'graduated')
+RELATIONS = ('mother', 'father', 'guardian', 'grandparent', 'other')
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+class RosterError(ValueError):
+    """The upload as a whole cannot be imported (unreadable, wrong format, too long)"""
+
+
+def _column(name):
+    return re.sub(r'[\s_]+', '_', str(name or '').strip().lower())
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def _csv_rows(stream):
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        for values in csv.reader(text):
+            yield values
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise RosterError(f'Could not read the CSV file: {e}')
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(stream):
+    if openpyxl is None:
+        raise RosterError('Excel rosters are not supported on this server; upload a CSV file')
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise RosterError(f'Could not read the Excel file: {e}')
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(stream, filename):
+    """(line number, {column: value}) for every non-blank row of a .csv or .xlsx roster"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'xlsx':
+        rows = _xlsx_rows(stream)
+    elif extension == 'csv':
+        rows = _csv_rows(stream)
+    else:
+        raise RosterError('Roster must be a .csv or .xlsx file')
+
+    header = None
+    for line_no, values in enumerate(rows, start=1):
+        values = [_cell(value) for value in values]
+        if not any(values):
+            continue
+        if header is None:
+            header = [_column(value) for value in values]
+            missing = [c for c in ('first_name', 'last_name', 'date_of_birth', 'parent1_email') if c not in header]
+            if missing:
+                raise RosterError(f"Missing column(s): {', '.join(missing)}")
+            continue
+        yield line_no, dict(zip(header, values))
+
+
+def _parse_date(value, field, errors):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    except ValueError:
+        errors.append(f'{field}: invalid date `{value}`, use YYYY-MM-DD')
+        return None
+
+
+def _check_lengths(model, values, errors, prefix=''):
+    """Report values too long for their column of `model` (the database would reject the whole chunk)"""
+    columns = model.__table__.columns
+    for field, value in values.items():
+        length = getattr(columns[field].type, 'length', None) if field in columns else None
+        if length and isinstance(value, str) and len(value) > length:
+            errors.append(f'{prefix}{field} is longer than {length} characters')
+
+
+def parse_row(row):
+    """Validated record for a roster row, and the list of problems found"""
+    errors = []
+    for field in ('first_name', 'last_name', 'date_of_birth'):
+        if not row.get(field):
+            errors.append(f'{field} is required')
+    dob = _parse_date(row.get('date_of_birth'), 'date_of_birth', errors)
+    enrollment = _parse_date(row.get('enrollment_date'), 'enrollment_date', errors)
+    if dob and dob > date.today():
+        errors.append('date_of_birth is in the future')
+
+    gender = (row.get('gender') or '').lower() or None
+    if gender and gender not in GENDERS:
+        errors.append(f"gender must be one of {', '.join(GENDERS)}")
+    status = (row.get('status') or 'enrolled').lower()
+    if status not in STATUSES:
+        errors.append(f"status must be one of {', '.join(STATUSES)}")
+
+    parents = []
+    for n in range(1, MAX_PARENTS + 1):
+        prefix = f'parent{n}_'
+        fields = {key: row.get(prefix + key, '') for key in ('first_name', 'last_name', 'email', 'phone', 'relation')}
+        if n > 1 and not any(fields.values()):
+            continue
+        email = fields['email'].lower()
+        relation = fields['relation'].lower() or 'guardian'
+        if not EMAIL.match(email):
+            errors.append(f'{prefix}email is missing or invalid')
+        if not fields['first_name'] or not fields['last_name']:
+            errors.append(f'{prefix}first_name and {prefix}last_name are required')
+        if relation not in RELATIONS:
+            errors.append(f"{prefix}relation must be one of {', '.join(RELATIONS)}")
+        _check_lengths(Parent, {key: fields[key] for key in ('first_name', 'last_name', 'phone')}, errors, prefix)
+        _check_lengths(User, {'email': email}, errors, prefix)
+        parents.append(dict(fields, email=email, relation=relation))
+    if len({p['email'] for p in parents}) < len(parents):
+        errors.append('parent emails must differ')
+
+    allergies = []
+    for item in filter(None, (part.strip() for part in (row.get('allergies') or '').split(';'))):
+        name, _, severity = item.partition(':')
+        allergies.append((name.strip(), severity.strip() or None))
+        _check_lengths(ChildAllergy, {'severity': severity.strip()}, errors, 'allergies: ')
+
+    contact = None
+    if row.get('emergency_contact_name') or row.get('emergency_contact_phone'):
+        contact = {
+            'name': row.get('emergency_contact_name', ''),
+            'phone': row.get('emergency_contact_phone', ''),
+            'relation': row.get('emergency_contact_relation') or None,
+        }
+        if not contact['name'] or not contact['phone']:
+            errors.append('emergency_contact_name and emergency_contact_phone go together')
+        _check_lengths(EmergencyContact, contact, errors, 'emergency_contact_')
+
+    child = {
+        'first_name': row.get('first_name'),
+        'last_name': row.get('last_name'),
+        'date_of_birth': dob,
+        'gender': gender,
+        'status': status,
+        'enrollment_date': enrollment,
+        'room_assignment': row.get('room_assignment') or None,
+        'medical_conditions': row.get('medical_conditions') or None,
+        'dietary_restrictions': row.get('dietary_restrictions') or None,
+        'notes': row.get('notes') or None,
+    }
+    _check_lengths(Child, child, errors)
+    return {'child': child, 'parents': parents, 'allergies': allergies, 'contact': contact}, errors
+
+
+class RosterImporter:
+    """Imports parsed roster rows for one daycare, chunk by chunk, building the report"""
+
+    def __init__(self, daycare_id, dry_run=False, chunk_size=IMPORT_CHUNK_SIZE):
+        self.daycare_id = daycare_id
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size
+        self.age_groups = AgeGroupIndex.for_daycare(daycare_id)
+        self.allergy_ids = {name.lower(): allergy_id for allergy_id, name in db.session.query(Allergy.id, Allergy.name)}
+        self.parent_ids = {}  # email -> parent id, for parents created by this import
+        self._password_hash = None
+        self.report = {'dry_run': dry_run, 'rows': 0, 'imported': 0, 'failed': 0,
+                       'parents_created': 0, 'child_ids': [], 'errors': []}
+
+    @property
+    def password_hash(self):
+        # new parents get a password nobody knows (like create_child) and set
+        # their own through the reset flow; hashing one per import keeps
+        # bcrypt's deliberate slowness out of the per-row cost
+        if self._password_hash is None:
+            self._password_hash = bcrypt.generate_password_hash(secrets.token_urlsafe(32)).decode('utf-8')
+        return self._password_hash
+
+    def run(self, rows):
+        # read (and decode) everything up front: a RosterError must mean nothing was imported
+        rows = list(islice(rows, IMPORT_MAX_ROWS + 1))
+        if len(rows) > IMPORT_MAX_ROWS:
+            raise RosterError(f'Rosters are limited to {IMPORT_MAX_ROWS} rows')
+        self.report['rows'] = len(rows)
+        for start in range(0, len(rows), self.chunk_size):
+            self._process(rows[start:start + self.chunk_size])
+        return self.report
+
+    def _fail(self, line_no, errors):
+        self.report['failed'] += 1
+        self.report['errors'].append({'row': line_no, 'errors': errors})
+
+    def _validate(self, chunk):
+        parsed = []
+        for line_no, row in chunk:
+            record, errors = parse_row(row)
+            for name, _ in record['allergies']:
+                if name.lower() not in self.allergy_ids:
+                    errors.append(f'unknown allergy `{name}`')
+            if errors:
+                self._fail(line_no, errors)
+            else:
+                parsed.append((line_no, record))
+
+        # one set query for every parent email of the chunk not created by this import
+        emails = {p['email'] for _, record in parsed for p in record['parents']} - set(self.parent_ids)
+        taken = {email for email, in db.session.query(User.email).filter(User.email.in_(emails))} if emails else set()
+
+        valid = []
+        for line_no, record in parsed:
+            registered = [p['email'] for p in record['parents'] if p['email'] in taken]
+            if registered:
+                self._fail(line_no, [f'email `{email}` is already registered' for email in registered])
+            else:
+                valid.append((line_no, record))
+        return valid
+
+    def _process(self, chunk):
+        valid = self._validate(chunk)
+        if not valid:
+            return
+        if self.dry_run:
+            for _, record in valid:
+                for parent in record['parents']:
+                    if parent['email'] not in self.parent_ids:
+                        self.parent_ids[parent['email']] = None
+                        self.report['parents_created'] += 1
+            self.report['imported'] += len(valid)
+            return
+
+        known_parents = set(self.parent_ids)
+        try:
+            child_ids, parents_created = self._insert(valid)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for email in set(self.parent_ids) - known_parents:
+                del self.parent_ids[email]
+            for line_no, _ in valid:
+                self._fail(line_no, [f'could not be saved: {e.__class__.__name__}'])
+            return
+        DaycareStatsHelper.invalidate(self.daycare_id)
+        self.report['imported'] += len(child_ids)
+        self.report['parents_created'] += parents_created
+        self.report['child_ids'].extend(child_ids)
+
+    def _insert(self, valid):
+        """Write one chunk of valid records (no commit); returns (child ids, parents created)"""
+        new_parents = {}
+        for _, record in valid:
+            for parent in record['parents']:
+                if parent['email'] not in self.parent_ids:
+                    new_parents.setdefault(parent['email'], parent)
+
+        if new_parents:
+            user_rows = [{'email': email, 'password_hash': self.password_hash, 'user_type': 'parent',
+                          'is_active': True, 'email_verified': False} for email in new_parents]
+            user_ids = db.session.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True), user_rows
+            ).scalars().all()
+            parent_rows = [{
+                'user_id': user_id,
+                'first_name': parent['first_name'],
+                'last_name': parent['last_name'],
+                'phone': parent['phone'],
+            } for user_id, parent in zip(user_ids, new_parents.values())]
+            parent_ids = db.session.execute(
+                insert(Parent).returning(Parent.id, sort_by_parameter_order=True), parent_rows
+            ).scalars().all()
+            self.parent_ids.update(zip(new_parents, parent_ids))
+            CounterHelper.record_bulk_insert(User, user_rows)
+            CounterHelper.record_bulk_insert(Parent, parent_rows)
+            SearchHelper.index('user', user_ids)
+
+        child_rows = []
+        for _, record in valid:
+            child = record['child']
+            child_rows.append(dict(
+                child,
+                daycare_id=self.daycare_id,
+                primary_parent_id=self.parent_ids[record['parents'][0]['email']],
+                pickup_authorization='[]',
+                age_group_id=self.age_groups.lookup(AgeGroupHelper.calculate_age_in_months(child['date_of_birth'])),
+            ))
+        child_ids = db.session.execute(
+            insert(Child).returning(Child.id, sort_by_parameter_order=True), child_rows
+        ).scalars().all()
+        CounterHelper.record_bulk_insert(Child, child_rows)
+        SearchHelper.index('child', child_ids)
+        ChangeLogHelper.record('children', [{'id': child_id, 'daycare_id': self.daycare_id}
+                                            for child_id in child_ids], 'insert')
+
+        links, contacts, allergies = [], [], []
+        for child_id, (_, record) in zip(child_ids, valid):
+            for position, parent in enumerate(record['parents']):
+                links.append({
+                    'parent_id': self.parent_ids[parent['email']],
+                    'child_id': child_id,
+                    'relationship_type': parent['relation'],
+                    'access_level': 'full',
+                    'can_pickup': True,
+                    'can_authorize_medical': position == 0,
+                    'is_primary': position == 0,
+                })
+            if record['contact']:
+                contacts.append(dict(record['contact'], daycare_id=self.daycare_id, child_id=child_id))
+            for name, severity in record['allergies']:
+                allergies.append({'daycare_id': self.daycare_id, 'child_id': child_id,
+                                  'allergy_id': self.allergy_ids[name.lower()], 'severity': severity})
+
+        for model, rows in ((ParentChildRelationship, links), (EmergencyContact, contacts), (ChildAllergy, allergies)):
+            if rows:
+                db.session.execute(insert(model), rows)
+        return child_ids, len(new_parents)
@@ -0,0 +1,161 @@
+# src/utils/static_assets.py
+"""
+Static asset layer for the React build in src/static.
+
+The folder is walked once at startup into a manifest (path -> size, mtime,
+content type, ETag and precompressed variants), so serving a file costs a
+dict lookup and an open(), with no os.path.exists/stat per request.
+
+* `<file>.br` / `<file>.gz` next to a file are sent instead of it, with
+  Content-Encoding, to clients accepting that encoding (`flask
+  precompress-static` writes them after a frontend build).
+* Content-hashed build output (Vite's `assets/index-3kT9Qx2b.js`) is cached
+  for a year as immutable; index.html must be revalidated on every use so a
+  deploy is picked up at once; other files (public/ copies such as
+  apple-touch-icon.png, whose names carry no hash) are cached for an hour.
+* Unknown paths fall back to index.html (client-side routing).
+
+The manifest is rebuilt on each request when STATIC_MANIFEST_RELOAD is on
+(default: debug), so a rebuilt frontend shows up without a restart.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from collections import namedtuple
+from email.utils import formatdate
+
+from flask import current_app, request
+from werkzeug.utils import get_content_type
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+INDEX = 'index.html'
+
+# Vite build output: assets/<name>-<8 char hash>.<ext>, hash in base64url
+HASHED_ASSET = re.compile(r'^assets/[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+
+# suffix -> Content-Encoding, in order of preference
+VARIANTS = (('.br', 'br'), ('.gz', 'gzip'))
+
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_INDEX = 'no-cache'
+CACHE_DEFAULT = 'public, max-age=3600'
+
+File = namedtuple('File', 'path size etag')
+Asset = namedtuple('Asset', 'file content_type last_modified cache_control variants')
+
+
+def _file(path, st):
+    return File(path, st.st_size, f'{st.st_mtime_ns:x}-{st.st_size:x}')
+
+
+def _cache_control(key):
+    if key == INDEX:
+        return CACHE_INDEX
+    if HASHED_ASSET.match(key):
+        return CACHE_IMMUTABLE
+    return CACHE_DEFAULT
+
+
+def build_manifest(root):
+    """{relative url path: Asset} for every file under `root`"""
+    entries = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            entries[os.path.relpath(path, root).replace(os.sep, '/')] = os.stat(path)
+
+    manifest = {}
+    for key, st in entries.items():
+        if any(key.endswith(suffix) and key[:-len(suffix)] in entries for suffix, _ in VARIANTS):
+            continue  # a precompressed variant, served through its original
+        mimetype = mimetypes.guess_type(key)[0] or 'application/octet-stream'
+        variants = {
+            encoding: _file(os.path.join(root, key + suffix), entries[key + suffix])
+            for suffix, encoding in VARIANTS if key + suffix in entries
+        }
+        manifest[key] = Asset(
+            file=_file(os.path.join(root, key), st),
+            content_type=get_content_type(mimetype, 'utf-8'),
+            last_modified=formatdate(st.st_mtime, usegmt=True),
+            cache_control=_cache_control(key),
+            variants=variants,
+        )
+    return manifest
+
+
+def manifest():
+    app = current_app._get_current_object()
+    if app.config['STATIC_MANIFEST_RELOAD'] or 'static_manifest' not in app.extensions:
+        app.extensions['static_manifest'] = build_manifest(app.static_folder) if app.static_folder else {}
+    return app.extensions['static_manifest']
+
+
+def _choose(asset):
+    for _, encoding in VARIANTS:
+        if encoding in asset.variants and request.accept_encodings[encoding]:
+            return asset.variants[encoding], encoding
+    return asset.file, None
+
+
+def serve(path):
+    """Response for `path` (index.html when unknown), or None when there is no build"""
+    assets = manifest()
+    asset = assets.get(path) or assets.get(INDEX)
+    if asset is None:
+        return None
+
+    file, encoding = _choose(asset)
+    response = current_app.response_class(
+        wrap_file(request.environ, open(file.path, 'rb')),
+        content_type=asset.content_type,
+        direct_passthrough=True,
+    )
+    response.content_length = file.size
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if asset.variants:
+        response.vary.add('Accept-Encoding')
+    response.set_etag(file.etag)
+    response.headers['Last-Modified'] = asset.last_modified
+    response.headers['Cache-Control'] = asset.cache_control
+    return response.make_conditional(request)
+
+
+def precompress(root, min_size=1024, level=9):
+    """
+    Write .gz (and .br when brotli is installed) next to every compressible
+    file under `root` of at least `min_size` bytes; returns the paths written
+    """
+    from src.utils.compression import COMPRESSIBLE_MIMETYPES
+
+    written = []
+    for key, asset in build_manifest(root).items():
+        if asset.file.size < min_size or not asset.content_type.startswith(COMPRESSIBLE_MIMETYPES):
+            continue
+        with open(asset.file.path, 'rb') as f:
+            body = f.read()
+        outputs = [('.gz', gzip.compress(body, compresslevel=level, mtime=0))]
+        if brotli is not None:
+            outputs.append(('.br', brotli.compress(body, quality=11)))
+        for suffix, data in outputs:
+            if len(data) < len(body):
+                with open(asset.file.path + suffix, 'wb') as f:
+                    f.write(data)
+                written.append(key + suffix)
+    return written
+
+
+def init_app(app):
+    """
+    Build the static manifest.
+    STATIC_MANIFEST_RELOAD: rescan src/static on every request (development)
+    """
+    app.config.setdefault('STATIC_MANIFEST_RELOAD', app.debug)
+    if app.static_folder:
+        app.extensions['static_manifest'] = build_manifest(app.static_folder)